@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Drag and Drop v2 XBlock - Item-level analytics over tracking logs
+
+Aggregates the `edx.drag_and_drop_v2.item.dropped` events of tracking logs (JSON lines, optionally gzipped)
+into per-problem item confusion matrices, first-try correctness rates and zone error hot spots:
+
+    python -m drag_and_drop_v2.analytics [--processes N] tracking.log-*.gz > report.json
+
+First-try rates need the first drop of every learner for every item, so memory grows with the number of
+learner-item pairs in the logs (roughly 200 bytes each: a dict entry, a (time, is_correct) tuple and the
+time string), e.g. about 2 GB for 10M pairs. Problem usage keys and usernames are interned, so they are
+stored once however many events repeat them.
+"""
+from __future__ import absolute_import
+
+import argparse
+import json
+import sys
+from collections import Counter, defaultdict
+
+from .bulk import map_in_pool, open_text
+from .events import ITEM_DROPPED_EVENT
+
+# Location ID of drops back to the item bank (assessment mode)
+BANK_LOCATION_ID = -1
+
+
+def iter_drop_events(lines):
+    """
+    Yields the parsed item dropped events of an iterable of tracking log lines, skipping everything else.
+    """
+    for line in lines:
+        # Most lines are other events: skip them before paying for JSON parsing
+        if ITEM_DROPPED_EVENT not in line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict) and event.get('event_type') == ITEM_DROPPED_EVENT:
+            yield event
+
+
+def _counters():
+    """
+    Returns a dict of counters (a module-level function, so that aggregates can be pickled).
+    """
+    return defaultdict(Counter)
+
+
+def _dicts():
+    """
+    Returns a dict of dicts (a module-level function, so that aggregates can be pickled).
+    """
+    return defaultdict(dict)
+
+
+def _intern(value):
+    """
+    Returns `value`, interned if it is a string.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class DropAnalytics:
+    """
+    Single-pass aggregate of item dropped events.
+
+    Memory is proportional to the number of distinct problems, items, zones and learner-item pairs seen,
+    not to the number of events (see the module docstring). Aggregates of separate logs (e.g. shards) can be
+    combined with `merge`.
+    """
+
+    def __init__(self):
+        # usage_key -> item_id -> Counter of location_id
+        self.drops = defaultdict(_counters)
+        # usage_key -> location_id -> Counter of item_id, for incorrect drops only
+        self.errors = defaultdict(_counters)
+        # usage_key -> item_id -> user -> (time, is_correct) of the learner's first drop of the item into a zone
+        self.first_drops = defaultdict(_dicts)
+
+    def add(self, event):
+        """
+        Adds a parsed item dropped event (see `iter_drop_events`).
+        """
+        data = event.get('event')
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                return
+        if not isinstance(data, dict):
+            return
+
+        context = event.get('context') or {}
+        usage_key = _intern((context.get('module') or {}).get('usage_key'))
+        item_id = data.get('item_id')
+        location_id = data.get('location_id')
+        if usage_key is None or item_id is None or location_id is None:
+            return
+
+        self.drops[usage_key][item_id][location_id] += 1
+        if location_id == BANK_LOCATION_ID:
+            return
+
+        is_correct = bool(data.get('is_correct'))
+        if not is_correct:
+            self.errors[usage_key][location_id][item_id] += 1
+
+        user = _intern(context.get('user_id', event.get('username')))
+        if user is not None:
+            learners = self.first_drops[usage_key][item_id]
+            first_drop = (event.get('time') or '', is_correct)
+            if user not in learners or first_drop < learners[user]:
+                learners[user] = first_drop
+
+    def add_lines(self, lines):
+        """
+        Adds the item dropped events of an iterable of tracking log lines.
+        """
+        for event in iter_drop_events(lines):
+            self.add(event)
+        return self
+
+    def merge(self, other):
+        """
+        Adds the aggregate of another `DropAnalytics` to this one.
+        """
+        for usage_key, items in other.drops.items():
+            for item_id, locations in items.items():
+                self.drops[usage_key][item_id].update(locations)
+        for usage_key, locations in other.errors.items():
+            for location_id, items in locations.items():
+                self.errors[usage_key][location_id].update(items)
+        for usage_key, items in other.first_drops.items():
+            for item_id, other_learners in items.items():
+                learners = self.first_drops[_intern(usage_key)][item_id]
+                for user, first_drop in other_learners.items():
+                    if user not in learners or first_drop < learners[user]:
+                        learners[_intern(user)] = first_drop
+        return self
+
+    def report(self, hot_spots=5):
+        """
+        Returns the aggregate as a JSON-serializable dict, keyed by problem usage key:
+
+        * `items`: for each item ID, `drops` (number of drops per location ID, -1 being the item bank)
+          and `first_try` (number of learners who dropped the item into a zone, how many of them got it
+          right the first time, and the resulting rate).
+        * `hot_spots`: up to `hot_spots` zones with the most incorrect drops, with the items dropped there.
+        """
+        report = {}
+        for usage_key, items in self.drops.items():
+            items_report = {}
+            for item_id, locations in items.items():
+                learners = self.first_drops.get(usage_key, {}).get(item_id, {})
+                first_try = {
+                    'learners': len(learners),
+                    'correct': sum(is_correct for __, is_correct in learners.values()),
+                }
+                items_report[str(item_id)] = {
+                    'drops': {str(location_id): count for location_id, count in locations.items()},
+                    'first_try': {
+                        'learners': first_try['learners'],
+                        'correct': first_try['correct'],
+                        'rate': first_try['correct'] / first_try['learners'] if first_try['learners'] else None,
+                    },
+                }
+            zone_errors = sorted(
+                self.errors[usage_key].items(), key=lambda zone_items: -sum(zone_items[1].values())
+            )[:hot_spots]
+            report[usage_key] = {
+                'items': items_report,
+                'hot_spots': [
+                    {
+                        'location_id': location_id,
+                        'incorrect_drops': sum(zone_items.values()),
+                        'items': {str(item_id): count for item_id, count in zone_items.most_common()},
+                    }
+                    for location_id, zone_items in zone_errors
+                ],
+            }
+        return report
+
+
+def aggregate_file(path):
+    """
+    Returns the `DropAnalytics` of a single tracking log file.
+    """
+    with open_text(path) as lines:
+        return DropAnalytics().add_lines(lines)
+
+
+def aggregate_files(paths, processes=1):
+    """
+    Returns the combined `DropAnalytics` of tracking log files, aggregating up to `processes` files in parallel.
+    """
+    analytics = DropAnalytics()
+    if processes == 1:
+        for path in paths:
+            analytics.merge(aggregate_file(path))
+        return analytics
+
+    for file_analytics in map_in_pool(aggregate_file, ((path,) for path in paths), processes=processes):
+        analytics.merge(file_analytics)
+    return analytics
+
+
+def main(argv=None):
+    """
+    Prints the analytics report of the tracking logs given on the command line as JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', maxsplit=1)[0].strip())
+    parser.add_argument('paths', nargs='+', metavar='LOG', help="Tracking log files, optionally gzipped")
+    parser.add_argument('--processes', type=int, default=1, help="Number of log files to aggregate in parallel")
+    parser.add_argument('--hot-spots', type=int, default=5, help="Number of zone hot spots to report per problem")
+    args = parser.parse_args(argv)
+
+    analytics = aggregate_files(args.paths, processes=args.processes)
+    json.dump(analytics.report(hot_spots=args.hot_spots), sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Drag and Drop v2 XBlock - Helpers shared by the bulk tools (rescoring, analytics and migration)
+"""
+from __future__ import absolute_import
+
+import gzip
+import itertools
+import multiprocessing
+from collections import deque
+
+
+def open_text(path):
+    """
+    Opens a file (e.g. a tracking log, or a dump of records) for reading text, decompressing it if its name ends
+    with `.gz`.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def chunks(records, chunk_size):
+    """
+    Splits an iterable of records into lists of up to `chunk_size` records, reading it lazily.
+    """
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_in_pool(func, args, *, processes=None, initializer=None, initargs=()):
+    """
+    Calls `func` with each tuple of arguments of the iterable `args`, in a pool of `processes` worker processes
+    (defaulting to the number of CPUs) set up by calling `initializer(*initargs)`.
+
+    Yields the results in the order of `args`, which is read lazily: at most two calls per worker process are in
+    flight at any time.
+    """
+    with multiprocessing.Pool(processes, initializer, initargs) as pool:
+        max_pending = 2 * (processes or multiprocessing.cpu_count())
+        pending = deque()
+        for func_args in args:
+            pending.append(pool.apply_async(func, func_args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
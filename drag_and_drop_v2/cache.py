@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+""" Drag and Drop v2 XBlock - Process-wide caches """
+from __future__ import absolute_import
+
+import threading
+import time
+from collections import OrderedDict
+
+from .instrumentation import increment
+
+# Limits of the cache holding compiled problem definitions. Definitions are small, and keyed by content
+# fingerprint, so the TTL only bounds how long definitions of deleted or edited blocks linger in memory.
+DEFINITION_CACHE_SIZE = 1024
+DEFINITION_CACHE_TTL = 60 * 60
+
+# Limits of the cache holding the content-only part of `student_view_data`. It also embeds URLs expanded by the
+# runtime, which may change without the block being edited (e.g. when course assets move), hence the shorter TTL.
+STUDENT_VIEW_DATA_CACHE_SIZE = 1024
+STUDENT_VIEW_DATA_CACHE_TTL = 10 * 60
+
+# Limits of the cache holding static URLs expanded by the runtime, shared by all blocks of a course.
+EXPANDED_URL_CACHE_SIZE = 8192
+EXPANDED_URL_CACHE_TTL = 10 * 60
+
+# Limits of the cache holding the text of problem `data` indexed by courseware search, keyed by content fingerprint.
+INDEX_CONTENT_CACHE_SIZE = 1024
+INDEX_CONTENT_CACHE_TTL = 60 * 60
+
+# Limits of the cache holding course waffle flag values. Flags are toggled by operators, rarely, so their values
+# can be reused for a short while instead of being looked up several times per request.
+WAFFLE_FLAG_CACHE_SIZE = 4096
+WAFFLE_FLAG_CACHE_TTL = 60
+
+# Limits of the cache holding answer layouts shown to learners, keyed by content fingerprint and learner placements.
+# Answers are requested in bursts (e.g. right after a due date), by learners who mostly placed items the same way.
+ANSWER_LAYOUT_CACHE_SIZE = 4096
+ANSWER_LAYOUT_CACHE_TTL = 60 * 60
+
+# Limit of the cache holding HTML sanitized by `sanitize_html`, keyed by the raw HTML. Problem content repeats
+# across learners, and sanitized HTML only depends on it, so entries never expire.
+SANITIZED_HTML_CACHE_SIZE = 4096
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe least-recently-used cache with optional time-to-live.
+
+    Values are built outside of the lock, so concurrent misses on the same key may build the
+    value more than once; the last one stored wins. This is harmless for the deterministic,
+    content-derived values kept here, and avoids blocking every other key while one is built.
+    """
+
+    def __init__(self, maxsize, ttl=None, timer=time.monotonic, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.ttl = ttl
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under `key`, or `default` if it is missing or expired.
+        """
+        value = default
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > self._timer():
+                    self._entries.move_to_end(key)
+                    value = entry[0]
+                else:
+                    del self._entries[key]
+                    entry = None
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if self.name:
+            increment(f'cache.{self.name}.{"hits" if entry is not None else "misses"}')
+        return value
+
+    def set(self, key, value):
+        """
+        Stores `value` under `key`, evicting the least recently used entries if the cache is full.
+        """
+        expires_at = self._timer() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """
+        Returns the value stored under `key`, building and storing it with `factory()` on a miss.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, predicate):
+        """
+        Removes all entries whose key satisfies `predicate`.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Removes all entries and resets hit/miss counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns a dict with the current size and hit/miss counters of the cache.
+        """
+        return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+# Compiled problem definitions, keyed by (usage_id, content fingerprint). Shared by all block instances in the
+# process, so that a problem loaded by many learners is compiled once instead of once per request.
+definition_cache = LRUCache(DEFINITION_CACHE_SIZE, DEFINITION_CACHE_TTL, name='definition')
+
+# JSON-serialized content-only part of `student_view_data`, keyed by (usage_id, settings and content fingerprint).
+student_view_data_cache = LRUCache(STUDENT_VIEW_DATA_CACHE_SIZE, STUDENT_VIEW_DATA_CACHE_TTL, name='student_view_data')
+
+# Static URLs expanded by the runtime, keyed by (learning context key, url).
+expanded_url_cache = LRUCache(EXPANDED_URL_CACHE_SIZE, EXPANDED_URL_CACHE_TTL, name='expanded_url')
+
+# Plain text fields of the search index documents of problem `data`, keyed by content fingerprint.
+index_content_cache = LRUCache(INDEX_CONTENT_CACHE_SIZE, INDEX_CONTENT_CACHE_TTL, name='index_content')
+
+# Values of course waffle flags, keyed by (flag name, course_id).
+waffle_flag_cache = LRUCache(WAFFLE_FLAG_CACHE_SIZE, WAFFLE_FLAG_CACHE_TTL, name='waffle_flag')
+
+# Answer layouts (see `grading.answer_layout`), keyed by (content fingerprint, max items per zone, learner placements).
+answer_layout_cache = LRUCache(ANSWER_LAYOUT_CACHE_SIZE, ANSWER_LAYOUT_CACHE_TTL, name='answer_layout')
+
+# HTML sanitized by `utils.sanitize_html`, keyed by the raw HTML.
+sanitized_html_cache = LRUCache(SANITIZED_HTML_CACHE_SIZE, name='sanitized_html')
+
+
+def invalidate_usage(cache, usage_id):
+    """
+    Removes all entries cached for the block identified by `usage_id` from a cache keyed by (usage_id, ...).
+    """
+    usage_id = str(usage_id)
+    cache.invalidate(lambda key: key[0] == usage_id)
@@ -1,6 +1,10 @@
 """
 Compatibility layer to isolate core-platform waffle flags from implementation.
 """
+import functools
+
+from .cache import waffle_flag_cache
+from .instrumentation import increment
 
 # Waffle flags configuration
 
@@ -31,3 +35,31 @@ def get_grading_ignore_decoys_waffle_flag():
     except ValueError:
         # pylint: disable=toggle-missing-annotation
         return CourseWaffleFlag(f'{WAFFLE_NAMESPACE}.{GRADING_IGNORE_DECOYS}', __name__)
+
+
+@functools.lru_cache(maxsize=1)
+def _grading_ignore_decoys_waffle_flag():
+    """
+    Returns the Waffle flag for alternative grading, built once per process.
+    """
+    return get_grading_ignore_decoys_waffle_flag()
+
+
+def grading_ignore_decoys_enabled(course_id):
+    """
+    Returns whether alternative grading (ignoring decoy items) is enabled for course `course_id`.
+
+    Values are shared by all blocks of the process, and looked up again once they are
+    `WAFFLE_FLAG_CACHE_TTL` seconds old.
+    """
+    return waffle_flag_cache.get_or_set(
+        (GRADING_IGNORE_DECOYS, str(course_id)), lambda: _is_grading_ignore_decoys_enabled(course_id)
+    )
+
+
+def _is_grading_ignore_decoys_enabled(course_id):
+    """
+    Looks up the value of the Waffle flag for alternative grading for course `course_id`.
+    """
+    increment(f'waffle_flag.{GRADING_IGNORE_DECOYS}.lookups')
+    return bool(_grading_ignore_decoys_waffle_flag().is_enabled(course_id))
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+""" Drag and Drop v2 XBlock - Compiled problem definition """
+from __future__ import absolute_import
+
+import hashlib
+import json
+from types import MappingProxyType
+
+from .utils import StateMigration, sanitize_html
+
+# Key of the XBLOCK_SETTINGS entry enabling the compact item state format for writes
+COMPACT_ITEM_STATE_SETTING = 'compact_item_state'
+
+# Keys of item state stored in the compact format: the fingerprint of the layout (item IDs and zone UIDs,
+# in order) that the state is indexed by, and the placement code of each item of the layout, in order
+COMPACT_LAYOUT_KEY = 'layout'
+COMPACT_ITEMS_KEY = 'items'
+# Placement code of items in the item bank; placed items are coded as `2 * zone index + correct`
+NOT_PLACED = -1
+
+# Key and value of the format version of problem `data` normalized by `normalize_data`
+DATA_FORMAT_VERSION_KEY = 'format_version'
+DATA_FORMAT_VERSION = '2.1'
+
+
+class ProblemDataError(ValueError):
+    """
+    Raised when problem `data` is not a valid problem definition; `messages` lists all problems found.
+    """
+
+    def __init__(self, messages):
+        super().__init__(" ".join(messages))
+        self.messages = messages
+
+
+def content_fingerprint(data):
+    """
+    Returns a stable hash of problem `data`.
+
+    The fingerprint only depends on the content of `data`, so it can be used to key
+    anything derived from it, regardless of which block instance the data was read from.
+    """
+    serialized = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+
+def layout_fingerprint(layout):
+    """
+    Returns a short, stable hash of a layout dict (`items`: list of item IDs, `zones`: list of zone UIDs).
+    """
+    serialized = json.dumps([layout['items'], layout['zones']], separators=(',', ':'))
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()[:16]
+
+
+def is_compact_item_state(item_state):
+    """
+    Checks whether `item_state` is stored in the compact format (keys of item state entries are item IDs).
+    """
+    return isinstance(item_state, dict) and COMPACT_LAYOUT_KEY in item_state
+
+
+def is_normalized_data(data):
+    """
+    Checks whether problem `data` was normalized by `normalize_data` (in the current format version).
+    """
+    return data.get(DATA_FORMAT_VERSION_KEY) == DATA_FORMAT_VERSION
+
+
+def _normalize_item(item):
+    """
+    Returns a copy of `item` in the current format: the legacy single `zone` is converted to a list of
+    `zones`, and the legacy `backgroundImage` to `imageURL`.
+    """
+    item = dict(item)
+    zone = item.pop('zone', None)
+    if item.get('zones') is None:
+        item['zones'] = [zone] if zone is not None and zone != 'none' else []
+    background_image = item.pop('backgroundImage', None)
+    if not item.get('imageURL') and background_image:
+        item['imageURL'] = background_image
+    return item
+
+
+def normalize_data(data):
+    """
+    Validates problem `data` and returns a normalized copy of it, which is marked with the current format version.
+
+    Zones are migrated to the current format, and items are normalized with `_normalize_item`, so that reading
+    normalized data does not require any of the legacy format handling.
+
+    Raises `ProblemDataError` if `data` is not structured as expected (lists of zone and item objects, items with
+    `feedback` and lists of `zones`), has items without IDs, duplicate item IDs or zone UIDs, or items referring to
+    zones that do not exist.
+    """
+    if not isinstance(data, dict):
+        raise ProblemDataError(["Problem data must be an object."])
+    if not isinstance(data.get('zones', []), list) or not isinstance(data.get('items', []), list):
+        raise ProblemDataError(["Zones and items must be lists."])
+    if not all(isinstance(entry, dict) for entry in data.get('zones', []) + data.get('items', [])):
+        raise ProblemDataError(["Zones and items must be objects."])
+
+    messages = []
+    migrator = StateMigration(None)
+    zones = [migrator.apply_zone_migrations(zone) for zone in data.get('zones', [])]
+    zone_uids = set()
+    for zone in zones:
+        if zone['uid'] is None:
+            messages.append("Zone without a UID.")
+        elif zone['uid'] in zone_uids:
+            messages.append(f"Duplicate zone UID: {zone['uid']}.")
+        zone_uids.add(zone['uid'])
+
+    items = [_normalize_item(item) for item in data.get('items', [])]
+    item_ids = set()
+    for item in items:
+        if item.get('id') is None:
+            messages.append("Item without an ID.")
+            continue
+        if str(item['id']) in item_ids:
+            messages.append(f"Duplicate item ID: {item['id']}.")
+        item_ids.add(str(item['id']))
+        feedback = item.get('feedback')
+        if not isinstance(feedback, dict) or not {'correct', 'incorrect'} <= set(feedback):
+            messages.append(f"Item {item['id']} must have correct and incorrect feedback.")
+        if not isinstance(item['zones'], list):
+            messages.append(f"Zones of item {item['id']} must be a list.")
+            continue
+        for zone_uid in item['zones']:
+            if zone_uid not in zone_uids:
+                messages.append(f"Item {item['id']} refers to a zone that does not exist: {zone_uid}.")
+
+    if messages:
+        raise ProblemDataError(messages)
+
+    normalized = dict(data, zones=zones, items=items)
+    normalized[DATA_FORMAT_VERSION_KEY] = DATA_FORMAT_VERSION
+    return normalized
+
+
+def _decode_placements(layout, codes):
+    """
+    Returns the item state dict of the placement `codes` of a compact item state indexed by `layout`.
+    """
+    item_state = {}
+    for item_id, code in zip(layout['items'], codes):
+        if code != NOT_PLACED:
+            item_state[str(item_id)] = {'zone': layout['zones'][code // 2], 'correct': bool(code % 2)}
+    return item_state
+
+
+class ProblemDefinition:
+    """
+    Read-only, indexed view of the author-supplied problem `data`.
+
+    Built once per content version of `data`; exposes constant-time lookups for the
+    structures that handlers used to compute by scanning `data['items']` and `data['zones']`.
+    Items and zones are exposed as read-only mappings and must not be modified by callers.
+    """
+
+    __slots__ = (
+        'fingerprint', 'items', 'items_by_id', 'item_zones', 'zones', 'zones_by_uid',
+        'all_item_ids', 'required_item_ids', 'decoy_item_ids', 'sanitized_display_names', 'sanitized_feedback',
+        'item_image_urls', 'layout', 'layout_fingerprint', '_item_positions', '_zone_indexes',
+    )
+
+    def __init__(self, data, fingerprint=None):
+        self.fingerprint = fingerprint or content_fingerprint(data)
+        # Normalized data (see `normalize_data`) is read without any legacy format handling
+        normalized = is_normalized_data(data)
+
+        items = []
+        items_by_id = {}
+        item_zones = {}
+        item_image_urls = {}
+        sanitized_display_names = {}
+        for raw_item in data.get('items', []):
+            item = MappingProxyType(dict(raw_item))
+            items.append(item)
+            items_by_id[item['id']] = item
+            if normalized:
+                item_zones[item['id']] = tuple(item['zones'])
+                item_image_urls[item['id']] = item.get('imageURL')
+            else:
+                item_zones[item['id']] = self._zones_for_item(item)
+                # Fall back on "backgroundImage" to be backward-compatible.
+                item_image_urls[item['id']] = item.get('imageURL') or item.get('backgroundImage')
+            sanitized_display_names[item['id']] = sanitize_html(item.get('displayName', ''))
+
+        self.items = tuple(items)
+        self.items_by_id = MappingProxyType(items_by_id)
+        self.item_zones = MappingProxyType(item_zones)
+        self.item_image_urls = MappingProxyType(item_image_urls)
+        self.sanitized_display_names = MappingProxyType(sanitized_display_names)
+
+        self.all_item_ids = frozenset(str(item_id) for item_id in items_by_id)
+        self.required_item_ids = frozenset(str(item_id) for item_id, zones in item_zones.items() if zones)
+        self.decoy_item_ids = self.all_item_ids - self.required_item_ids
+
+        migrator = StateMigration(self)
+        zones = []
+        for raw_zone in data.get('zones', []):
+            zone = dict(raw_zone) if normalized else migrator.apply_zone_migrations(raw_zone)
+            zone['title'] = sanitize_html(zone.get('title', ''))
+            zones.append(MappingProxyType(zone))
+
+        self.zones = tuple(zones)
+        self.zones_by_uid = MappingProxyType({zone['uid']: zone for zone in reversed(self.zones)})
+
+        self.sanitized_feedback = MappingProxyType({
+            key: sanitize_html(message or '') for key, message in data.get('feedback', {}).items()
+        })
+
+        self.layout = MappingProxyType({
+            'items': [item['id'] for item in self.items],
+            'zones': [zone['uid'] for zone in self.zones],
+        })
+        self.layout_fingerprint = layout_fingerprint(self.layout)
+        self._item_positions = {str(item_id): position for position, item_id in enumerate(self.layout['items'])}
+        self._zone_indexes = {}
+        for index, uid in enumerate(self.layout['zones']):
+            self._zone_indexes.setdefault(uid, index)
+
+    @staticmethod
+    def _zones_for_item(item):
+        """
+        Returns a tuple of the zones that are valid options for the item, handling the legacy
+        single `zone` format.
+        """
+        if item.get('zones') is not None:
+            return tuple(item['zones'])
+        elif item.get('zone') is not None and item.get('zone') != 'none':
+            return (item['zone'],)
+        else:
+            return ()
+
+    def get_item(self, item_id):
+        """
+        Returns definition (settings) for item identified by `item_id`.
+        """
+        return self.items_by_id[item_id]
+
+    def get_item_zones(self, item_id):
+        """
+        Returns a tuple of the zone UIDs that are valid options for the item identified by `item_id`.
+        """
+        return self.item_zones[item_id]
+
+    def get_zone(self, uid):
+        """
+        Given a zone UID, return that zone, or None.
+        """
+        return self.zones_by_uid.get(uid)
+
+    def encode_item_state(self, item_state):
+        """
+        Returns (migrated) `item_state` in the compact format, indexed by the layout of this definition.
+
+        Returns None if the state cannot be encoded without loss, i.e. if it has entries for items or zones
+        that are not part of the problem anymore.
+        """
+        if not item_state:
+            return {}
+        codes = [NOT_PLACED] * len(self.layout['items'])
+        for item_id, entry in item_state.items():
+            encoded = self.encode_item_state_entry(item_id, entry)
+            if encoded is None:
+                return None
+            position, code = encoded
+            codes[position] = code
+        return {COMPACT_LAYOUT_KEY: self.layout_fingerprint, COMPACT_ITEMS_KEY: codes}
+
+    def encode_item_state_entry(self, item_id, entry):
+        """
+        Returns the position of item `item_id` in the compact format of this definition and the code of its item
+        state `entry` (None if the item is in the bank), or None if they cannot be encoded.
+        """
+        position = self._item_positions.get(item_id)
+        if position is None:
+            return None
+        if entry is None:
+            return position, NOT_PLACED
+        zone_index = self._zone_indexes.get(entry['zone'])
+        if zone_index is None:
+            return None
+        return position, 2 * zone_index + bool(entry['correct'])
+
+    def decode_item_state(self, item_state, layouts=None):
+        """
+        Returns the item state dict of an item state stored in the compact format.
+
+        States indexed by a previous layout of the problem are decoded with the matching layout of `layouts`
+        (a dict of layout fingerprints to layouts). Returns None if the layout of the state is unknown.
+        """
+        if not item_state:
+            return {}
+        fingerprint = item_state[COMPACT_LAYOUT_KEY]
+        if fingerprint == self.layout_fingerprint:
+            layout = self.layout
+        else:
+            layout = (layouts or {}).get(fingerprint)
+            if layout is None:
+                return None
+        return _decode_placements(layout, item_state[COMPACT_ITEMS_KEY])
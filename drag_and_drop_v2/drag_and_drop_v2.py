@@ -5,11 +5,11 @@
 # Imports ###########################################################
 
 from __future__ import absolute_import
-from collections import Counter
 
-import copy
+import hashlib
 import json
 import logging
+from contextlib import contextmanager
 
 import six.moves.urllib.error
 import six.moves.urllib.parse
@@ -17,6 +17,7 @@ import six.moves.urllib.request
 import six
 import webob
 
+from django.utils.translation import get_language
 from xblock.core import XBlock
 from xblock.exceptions import JsonHandlerError
 from xblock.fields import Boolean, Dict, Float, Integer, Scope, String
@@ -29,11 +30,24 @@ except ModuleNotFoundError:  # For backward compatibility with releases older th
     from xblockutils.settings import ThemableXBlockMixin, XBlockWithSettingsMixin
 from web_fragments.fragment import Fragment
 
-from .compat import get_grading_ignore_decoys_waffle_flag
+from .cache import definition_cache, expanded_url_cache, invalidate_usage, student_view_data_cache
+from .compat import grading_ignore_decoys_enabled
 from .default_data import DEFAULT_DATA
+from .definition import (
+    COMPACT_ITEM_STATE_SETTING, COMPACT_ITEMS_KEY, COMPACT_LAYOUT_KEY, NOT_PLACED, ProblemDataError,
+    ProblemDefinition, content_fingerprint, normalize_data
+)
+from .events import (
+    EVENT_SINK_SETTING, GRADE_EVENT, ITEM_DROPPED_EVENT, PROGRESS_EVENT, EventBuffer, load_event_sink
+)
+from .feedback import get_feedback_renderer
+from . import grading
+from .grading import SOLUTION_CORRECT, SOLUTION_INCORRECT, SOLUTION_PARTIAL, LearnerItemStats
+from .indexing import INDEX_CONTENT_TYPE, index_content
+from .instrumentation import INSTRUMENTATION_SETTING, get_reporter, reporting, span, timed
 from .utils import (
     Constants, SHOWANSWER, DummyTranslationService, FeedbackMessage,
-    FeedbackMessages, ItemStats, StateMigration, _clean_data, _, sanitize_html
+    FeedbackMessages, StateMigration, _, request_cached_property, sanitize_html
 )
 
 # Globals ###########################################################
@@ -61,9 +75,9 @@ class DragAndDropBlock(
 
     CATEGORY = "drag-and-drop-v2"
 
-    SOLUTION_CORRECT = "correct"
-    SOLUTION_PARTIAL = "partial"
-    SOLUTION_INCORRECT = "incorrect"
+    SOLUTION_CORRECT = SOLUTION_CORRECT
+    SOLUTION_PARTIAL = SOLUTION_PARTIAL
+    SOLUTION_INCORRECT = SOLUTION_INCORRECT
 
     GRADE_FEEDBACK_CLASSES = {
         SOLUTION_CORRECT: FeedbackMessages.MessageClasses.CORRECT_SOLUTION,
@@ -213,6 +227,26 @@ class DragAndDropBlock(
         enforce_type=True,
     )
 
+    item_state_version = String(
+        help=_(
+            "Format version of the entries stored in item state. "
+            "Empty if entries may still be stored in a legacy format."
+        ),
+        scope=Scope.user_state,
+        default="",
+        enforce_type=True,
+    )
+
+    item_state_layouts = Dict(
+        help=_(
+            "Item and zone layouts of previous versions of the problem, keyed by fingerprint, "
+            "used to read learner item state stored in the compact format."
+        ),
+        scope=Scope.settings,
+        default={},
+        enforce_type=True,
+    )
+
     attempts = Integer(
         help=_("Number of attempts learner used"),
         scope=Scope.user_state,
@@ -249,6 +283,27 @@ class DragAndDropBlock(
 
     block_settings_key = 'drag-and-drop-v2'
 
+    # Settings that `student_view_data` depends on, in addition to the problem `data`
+    STUDENT_VIEW_DATA_SETTINGS = (
+        'display_name', 'mode', 'max_attempts', 'show_title', 'question_text', 'show_question_header',
+        'weight', 'item_background_color', 'item_text_color', 'max_items_per_zone',
+    )
+
+    _compiled_definition = None
+    # Values memoized by `request_cached_property` while a request scope is open, None otherwise
+    _request_cache = None
+    _learner_item_stats = None
+    # Events published while a handler runs, None otherwise
+    _event_buffer = None
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Values derived from fields may be stale once any field is written
+        if self._request_cache and name in self.fields:  # pylint: disable=unsupported-membership-test
+            self._clear_request_cache(name)
+        if name == 'item_state':
+            self._learner_item_stats = None
+
     @property
     def score(self):
         """
@@ -268,7 +323,9 @@ class DragAndDropBlock(
         Returns user's current (saved) score for the problem as raw values.
         """
         if self._get_raw_earned_if_set() is None:
-            self.raw_earned = self._learner_raw_score()
+            score = self._calculate_stored_score()
+            if score is not None:
+                self.raw_earned = score.raw_earned
         return Score(self.raw_earned, self.raw_possible)
 
     def set_score(self, score):
@@ -285,8 +342,33 @@ class DragAndDropBlock(
         """
         Returns a newly-calculated raw score on the problem for the learner
         based on the learner's current state.
+
+        Within a handler, the learner's item statistics are already up to date, and are reused. Otherwise
+        (e.g. when the platform rescores learners), the score is computed by `grading.calculate_score`
+        from the stored fields alone.
+
+        Raises a ValueError if the learner's item state cannot be read (see `_validate_item_state`).
+        """
+        if self._learner_item_stats is not None:
+            return Score(self._learner_raw_score(), self.max_score())
+        score = self._calculate_stored_score()
+        if score is None:
+            raise ValueError(f"Item state of {self.scope_ids.usage_id} is indexed by an unknown layout.")
+        return score
+
+    def _calculate_stored_score(self):
+        """
+        Returns the score of the learner's stored state (see `grading.calculate_score`), or None if their item
+        state cannot be read.
         """
-        return Score(self._learner_raw_score(), self.max_score())
+        return grading.calculate_score(
+            self.data,
+            self.item_state,
+            item_state_version=self.item_state_version,
+            layouts=self.item_state_layouts,
+            ignore_decoys=self.ignore_decoys,
+            definition=self.problem_definition,
+        )
 
     def has_submitted_answer(self):
         """
@@ -315,8 +397,7 @@ class DragAndDropBlock(
         As it is calculated as ratio of correctly placed (or left in bank in case of decoys) items to
         total number of items, it lays in interval [0..1]
         """
-        correct_count, total_count = self._get_item_stats()
-        return correct_count / float(total_count)
+        return grading.raw_score(self._get_learner_item_stats(), self.ignore_decoys)
 
     def _get_statici18n_js_url(self):
         """
@@ -333,32 +414,32 @@ class DragAndDropBlock(
         """
         Player view, displayed to the student
         """
+        with self._instrumented('view.student_view'), self._request_scope():
+            fragment = Fragment()
+            fragment.add_content(loader.render_django_template('/templates/html/drag_and_drop.html',
+                                                               i18n_service=self.i18n_service))
+            css_urls = (
+                'public/css/drag_and_drop.css',
+            )
+            js_urls = [
+                'public/js/vendor/virtual-dom-1.3.0.min.js',
+                'public/js/drag_and_drop.js',
+            ]
 
-        fragment = Fragment()
-        fragment.add_content(loader.render_django_template('/templates/html/drag_and_drop.html',
-                                                           i18n_service=self.i18n_service))
-        css_urls = (
-            'public/css/drag_and_drop.css',
-        )
-        js_urls = [
-            'public/js/vendor/virtual-dom-1.3.0.min.js',
-            'public/js/drag_and_drop.js',
-        ]
-
-        for css_url in css_urls:
-            fragment.add_css_url(self.runtime.local_resource_url(self, css_url))
-        for js_url in js_urls:
-            fragment.add_javascript_url(self.runtime.local_resource_url(self, js_url))
+            for css_url in css_urls:
+                fragment.add_css_url(self.runtime.local_resource_url(self, css_url))
+            for js_url in js_urls:
+                fragment.add_javascript_url(self.runtime.local_resource_url(self, js_url))
 
-        statici18n_js_url = self._get_statici18n_js_url()
-        if statici18n_js_url:
-            fragment.add_javascript_url(statici18n_js_url)
+            statici18n_js_url = self._get_statici18n_js_url()
+            if statici18n_js_url:
+                fragment.add_javascript_url(statici18n_js_url)
 
-        self.include_theme_files(fragment)
+            self.include_theme_files(fragment)
 
-        fragment.initialize_js('DragAndDropBlock', self.student_view_data())
+            fragment.initialize_js('DragAndDropBlock', self.student_view_data())
 
-        return fragment
+            return fragment
 
     def student_view_data(self, context=None):
         """
@@ -366,26 +447,59 @@ class DragAndDropBlock(
         The configuration is all the settings defined by the author, except for correct answers
         and feedback.
         """
+        with self._instrumented('view.student_view_data'), self._request_scope():
+            data = json.loads(self._get_student_view_content_data())
+            data.update({
+                "has_deadline_passed": self.has_submission_deadline_passed,
+                "answer_available": self.is_answer_available,
+            })
+            return data
+
+    def _get_student_view_content_data(self):
+        """
+        Returns the JSON-serialized part of `student_view_data` that depends only on content and settings.
+
+        It is the same for every learner, so it is built once per content version and shared by all
+        instances of this block in the process.
+        """
+        settings = {name: getattr(self, name) for name in self.STUDENT_VIEW_DATA_SETTINGS}
+        settings['graded'] = getattr(self, 'graded', False)
+        settings['url_name'] = getattr(self, 'url_name', '')
+        settings['data'] = self.problem_definition.fingerprint
+        cache_key = (six.text_type(self.scope_ids.usage_id), content_fingerprint(settings))
+
+        return student_view_data_cache.get_or_set(
+            cache_key, lambda: json.dumps(self._build_student_view_content_data()).encode('utf-8')
+        )
+
+    def _build_student_view_content_data(self):
+        """
+        Builds the part of `student_view_data` that depends only on content and settings.
+        """
+
+        definition = self.problem_definition
+        target_img = self.data.get("targetImg")
+        image_urls = list(definition.item_image_urls.values())
+        image_urls = list(dict.fromkeys(url for url in image_urls + [target_img] if url))
+        expanded_urls = dict(zip(image_urls, self._expand_static_urls(image_urls)))
 
         def items_without_answers():
             """
             Removes feedback and answer from items
             """
-            items = copy.deepcopy(self.data.get('items', ''))
-            for item in items:
+            items = []
+            for item_definition in definition.items:
+                item = dict(item_definition)
                 del item['feedback']
                 # Use item.pop to remove both `item['zone']` and `item['zones']`; we don't have
                 # a guarantee that either will be present, so we can't use `del`. Legacy instances
                 # will have `item['zone']`, while current versions will have `item['zones']`.
                 item.pop('zone', None)
                 item.pop('zones', None)
-                # Fall back on "backgroundImage" to be backward-compatible.
-                image_url = item.get('imageURL') or item.get('backgroundImage')
-                if image_url:
-                    item['expandedImageURL'] = self._expand_static_url(image_url)
-                else:
-                    item['expandedImageURL'] = ''
-                item['displayName'] = sanitize_html(item.get('displayName', ''))
+                image_url = definition.item_image_urls[item['id']]
+                item['expandedImageURL'] = expanded_urls[image_url] if image_url else ''
+                item['displayName'] = definition.sanitized_display_names[item['id']]
+                items.append(item)
             return items
 
         return {
@@ -409,13 +523,12 @@ class DragAndDropBlock(
             "show_title": self.show_title,
             "problem_text": sanitize_html(self.question_text),
             "show_problem_header": self.show_question_header,
-            "target_img_expanded_url": self.target_img_expanded_url,
+            "target_img_expanded_url": expanded_urls[target_img] if target_img else self.default_background_image_url,
             "target_img_description": self.target_img_description,
             "item_background_color": self.item_background_color or None,
             "item_text_color": self.item_text_color or None,
-            "has_deadline_passed": self.has_submission_deadline_passed,
-            "answer_available": self.is_answer_available,
             # final feedback (data.feedback.finish) is not included - it may give away answers.
+            # learner-specific "has_deadline_passed" and "answer_available" are added by student_view_data.
         }
 
     def studio_view(self, context):
@@ -485,7 +598,18 @@ class DragAndDropBlock(
     def studio_submit(self, submissions, suffix=''):
         """
         Handles studio save.
+
+        Problem `data` is validated and normalized (see `normalize_data`); invalid data is rejected
+        without saving any of the submitted values.
         """
+        try:
+            data = normalize_data(submissions['data'])
+        except ProblemDataError as error:
+            return {
+                'result': 'error',
+                'messages': error.messages,
+            }
+
         self.display_name = submissions['display_name']
         self.mode = submissions['mode']
         self.max_attempts = submissions['max_attempts']
@@ -500,12 +624,119 @@ class DragAndDropBlock(
         self.item_background_color = submissions['item_background_color']
         self.item_text_color = submissions['item_text_color']
         self.max_items_per_zone = self._get_max_items_per_zone(submissions)
-        self.data = submissions['data']
+        if data != self.data:
+            self._record_item_state_layout(self.problem_definition, ProblemDefinition(data))
+        self.data = data
+
+        # Drop data derived from the previous content and settings, instead of waiting for it to expire
+        self._compiled_definition = None
+        invalidate_usage(definition_cache, self.scope_ids.usage_id)
+        invalidate_usage(student_view_data_cache, self.scope_ids.usage_id)
 
         return {
             'result': 'success',
         }
 
+    def handle(self, handler_name, request, suffix=''):
+        """
+        Handles `request` with this block's runtime.
+
+        Values derived from fields are memoized while the handler runs (see `_request_scope`),
+        and events are published once it is done (see `_buffered_events`).
+        """
+        with self._instrumented(f'handler.{handler_name}'), self._request_scope(), self._buffered_events():
+            return super().handle(handler_name, request, suffix)
+
+    @contextmanager
+    def _instrumented(self, span_name):
+        """
+        Times the body of the context as `span_name`, with the instrumentation reporter configured in
+        XBLOCK_SETTINGS, if any (see `instrumentation`).
+        """
+        config = (self.get_xblock_settings(default={}) or {}).get(INSTRUMENTATION_SETTING)
+        try:
+            reporter = get_reporter(config)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Unable to set up instrumentation with %s, disabling it.', config)
+            reporter = None
+
+        if reporter is None:
+            yield
+            return
+        with reporting(reporter), span(span_name):
+            yield
+
+    @contextmanager
+    def _buffered_events(self):
+        """
+        Collects events published while the context is active, and publishes them once when it exits.
+        Nested contexts share the buffer of the outermost one.
+        """
+        if self._event_buffer is not None:
+            yield
+            return
+
+        self._event_buffer = EventBuffer()
+        try:
+            yield
+        finally:
+            event_buffer, self._event_buffer = self._event_buffer, None
+            with span('publish'):
+                event_buffer.flush(self._send_event)
+
+    def _publish(self, event_type, data):
+        """
+        Publishes an event, or adds it to the event buffer while a handler runs (see `_buffered_events`).
+        """
+        if self._event_buffer is not None:
+            self._event_buffer.add(event_type, data)
+        else:
+            self._send_event(event_type, data)
+
+    def _send_event(self, event_type, data):
+        """
+        Sends an event to the runtime, or tracking events to the event sink configured in XBLOCK_SETTINGS.
+        """
+        if event_type in (GRADE_EVENT, PROGRESS_EVENT):
+            self.runtime.publish(self, event_type, data)
+            return
+        self.event_sink(self, event_type, data)
+
+    @request_cached_property
+    def event_sink(self):
+        """
+        The callable tracking events are sent to: the one configured in XBLOCK_SETTINGS, if any,
+        otherwise one publishing them through the runtime.
+        """
+        sink_path = (self.get_xblock_settings(default={}) or {}).get(EVENT_SINK_SETTING)
+        if sink_path:
+            try:
+                return load_event_sink(sink_path)
+            except (ImportError, AttributeError):
+                logger.exception('Unable to load the event sink %s, publishing events inline.', sink_path)
+        return lambda block, event_type, data: block.runtime.publish(block, event_type, data)
+
+    @contextmanager
+    def _request_scope(self):
+        """
+        Memoizes values derived from fields (`request_cached_property`) and learner item statistics
+        while the context is active. Nested scopes share the memo of the outermost one.
+
+        Memoized values are discarded whenever a field they depend on is assigned; in-place changes to `item_state`
+        must go through `_set_item_state_entry` or `_remove_item_state_entry`.
+        """
+        if self._request_cache is not None:
+            yield
+            return
+
+        self._request_cache = {}
+        self._learner_item_stats = None
+        try:
+            yield
+        finally:
+            self._request_cache = None
+            self._learner_item_stats = None
+
     def _get_block_id(self):
         """
         Return unique ID of this block. Useful for HTML ID attributes.
@@ -557,6 +788,7 @@ class DragAndDropBlock(
         Handles dropping item into a zone.
         """
         self._validate_drop_item(item_attempt)
+        self._validate_item_state()
 
         if self.mode == Constants.ASSESSMENT_MODE:
             return self._drop_item_assessment(item_attempt)
@@ -575,10 +807,60 @@ class DragAndDropBlock(
 
         Raises:
              * JsonHandlerError with 400 error code in standard mode.
-             * JsonHandlerError with 409 error code if no more attempts left
+             * JsonHandlerError with 409 error code if no more attempts left, or if the item state cannot be read.
         """
         self._validate_do_attempt()
+        self._validate_item_state()
+        return self._do_attempt()
+
+    @XBlock.json_handler
+    def drop_items(self, data, suffix=''):
+        """
+        Handles dropping several items into zones in one request.
+
+        Expects `{"items": [{"val": <item id>, "zone": <zone uid>}, ...]}`. All placements are validated
+        before any of them is applied, then applied in order, so the learner's state is written once.
+        In assessment mode, items can be returned to the bank (`"zone": null`), and `"submit": true`
+        checks the resulting solution as `do_attempt` does, returning its result as `attempt`.
+
+        Raises:
+             * JsonHandlerError with 400 error code if any placement is invalid,
+               or if `submit` is requested in standard mode.
+             * JsonHandlerError with 409 error code if no more attempts left in assessment mode,
+               or if the item state cannot be read.
+        """
+        item_attempts = data.get('items') if isinstance(data, dict) else None
+        if not isinstance(item_attempts, list) or not item_attempts:
+            raise JsonHandlerError(400, "Item placements data invalid.")
+        for item_attempt in item_attempts:
+            self._validate_item_placement(item_attempt)
+        self._validate_item_state()
+
+        submit = data.get('submit', False)
+        if submit:
+            self._validate_do_attempt()
 
+        if self.mode == Constants.ASSESSMENT_MODE:
+            if not self.attempts_remain:
+                raise JsonHandlerError(409, self.i18n_service.gettext("Max number of attempts reached"))
+            for item_attempt in item_attempts:
+                self._apply_drop_assessment(item_attempt)
+            result = {'items': [{'val': attempt['val'], 'zone': attempt['zone']} for attempt in item_attempts]}
+            if submit:
+                result['attempt'] = self._do_attempt()
+            return result
+        elif self.mode == Constants.STANDARD_MODE:
+            return self._drop_items_standard(item_attempts)
+        else:
+            raise JsonHandlerError(
+                500,
+                self.i18n_service.gettext("Unknown DnDv2 mode {mode} - course is misconfigured").format(mode=self.mode)
+            )
+
+    def _do_attempt(self):
+        """
+        Checks the current solution, updates grade and item state accordingly and returns feedback.
+        """
         self.attempts += 1
         # TODO: Refactor this method to "freeze" item_state and pass it to methods that need access to it.
         # These implicit dependencies between methods exist because most of them use `item_state` or other
@@ -593,7 +875,7 @@ class DragAndDropBlock(
         for item_id in misplaced_ids:
             # Don't delete misplaced item states on the final attempt.
             if self.attempts_remain:
-                del self.item_state[item_id]
+                self._remove_item_state_entry(item_id)
             misplaced_items.append(self._get_item_definition(int(item_id)))
 
         feedback_msgs = [FeedbackMessage(item['feedback']['incorrect'], None) for item in misplaced_items]
@@ -617,7 +899,7 @@ class DragAndDropBlock(
         except KeyError:
             return {'result': 'error', 'message': 'Missing event_type in JSON data'}
 
-        self.runtime.publish(self, event_type, data)
+        self._publish(event_type, data)
         return {'result': 'success'}
 
     @XBlock.json_handler
@@ -626,6 +908,7 @@ class DragAndDropBlock(
         Resets problem to initial state
         """
         self.item_state = {}
+        self.item_state_version = StateMigration.ITEM_STATE_VERSION
         return self._get_user_state()
 
     @XBlock.json_handler
@@ -662,9 +945,10 @@ class DragAndDropBlock(
     @XBlock.json_handler
     def expand_static_url(self, url, suffix=''):
         """ AJAX-accessible handler for expanding URLs to static [image] files """
-        return {'url': self._expand_static_url(url)}
+        # Not memoized: learners could fill the shared cache with arbitrary strings
+        return {'url': self._expand_static_url(url, memoize=False)}
 
-    @property
+    @request_cached_property
     def i18n_service(self):
         """ Obtains translation service """
         i18n_service = self.runtime.service(self, "i18n")
@@ -691,14 +975,14 @@ class DragAndDropBlock(
         """ The URL to the default background image, shown when no custom background is used """
         return self.runtime.local_resource_url(self, "public/img/triangle.png")
 
-    @property
+    @request_cached_property
     def attempts_remain(self):
         """
         Checks if current student still have more attempts.
         """
         return self.max_attempts is None or self.max_attempts == 0 or self.attempts < self.max_attempts
 
-    @property
+    @request_cached_property
     def has_submission_deadline_passed(self):
         """
         Returns a boolean indicating if the submission is past its deadline.
@@ -740,7 +1024,7 @@ class DragAndDropBlock(
         """
         return self.closed or self.is_correct
 
-    @property
+    @request_cached_property
     def is_answer_available(self):
         """
         Is student allowed to see an answer?
@@ -775,9 +1059,42 @@ class DragAndDropBlock(
 
     @XBlock.handler
     def student_view_user_state(self, request, suffix=''):
-        """ GET all user-specific data, and any applicable feedback """
-        data = self._get_user_state()
-        return webob.Response(body=json.dumps(data).encode('utf-8'), content_type='application/json')
+        """
+        GET all user-specific data, and any applicable feedback
+
+        Responses carry an ETag: requests whose `If-None-Match` header matches the current state
+        are answered with a 304, without computing the user state.
+        """
+        etag = self._get_user_state_etag()
+        if etag in request.if_none_match:
+            response = webob.Response(status=304)
+        else:
+            data = self._get_user_state()
+            response = webob.Response(body=json.dumps(data).encode('utf-8'), content_type='application/json')
+        response.etag = etag
+        # The state is specific to the user, and changes as they interact with the block: always revalidate it.
+        response.cache_control = 'private, no-cache'
+        return response
+
+    def _get_user_state_etag(self):
+        """
+        Returns a version tag of the response of `student_view_user_state`.
+
+        It is derived from the stored fields and settings the user state is computed from, and from the
+        locale of the feedback messages, without migrating the item state or grading it.
+        """
+        version = json.dumps([
+            self.problem_definition.fingerprint,
+            self.item_state,
+            self.attempts,
+            self.raw_earned if self.fields['raw_earned'].is_set_on(self) else None,
+            self.mode,
+            self.weight,
+            self.max_attempts,
+            self.ignore_decoys,
+            get_language(),
+        ], sort_keys=True, default=str)
+        return hashlib.sha1(version.encode('utf-8')).hexdigest()
 
     def _validate_do_attempt(self):
         """
@@ -812,19 +1129,19 @@ class DragAndDropBlock(
             else:
                 feedback_key = 'start'
                 message_class = FeedbackMessages.MessageClasses.INITIAL_FEEDBACK
-            return [FeedbackMessage(self.data['feedback'][feedback_key], message_class)], set()
+            return [self._get_problem_feedback(feedback_key, message_class)], set()
 
         items = self._get_item_raw_stats()
         missing_ids = items.required - items.placed
         misplaced_ids = items.placed - items.correctly_placed
 
         feedback_msgs = []
+        renderer = get_feedback_renderer(self.i18n_service)
 
         def _add_msg_if_exists(ids_list, message_template, message_class):
             """ Adds message to feedback messages if corresponding items list is not empty """
             if ids_list:
-                message = message_template(len(ids_list), self.i18n_service.ngettext)
-                feedback_msgs.append(FeedbackMessage(message, message_class))
+                feedback_msgs.append(renderer.count_message(message_template, len(ids_list), message_class))
 
         if self.item_state or include_item_feedback:
             _add_msg_if_exists(
@@ -845,36 +1162,35 @@ class DragAndDropBlock(
         grade_feedback_class = self.GRADE_FEEDBACK_CLASSES.get(answer_correctness, None)
 
         if self.weight > 0:
-            if self.attempts_remain:
-                grade_feedback_template = FeedbackMessages.GRADE_FEEDBACK_TPL
-            else:
-                grade_feedback_template = FeedbackMessages.FINAL_ATTEMPT_TPL
-
-            feedback_msgs.append(FeedbackMessage(
-                self.i18n_service.gettext(grade_feedback_template).format(score=self.weighted_grade()),
-                grade_feedback_class)
-            )
-
-        problem_feedback_class = None
+            feedback_msgs.append(renderer.grade_message(
+                self.weighted_grade(), grade_feedback_class, final_attempt=not self.attempts_remain
+            ))
 
         if self.attempts_remain and (misplaced_ids or missing_ids):
-            problem_feedback_message = self.data['feedback']['start']
-            problem_feedback_class = FeedbackMessages.MessageClasses.INITIAL_FEEDBACK
+            feedback_msgs.append(self._get_problem_feedback('start', FeedbackMessages.MessageClasses.INITIAL_FEEDBACK))
         else:
-            problem_feedback_message = self.data['feedback']['finish']
-            problem_feedback_class = FeedbackMessages.MessageClasses.FINAL_FEEDBACK
-
-        feedback_msgs.append(FeedbackMessage(problem_feedback_message, problem_feedback_class))
+            feedback_msgs.append(self._get_problem_feedback('finish', FeedbackMessages.MessageClasses.FINAL_FEEDBACK))
 
         return feedback_msgs, misplaced_ids
 
+    def _get_problem_feedback(self, feedback_key, message_class):
+        """
+        Returns the author-supplied problem feedback message `feedback_key` ('start' or 'finish').
+
+        The message is sanitized once per content version, by the problem definition.
+        """
+        return FeedbackMessage(self.problem_definition.sanitized_feedback.get(feedback_key, ''), message_class, True)
+
     @staticmethod
     def _present_feedback(feedback_messages):
         """
         Transforms feedback messages into format expected by frontend code
         """
         return [
-            {"message": sanitize_html(msg.message), "message_class": msg.message_class}
+            {
+                "message": msg.message if msg.safe else sanitize_html(msg.message),
+                "message_class": msg.message_class,
+            }
             for msg in feedback_messages
             if msg.message
         ]
@@ -883,17 +1199,11 @@ class DragAndDropBlock(
         """
         Handles dropping item to a zone in standard mode.
         """
-        item = self._get_item_definition(item_attempt['val'])
-
-        is_correct = self._is_attempt_correct(item_attempt)  # Student placed item in a correct zone
-        if is_correct:  # In standard mode state is only updated when attempt is correct
-            self.item_state[str(item['id'])] = self._make_state_from_attempt(item_attempt, is_correct)
+        item, is_correct = self._apply_drop_standard(item_attempt)
 
         self._mark_complete_and_publish_grade()  # must happen before _get_feedback
         self._publish_item_dropped_event(item_attempt, is_correct)
 
-        item_feedback_key = 'correct' if is_correct else 'incorrect'
-        item_feedback = FeedbackMessage(self._expand_static_url(item['feedback'][item_feedback_key]), None)
         overall_feedback, __ = self._get_feedback()
 
         return {
@@ -901,9 +1211,57 @@ class DragAndDropBlock(
             'grade': self._get_weighted_earned_if_set(),
             'finished': self.is_correct,
             'overall_feedback': self._present_feedback(overall_feedback),
-            'feedback': self._present_feedback([item_feedback])
+            'feedback': self._present_feedback([self._get_item_drop_feedback(item, is_correct)])
         }
 
+    def _drop_items_standard(self, item_attempts):
+        """
+        Handles dropping several items to zones in standard mode, grading the result once.
+        """
+        drops = [self._apply_drop_standard(item_attempt) for item_attempt in item_attempts]
+
+        self._mark_complete_and_publish_grade()  # must happen before _get_feedback
+        for item_attempt, (__, is_correct) in zip(item_attempts, drops):
+            self._publish_item_dropped_event(item_attempt, is_correct)
+
+        overall_feedback, __ = self._get_feedback()
+
+        return {
+            'items': [
+                {
+                    'val': item_attempt['val'],
+                    'correct': is_correct,
+                    'feedback': self._present_feedback([self._get_item_drop_feedback(item, is_correct)]),
+                }
+                for item_attempt, (item, is_correct) in zip(item_attempts, drops)
+            ],
+            'grade': self._get_weighted_earned_if_set(),
+            'finished': self.is_correct,
+            'overall_feedback': self._present_feedback(overall_feedback),
+        }
+
+    def _apply_drop_standard(self, item_attempt):
+        """
+        Updates item state for an item dropped to a zone in standard mode.
+
+        Returns:
+            tuple: (item definition, whether the item was placed in a correct zone)
+        """
+        item = self._get_item_definition(item_attempt['val'])
+
+        is_correct = self._is_attempt_correct(item_attempt)  # Student placed item in a correct zone
+        if is_correct:  # In standard mode state is only updated when attempt is correct
+            self._set_item_state_entry(str(item['id']), self._make_state_from_attempt(item_attempt, is_correct))
+
+        return item, is_correct
+
+    def _get_item_drop_feedback(self, item, is_correct):
+        """
+        Returns the feedback message for an item dropped in standard mode.
+        """
+        item_feedback_key = 'correct' if is_correct else 'incorrect'
+        return FeedbackMessage(self._expand_static_url(item['feedback'][item_feedback_key]), None)
+
     def _drop_item_assessment(self, item_attempt):
         """
         Handles dropping item into a zone in assessment mode
@@ -911,18 +1269,24 @@ class DragAndDropBlock(
         if not self.attempts_remain:
             raise JsonHandlerError(409, self.i18n_service.gettext("Max number of attempts reached"))
 
+        self._apply_drop_assessment(item_attempt)
+
+        return {}
+
+    def _apply_drop_assessment(self, item_attempt):
+        """
+        Updates item state for an item dropped into a zone, or returned to the bank, in assessment mode.
+        """
         item = self._get_item_definition(item_attempt['val'])
         is_correct = self._is_attempt_correct(item_attempt)
         if item_attempt['zone'] is None:
-            self.item_state.pop(str(item['id']), None)
+            self._remove_item_state_entry(str(item['id']))
             self._publish_item_to_bank_event(item['id'], is_correct)
         else:
             # State is always updated in assessment mode to store intermediate item positions
-            self.item_state[str(item['id'])] = self._make_state_from_attempt(item_attempt, is_correct)
+            self._set_item_state_entry(str(item['id']), self._make_state_from_attempt(item_attempt, is_correct))
             self._publish_item_dropped_event(item_attempt, is_correct)
 
-        return {}
-
     def _validate_drop_item(self, item):
         """
         Validates `drop_item` parameters. Assessment mode allows returning
@@ -933,6 +1297,25 @@ class DragAndDropBlock(
             if not zone:
                 raise JsonHandlerError(400, "Item zone data invalid.")
 
+    def _validate_item_placement(self, item_attempt):
+        """
+        Validates a single placement of `drop_items`: the item must exist, and the zone must exist
+        (or be None, i.e. the item bank, in assessment mode).
+        """
+        if not isinstance(item_attempt, dict) or 'zone' not in item_attempt:
+            raise JsonHandlerError(400, "Item placement data invalid.")
+        item_id = item_attempt.get('val')
+        # Booleans are ints, which would match items 0 and 1
+        if isinstance(item_id, bool) or not isinstance(item_id, (int, str)):
+            raise JsonHandlerError(400, "Item placement data invalid.")
+        if item_id not in self.problem_definition.items_by_id:
+            raise JsonHandlerError(400, "Item placement data invalid.")
+        zone_uid = item_attempt['zone']
+        if zone_uid is None and self.mode == Constants.ASSESSMENT_MODE:
+            return
+        if not isinstance(zone_uid, str) or not self._get_zone_by_uid(zone_uid):
+            raise JsonHandlerError(400, "Item zone data invalid.")
+
     @staticmethod
     def _make_state_from_attempt(attempt, correct):
         """
@@ -943,6 +1326,75 @@ class DragAndDropBlock(
             'correct': correct
         }
 
+    def _set_item_state_entry(self, item_id, entry):
+        """
+        Stores item state `entry` for item `item_id`, keeping learner item statistics up to date.
+        """
+        self._upgrade_item_state()
+        if self.item_state_version == StateMigration.COMPACT_ITEM_STATE_VERSION:
+            self._set_compact_item_state_entry(item_id, entry)
+        else:
+            self.item_state[item_id] = entry
+        self._clear_request_cache('item_state')
+        if self._learner_item_stats is not None:
+            self._learner_item_stats.update(item_id, entry)
+
+    def _remove_item_state_entry(self, item_id):
+        """
+        Removes item `item_id` from item state (i.e. returns it to the bank), keeping item statistics up to date.
+        """
+        self._upgrade_item_state()
+        if self.item_state_version == StateMigration.COMPACT_ITEM_STATE_VERSION:
+            self._set_compact_item_state_entry(item_id, None)
+        else:
+            self.item_state.pop(item_id, None)
+        self._clear_request_cache('item_state')
+        if self._learner_item_stats is not None:
+            self._learner_item_stats.remove(item_id)
+
+    def _set_compact_item_state_entry(self, item_id, entry):
+        """
+        Stores item state `entry` (None to remove it) for item `item_id` in item state stored in the compact format
+        and indexed by the current layout (see `_upgrade_item_state`), by updating its code in place rather than
+        decoding and re-encoding the whole state.
+        """
+        definition = self.problem_definition
+        encoded = definition.encode_item_state_entry(item_id, entry)
+        if encoded is None:
+            # Cannot happen for validated placements; keep the entry in the legacy format rather than lose it
+            item_state = self._get_item_state()
+            if entry is None:
+                item_state.pop(item_id, None)
+            else:
+                item_state[item_id] = entry
+            self.item_state = item_state
+            self.item_state_version = StateMigration.ITEM_STATE_VERSION
+            return
+        position, code = encoded
+        if not self.item_state:
+            if entry is None:
+                return
+            self.item_state.update({
+                COMPACT_LAYOUT_KEY: definition.layout_fingerprint,
+                COMPACT_ITEMS_KEY: [NOT_PLACED] * len(definition.layout['items']),
+            })
+        self.item_state[COMPACT_ITEMS_KEY][position] = code
+
+    def _clear_request_cache(self, field_name):
+        """
+        Discards values memoized in the current request scope that may depend on field `field_name`,
+        e.g. after an in-place change of the field.
+        """
+        cache = self._request_cache
+        if not cache:
+            return
+        block_class = type(self)
+        for name in list(cache):
+            fields = getattr(block_class, name).fields
+            if fields is None or field_name in fields:
+                del cache[name]
+
+    @timed('grade')
     def _mark_complete_and_publish_grade(self):
         """
         Helper method to update `self.completed` and submit grade event if appropriate conditions met.
@@ -978,7 +1430,7 @@ class DragAndDropBlock(
             self.publish_grade(self.score)
 
         # and no matter what - emit progress event for current user
-        self.runtime.publish(self, "progress", {})
+        self._publish(PROGRESS_EVENT, {})
 
     def _publish_item_dropped_event(self, attempt, is_correct):
         """
@@ -992,7 +1444,7 @@ class DragAndDropBlock(
         if not item_label:
             item_label = item.get("imageURL")
 
-        self.runtime.publish(self, 'edx.drag_and_drop_v2.item.dropped', {
+        self._publish(ITEM_DROPPED_EVENT, {
             'item': item_label,
             'item_id': item['id'],
             'location': zone.get("title"),
@@ -1010,7 +1462,7 @@ class DragAndDropBlock(
         if not item_label:
             item_label = item.get("imageURL")
 
-        self.runtime.publish(self, 'edx.drag_and_drop_v2.item.dropped', {
+        self._publish(ITEM_DROPPED_EVENT, {
             'item': item_label,
             'item_id': item['id'],
             'location': 'item bank',
@@ -1027,34 +1479,97 @@ class DragAndDropBlock(
         self._publish_grade(score, only_if_higher)
         return {'grade': self.score.raw_earned, 'max_grade': self.score.raw_possible}
 
+    def _publish_grade(self, score, only_if_higher=None):
+        """
+        Publishes a grade, through the event buffer while a handler runs.
+        """
+        self._publish(GRADE_EVENT, {
+            'value': score.raw_earned,
+            'max_value': score.raw_possible,
+            'only_if_higher': only_if_higher,
+        })
+
     def _is_attempt_correct(self, attempt):
         """
         Check if the item was placed correctly.
         """
-        correct_zones = self.get_item_zones(attempt['val'])
-        if correct_zones == [] and attempt['zone'] is None and self.mode == Constants.ASSESSMENT_MODE:
+        correct_zones = self.problem_definition.get_item_zones(attempt['val'])
+        if not correct_zones and attempt['zone'] is None and self.mode == Constants.ASSESSMENT_MODE:
             return True
         return attempt['zone'] in correct_zones
 
-    def _expand_static_url(self, url):
+    def _expand_static_url(self, url, memoize=True):
         """
         This is required to make URLs like '/static/dnd-test-image.png' work (note: that is the
         only portable URL format for static files that works across export/import and reruns).
         This method is unfortunately a bit hackish since XBlock does not provide a low-level API
         for this.
         """
+        return self._expand_static_urls([url], memoize)[0]
+
+    @timed('expand_static_urls')
+    def _expand_static_urls(self, urls, memoize=True):
+        """
+        Expands a list of static URLs (see `_expand_static_url`) with a single call to the runtime.
+
+        URLs are quoted and joined into a single document, which is split back after replacement.
+        Unless `memoize` is unset, results are memoized per course (or other learning context), as they only
+        depend on its static assets; they are not memoized if the block is not part of a known context.
+        """
+        replace_static_urls = self._get_static_urls_replacer()
+        if replace_static_urls is None:
+            return list(urls)
+
+        context_key = self._static_urls_context_key() if memoize else None
+        if context_key is None:
+            expanded = dict.fromkeys(urls)
+        else:
+            expanded = {url: expanded_url_cache.get((context_key, url)) for url in urls}
+        missing = [url for url, expanded_url in expanded.items() if expanded_url is None]
+
+        # Quoted URLs are only matched within a single line, so anything with a newline is expanded on its own.
+        batch = [url for url in missing if '\n' not in url]
+        replaced = replace_static_urls('\n'.join(f'"{url}"' for url in batch)).split('\n') if batch else []
+        if len(replaced) != len(batch):
+            replaced, batch = [], []
+
+        for url, replaced_url in zip(batch, replaced):
+            expanded[url] = replaced_url[1:-1]
+        for url in missing:
+            if url not in batch:
+                expanded[url] = replace_static_urls(f'"{url}"')[1:-1]
+            if context_key is not None:
+                expanded_url_cache.set((context_key, url), expanded[url])
+
+        return [expanded[url] for url in urls]
+
+    def _static_urls_context_key(self):
+        """
+        Returns the key of the course (or other learning context) whose static assets URLs of the block refer to,
+        or None if it is unknown.
+        """
+        context_key = getattr(self.scope_ids.usage_id, 'context_key', None)
+        if context_key is None:
+            context_key = getattr(self.runtime, 'course_id', None)
+        return None if context_key is None else six.text_type(context_key)
+
+    def _get_static_urls_replacer(self):
+        """
+        Returns a function replacing static URLs in a document, or None if the runtime doesn't provide one.
+        """
         if replace_urls_service := self.runtime.service(self, 'replace_urls'):
-            url = replace_urls_service.replace_urls(f'"{url}"')[1:-1]
+            return replace_urls_service.replace_urls
         elif hasattr(self.runtime, 'course_id'):
             # edX Studio uses a different runtime for 'studio_view' than 'student_view',
             # and the 'studio_view' runtime doesn't provide the replace_urls API.
             try:
                 # pylint: disable=import-outside-toplevel
                 from common.djangoapps.static_replace import replace_static_urls
-                url = replace_static_urls('"{}"'.format(url), None, course_id=self.runtime.course_id)[1:-1]
             except ImportError:
-                pass
-        return url
+                return None
+            course_id = self.runtime.course_id
+            return lambda document: replace_static_urls(document, None, course_id=course_id)
+        return None
 
     def _get_user_state(self):
         """ Get all user-specific data, and any applicable feedback """
@@ -1062,8 +1577,10 @@ class DragAndDropBlock(
         # In assessment mode, we do not want to leak the correctness info for individual items to the frontend,
         # so we remove "correct" from all items when in assessment mode.
         if self.mode == Constants.ASSESSMENT_MODE:
-            for item in item_state.values():
-                del item["correct"]
+            item_state = {
+                item_id: {key: value for key, value in item.items() if key != "correct"}
+                for item_id, item in item_state.items()
+            }
 
         overall_feedback_msgs, __ = self._get_feedback()
         if self.mode == Constants.STANDARD_MODE:
@@ -1084,80 +1601,139 @@ class DragAndDropBlock(
         Returns one of the possible correct states for the configured data.
 
         Items dropped by user in the correct zones are retained in those zones.
-        Incorrect items are equally distributed among their correct zones (if more than one zone is correct).
+        Incorrect items are equally distributed among their correct zones (if more than one zone is correct),
+        within the limit of items per zone (see `grading.answer_layout`).
         """
-        state = {}
-        items = copy.deepcopy(self.data.get('items', []))
+        correct_placements = {
+            item_id: item['zone'] for item_id, item in self._get_item_state().items() if item['correct']
+        }
+        layout = grading.answer_layout(self.problem_definition, correct_placements, self.max_items_per_zone)
+        return {'items': {item_id: {'zone': zone, 'correct': True} for item_id, zone in layout.items()}}
+
+    def _get_item_state(self):
+        """
+        Returns the user item state, with all entries migrated to the current format.
+        Converts to a dict if data is stored in legacy tuple form.
 
-        zone_count = Counter()
-        correct_items = set()
+        The returned dict is a new one, but entries that didn't need migrating are shared with
+        `self.item_state`, so they must not be modified by callers.
+        """
+        if self.item_state_version == StateMigration.ITEM_STATE_VERSION:
+            return dict(self.item_state)
 
-        def _get_preferred_zone(zone_count, zones):
-            """
-            Returns the zone with the least number of items.
-            """
-            preferred_zone = None
-            for zone in zones:
-                # Check if the current zone has the least number of items till now
-                if not preferred_zone or zone_count[preferred_zone] > zone_count[zone]:
-                    preferred_zone = zone
+        with span('migrate_item_state'):
+            item_state = grading.migrated_item_state(
+                self.problem_definition, self.item_state, self.item_state_version, self.item_state_layouts
+            )
+        if item_state is None:
+            logger.warning(
+                "Item state of %s is indexed by an unknown layout, showing all items in the bank.",
+                self.scope_ids.usage_id
+            )
+            return {}
+        return item_state
 
-            zone_count[preferred_zone] += 1
-            return preferred_zone
+    def _upgrade_item_state(self):
+        """
+        Persists migrated item state and marks it with the current format version, so that later
+        reads skip migrations entirely. Called before handlers write to `item_state`.
 
-        # Set states of all items dropped in correct zones
-        for item_id in self.item_state:  # pylint: disable=consider-using-dict-items
-            if self.item_state[item_id]['correct']:
-                state[item_id] = self.item_state[item_id]
-                correct_items.add(item_id)
+        The state is converted to (or from) the compact format if it is enabled (or disabled), and
+        compact state indexed by a previous layout of the problem is re-indexed by the current one.
+        """
+        self._validate_item_state()
+        if self.compact_item_state_enabled:
+            if self.item_state_version == StateMigration.COMPACT_ITEM_STATE_VERSION and (
+                    not self.item_state or
+                    self.item_state[COMPACT_LAYOUT_KEY] == self.problem_definition.layout_fingerprint):
+                return
+            self._store_item_state(self._get_item_state())
+            return
 
-                zone = self.item_state[item_id]['zone']
-                zone_count[zone] += 1
+        if self.item_state_version == StateMigration.ITEM_STATE_VERSION:
+            return
 
-        # Set states of rest of the items
-        for item in items:
-            item_id = str(item['id'])
-            if item_id not in correct_items:
-                zones = item.get('zones')
-
-                # For backwards compatibility
-                if zones is None:
-                    zones = []
-                    zone = item.get('zone')
-                    if zone is not None and zone != 'none':
-                        zones.append(zone)
-
-                if zones:
-                    zone = _get_preferred_zone(zone_count, zones)
-                    state[item_id] = {
-                        'zone': zone,
-                        'correct': True,
-                    }
-
-        return {'items': state}
+        item_state = self._get_item_state()
+        if self.item_state_version == StateMigration.COMPACT_ITEM_STATE_VERSION or any(
+                item is not self.item_state[item_id] for item_id, item in six.iteritems(item_state)):
+            self.item_state = item_state
+        self.item_state_version = StateMigration.ITEM_STATE_VERSION
 
-    def _get_item_state(self):
+    def _validate_item_state(self):
         """
-        Returns a copy of the user item state.
-        Converts to a dict if data is stored in legacy tuple form.
+        Refuses to change item state stored in the compact format and indexed by a layout the block doesn't know
+        (e.g. after `data` was changed by a course import), which would otherwise be overwritten with the new
+        placements alone. The state is left untouched, so that it can be read once the layout is known again.
+
+        Raises:
+             * JsonHandlerError with 409 error code if the item state cannot be read.
+        """
+        if self.item_state_version != StateMigration.COMPACT_ITEM_STATE_VERSION or not self.item_state:
+            return
+        layout = self.item_state[COMPACT_LAYOUT_KEY]
+        if layout != self.problem_definition.layout_fingerprint and layout not in self.item_state_layouts:
+            raise JsonHandlerError(409, "Item state cannot be read: it was saved for another version of the problem.")
+
+    def _store_item_state(self, item_state):
+        """
+        Stores the (migrated) `item_state`, in the compact format if it is enabled and the state can be encoded.
+        """
+        if self.compact_item_state_enabled:
+            compact_item_state = self.problem_definition.encode_item_state(item_state)
+            if compact_item_state is not None:
+                self.item_state = compact_item_state
+                self.item_state_version = StateMigration.COMPACT_ITEM_STATE_VERSION
+                return
+        self.item_state = item_state
+        self.item_state_version = StateMigration.ITEM_STATE_VERSION
+
+    @request_cached_property
+    def compact_item_state_enabled(self):
+        """
+        Whether item state is written in the compact format, as configured in the `compact_item_state` entry
+        of the block's XBLOCK_SETTINGS. Item state is read in either format regardless.
         """
+        return bool((self.get_xblock_settings(default={}) or {}).get(COMPACT_ITEM_STATE_SETTING))
 
-        # IMPORTANT: this method should always return a COPY of self.item_state - it is called from
-        # student_view_user_state handler and the data it returns is manipulated there to hide
-        # correctness of items placed.
-        state = {}
-        migrator = StateMigration(self)
+    def _record_item_state_layout(self, definition, new_definition):
+        """
+        Keeps the layout of a previous problem `definition` replaced by `new_definition`, so that compact item
+        state indexed by it can still be read.
+
+        Layouts are never dropped: Studio saves drafts, so the block can't tell which layouts learners may have
+        written state with. Only layouts that differ from the new one are recorded, so the field grows with the
+        number of distinct sets of items and zones the problem had, not with the number of saves.
+        """
+        fingerprint = definition.layout_fingerprint
+        if fingerprint == new_definition.layout_fingerprint or fingerprint in self.item_state_layouts:
+            return
+        layouts = dict(self.item_state_layouts)
+        layouts[fingerprint] = {'items': list(definition.layout['items']), 'zones': list(definition.layout['zones'])}
+        self.item_state_layouts = layouts
 
-        for item_id, item in six.iteritems(self.item_state):
-            state[item_id] = migrator.apply_item_state_migrations(item_id, item)
+    @request_cached_property.depending_on('data')
+    def problem_definition(self):
+        """
+        Compiled, read-only view of the problem `data`.
 
-        return state
+        Rebuilt only when the content of `data` changes, so that handlers can look up items
+        and zones by ID instead of scanning (and migrating) the raw data on every access.
+        Compiled definitions are shared by all instances of this block in the process.
+        """
+        fingerprint = content_fingerprint(self.data)
+        definition = self._compiled_definition
+        if definition is None or definition.fingerprint != fingerprint:
+            definition = self._compiled_definition = definition_cache.get_or_set(
+                (six.text_type(self.scope_ids.usage_id), fingerprint),
+                lambda: ProblemDefinition(self.data, fingerprint),
+            )
+        return definition
 
     def _get_item_definition(self, item_id):
         """
         Returns definition (settings) for item identified by `item_id`.
         """
-        return next(i for i in self.data['items'] if i['id'] == item_id)
+        return self.problem_definition.get_item(item_id)
 
     def get_item_zones(self, item_id):
         """
@@ -1169,57 +1745,49 @@ class DragAndDropBlock(
         any zones, or if it's configured explicitly with no zones, return an
         empty list.
         """
-        item = self._get_item_definition(item_id)
-        if item.get('zones') is not None:
-            return item.get('zones')
-        elif item.get('zone') is not None and item.get('zone') != 'none':
-            return [item.get('zone')]
-        else:
-            return []
+        return list(self.problem_definition.get_item_zones(item_id))
 
-    @property
+    @request_cached_property.depending_on('data')
     def zones(self):
         """
         Get drop zone data, defined by the author.
         """
-        # Convert zone data from old to new format if necessary
-        migrator = StateMigration(self)
-        migrated_zones = []
-
-        for zone in self.data.get('zones', []):
-            result = migrator.apply_zone_migrations(zone)
-            result['title'] = sanitize_html(result.get('title', ''))
-            migrated_zones.append(result)
-
-        return migrated_zones
+        # Zones are migrated from old to new format and sanitized when the definition is compiled
+        return [dict(zone) for zone in self.problem_definition.zones]
 
     def _get_zone_by_uid(self, uid):
         """
         Given a zone UID, return that zone, or None.
         """
-        for zone in self.zones:
-            if zone["uid"] == uid:
-                return zone
-        return None
+        return self.problem_definition.get_zone(uid)
+
+    def _get_learner_item_stats(self):
+        """
+        Returns grading statistics of the learner's current item state.
+
+        Within a request scope, statistics are computed once and updated incrementally by
+        `_set_item_state_entry` and `_remove_item_state_entry`; otherwise they are computed on each call.
+        """
+        stats = self._learner_item_stats
+        if stats is None:
+            stats = LearnerItemStats(self.problem_definition, self._get_item_state())
+            if self._request_cache is not None:
+                self._learner_item_stats = stats
+        return stats
+
+    @request_cached_property
+    def ignore_decoys(self):
+        """
+        Whether decoy items are left out of the grade, in the course of this block.
+        """
+        return hasattr(self.runtime, 'course_id') and grading_ignore_decoys_enabled(self.runtime.course_id)
 
     def _get_item_stats(self):
         """
         Returns a tuple representing the number of correctly placed items,
         and the total number of items required (including decoy items).
         """
-        items = self._get_item_raw_stats()
-
-        correct_count = len(items.correctly_placed)
-        total_count = len(items.required)
-
-        if hasattr(self.runtime, 'course_id') and \
-                get_grading_ignore_decoys_waffle_flag().is_enabled(self.runtime.course_id):
-            return correct_count, total_count
-
-        correct_count += len(items.decoy_in_bank)
-        total_count += len(items.decoy)
-
-        return correct_count, total_count
+        return self._get_learner_item_stats().counts(self.ignore_decoys)
 
     def _get_item_raw_stats(self):
         """
@@ -1234,16 +1802,7 @@ class DragAndDropBlock(
                 * decoy - IDs of decoy items
                 * decoy_in_bank - IDs of decoy items that were unplaced
         """
-        item_state = self._get_item_state()
-
-        all_items = set(str(item['id']) for item in self.data['items'])
-        required = set(item_id for item_id in all_items if self.get_item_zones(int(item_id)) != [])
-        placed = set(item_id for item_id in all_items if item_id in item_state)
-        correctly_placed = set(item_id for item_id in placed if item_state[item_id]['correct'])
-        decoy = all_items - required
-        decoy_in_bank = set(item_id for item_id in decoy if item_id not in item_state)
-
-        return ItemStats(required, placed, correctly_placed, decoy, decoy_in_bank)
+        return self._get_learner_item_stats().item_stats()
 
     def _get_raw_earned_if_set(self):
         """
@@ -1275,15 +1834,9 @@ class DragAndDropBlock(
                 * Partial: Some items are at their correct place.
                 * Incorrect: None items are at their correct place.
         """
-        correct_count, total_count = self._get_item_stats()
-        if correct_count == total_count:
-            return self.SOLUTION_CORRECT
-        elif correct_count == 0:
-            return self.SOLUTION_INCORRECT
-        else:
-            return self.SOLUTION_PARTIAL
+        return grading.answer_correctness(self._get_learner_item_stats(), self.ignore_decoys)
 
-    @property
+    @request_cached_property
     def is_correct(self):
         """
         Helper - checks if answer is correct
@@ -1319,45 +1872,16 @@ class DragAndDropBlock(
 
         xblock_body = super().index_dictionary()
 
-        zones_display_names = {
-            "zone_{}_display_name".format(zone_i):
-                _clean_data(zone.get("title", ""))
-            for zone_i, zone in enumerate(self.data.get("zones", []))
-        }
-
-        zones_description = {
-            "zone_{}_description".format(zone_i):
-                _clean_data(zone.get("description", ""))
-            for zone_i, zone in enumerate(self.data.get("zones", []))
-        }
-
-        items_display_names = {
-            "item_{}_display_name".format(item_i):
-                _clean_data(item.get("displayName", ""))
-            for item_i, item in enumerate(self.data.get("items", []))
-        }
-
-        items_image_description = {
-            "item_{}_image_description".format(item_i):
-                _clean_data(item.get("imageDescription", ""))
-            for item_i, item in enumerate(self.data.get("items", []))
-        }
-
-        index_body = {
-            "display_name": self.display_name,
-            "question_text": _clean_data(self.question_text),
-            "background_image_description": self.data.get("targetImgDescription", ""),
-        }
-        index_body.update(items_display_names)
-        index_body.update(items_image_description)
-        index_body.update(zones_display_names)
-        index_body.update(zones_description)
+        # The text of the problem data is extracted once per content version
+        index_body = index_content(
+            self.data, self.display_name, self.question_text, fingerprint=self.problem_definition.fingerprint
+        )
 
         if "content" in xblock_body:
             xblock_body["content"].update(index_body)
         else:
             xblock_body["content"] = index_body
 
-        xblock_body["content_type"] = "Drag and Drop"
+        xblock_body["content_type"] = INDEX_CONTENT_TYPE
 
         return xblock_body
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+""" Drag and Drop v2 XBlock - Feedback rendering """
+from __future__ import absolute_import
+
+from django.utils.translation import get_language
+
+from .cache import LRUCache
+from .utils import FeedbackMessage, FeedbackMessages
+
+# Number of locales (per translation service class) whose renderers are kept
+FEEDBACK_RENDERER_CACHE_SIZE = 64
+
+
+class FeedbackRenderer:
+    """
+    Builds the overall feedback messages of one locale.
+
+    Templates are translated once, when the renderer is built, and the translated plural forms are formatted
+    once per item count. The messages are built from trusted templates and numbers only, so they are marked as
+    safe, and are not sanitized again when presented.
+    """
+
+    def __init__(self, i18n_service):
+        self._ngettext = i18n_service.ngettext
+        self._grade_template = i18n_service.gettext(FeedbackMessages.GRADE_FEEDBACK_TPL)
+        self._final_attempt_template = i18n_service.gettext(FeedbackMessages.FINAL_ATTEMPT_TPL)
+        # (message template, number) -> formatted message
+        self._count_messages = {}
+
+    def count_message(self, message_template, number, message_class):
+        """
+        Returns the feedback message of `message_template` (one of the `FeedbackMessages` formatters) for `number`.
+        """
+        key = (message_template, number)
+        message = self._count_messages.get(key)
+        if message is None:
+            message = self._count_messages[key] = message_template(number, self._ngettext)
+        return FeedbackMessage(message, message_class, True)
+
+    def grade_message(self, score, message_class, final_attempt=False):
+        """
+        Returns the feedback message reporting the highest `score` of the learner.
+        """
+        template = self._final_attempt_template if final_attempt else self._grade_template
+        return FeedbackMessage(template.format(score=score), message_class, True)
+
+
+_renderers = LRUCache(FEEDBACK_RENDERER_CACHE_SIZE, name='feedback_renderer')
+
+
+def get_feedback_renderer(i18n_service):
+    """
+    Returns the (shared) feedback renderer of the active locale of `i18n_service`.
+    """
+    return _renderers.get_or_set((type(i18n_service), get_language()), lambda: FeedbackRenderer(i18n_service))
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Drag and Drop v2 XBlock - Grading
+
+Pure functions computing a learner's score from the problem data and the learner's stored state, without a block
+or a runtime, so that scores can be computed in bulk (e.g. by asynchronous grading tasks):
+
+    score = calculate_score(data, item_state, item_state_version=version, ignore_decoys=ignore_decoys)
+
+The block's scoring methods delegate to them.
+"""
+from __future__ import absolute_import
+
+from collections import Counter, deque
+
+from xblock.scorable import Score
+
+from .cache import answer_layout_cache
+from .definition import ProblemDefinition
+from .utils import ItemStats, StateMigration
+
+# Overall correctness of a learner's answer (see `answer_correctness`)
+SOLUTION_CORRECT = "correct"
+SOLUTION_PARTIAL = "partial"
+SOLUTION_INCORRECT = "incorrect"
+
+
+class LearnerItemStats:
+    """
+    Grading statistics of a learner's item state, maintained incrementally.
+
+    Built once from the (migrated) item state, then kept up to date in constant time as single
+    item state entries are set or removed, instead of being recomputed from scratch.
+    """
+
+    def __init__(self, definition, item_state):
+        self.definition = definition
+        self.placed = set()
+        self.correctly_placed = set()
+        self.decoy_in_bank = set(definition.decoy_item_ids)
+        for item_id, entry in item_state.items():
+            self.update(item_id, entry)
+
+    def update(self, item_id, entry):
+        """
+        Records that item `item_id` was placed according to the item state `entry`.
+        """
+        if item_id not in self.definition.all_item_ids:
+            return
+        self.placed.add(item_id)
+        self.decoy_in_bank.discard(item_id)
+        if entry['correct']:
+            self.correctly_placed.add(item_id)
+        else:
+            self.correctly_placed.discard(item_id)
+
+    def remove(self, item_id):
+        """
+        Records that item `item_id` was returned to the item bank.
+        """
+        self.placed.discard(item_id)
+        self.correctly_placed.discard(item_id)
+        if item_id in self.definition.decoy_item_ids:
+            self.decoy_in_bank.add(item_id)
+
+    def item_stats(self):
+        """
+        Returns a copy of the statistics as an `ItemStats` named tuple.
+        """
+        return ItemStats(
+            set(self.definition.required_item_ids),
+            set(self.placed),
+            set(self.correctly_placed),
+            set(self.definition.decoy_item_ids),
+            set(self.decoy_in_bank),
+        )
+
+    def counts(self, ignore_decoys=False):
+        """
+        Returns a tuple of the number of correctly placed items, and the total number of items
+        required (including decoy items, unless `ignore_decoys` is set).
+        """
+        correct_count = len(self.correctly_placed)
+        total_count = len(self.definition.required_item_ids)
+
+        if ignore_decoys:
+            return correct_count, total_count
+
+        return correct_count + len(self.decoy_in_bank), total_count + len(self.definition.decoy_item_ids)
+
+
+def migrated_item_state(definition, item_state, item_state_version='', layouts=None):
+    """
+    Returns a learner's stored `item_state` as a dict of item IDs to entries in the current format.
+
+    Compact item state is decoded, with the previous `layouts` of the problem if needed; None is returned if it is
+    indexed by an unknown layout. Entries that didn't need migrating are shared with `item_state`, so they must not
+    be modified by callers.
+    """
+    if item_state_version == StateMigration.ITEM_STATE_VERSION:
+        return dict(item_state)
+    if item_state_version == StateMigration.COMPACT_ITEM_STATE_VERSION:
+        return definition.decode_item_state(item_state, layouts)
+
+    migrator = StateMigration(definition)
+    return {
+        item_id: migrator.apply_item_state_migrations(item_id, item)
+        for item_id, item in item_state.items()
+    }
+
+
+def raw_score(stats, ignore_decoys=False):
+    """
+    Returns the raw score of a learner's `LearnerItemStats`: the ratio of correctly placed (or, for decoys, left in
+    the bank) items to the total number of items, in [0..1].
+    """
+    correct_count, total_count = stats.counts(ignore_decoys)
+    return correct_count / float(total_count)
+
+
+def answer_correctness(stats, ignore_decoys=False):
+    """
+    Returns whether all (SOLUTION_CORRECT), some (SOLUTION_PARTIAL) or none (SOLUTION_INCORRECT) of the items
+    of a learner's `LearnerItemStats` are in their correct place.
+    """
+    correct_count, total_count = stats.counts(ignore_decoys)
+    if correct_count == total_count:
+        return SOLUTION_CORRECT
+    elif correct_count == 0:
+        return SOLUTION_INCORRECT
+    else:
+        return SOLUTION_PARTIAL
+
+
+def calculate_score(data, item_state, *, item_state_version='', layouts=None, ignore_decoys=False, definition=None):
+    """
+    Returns the `Score` of a learner's stored state for problem `data`, as `DragAndDropBlock.calculate_score` does.
+
+    `item_state`, `item_state_version` and `layouts` are the values of the block's `item_state`,
+    `item_state_version` and `item_state_layouts` fields, and `ignore_decoys` is set as the `grading_ignore_decoys`
+    waffle flag is for the course. A compiled `definition` of `data` can be passed to avoid compiling it again.
+    Returns None if the item state is indexed by an unknown layout, so that callers keep the saved score.
+    """
+    if definition is None:
+        definition = ProblemDefinition(data)
+    item_state = migrated_item_state(definition, item_state, item_state_version, layouts)
+    if item_state is None:
+        return None
+    return Score(raw_score(LearnerItemStats(definition, item_state), ignore_decoys), 1)
+
+
+def get_score(data, item_state, raw_earned=None, raw_possible=1, **kwargs):
+    """
+    Returns the saved `Score` of a learner, as `DragAndDropBlock.get_score` does: `raw_earned` if it was set,
+    otherwise the score calculated from their item state (see `calculate_score` for `kwargs`), or None if it cannot
+    be calculated.
+    """
+    if raw_earned is None:
+        score = calculate_score(data, item_state, **kwargs)
+        if score is None:
+            return None
+        raw_earned = score.raw_earned
+    return Score(raw_earned, raw_possible)
+
+
+def answer_layout(definition, correct_placements, max_items_per_zone=None):
+    """
+    Returns one of the correct layouts of the items of the problem `definition`, as a dict of item IDs to zone UIDs.
+
+    Items of `correct_placements` (a dict of item IDs to the zones a learner correctly placed them in) are kept in
+    place. Each other item that has correct zones is put into the least filled of them. No zone receives more than
+    `max_items_per_zone` items, unless there is no way to place all items within that limit.
+
+    Memoized per content version, learner placements and limit; the returned dict must not be modified.
+    """
+    key = (definition.fingerprint, max_items_per_zone, frozenset(correct_placements.items()))
+    return answer_layout_cache.get_or_set(
+        key, lambda: _solve_answer_layout(definition, correct_placements, max_items_per_zone)
+    )
+
+
+def _solve_answer_layout(definition, correct_placements, capacity):
+    """
+    Computes the answer layout of `answer_layout`, placing items one at a time.
+
+    When all correct zones of an item are full, room is made by moving previously placed items to other
+    correct zones of theirs (an augmenting path of the assignment of items to zones with capacities).
+    """
+    layout = dict(correct_placements)
+    loads = Counter(correct_placements.values())
+    # Items placed by the solver, which can be moved, in each zone
+    members = {}
+    item_zones = {str(item_id): zones for item_id, zones in definition.item_zones.items()}
+
+    def has_room(zone):
+        return capacity is None or loads[zone] < capacity
+
+    def place(item_id, zone):
+        layout[item_id] = zone
+        loads[zone] += 1
+        members.setdefault(zone, {})[item_id] = None
+
+    def move(item_id, source, target):
+        del members[source][item_id]
+        loads[source] -= 1
+        place(item_id, target)
+
+    def make_room(zones):
+        """
+        Frees room in one of the full `zones` by moving placed items along a chain of zones; returns the zone.
+        """
+        # Zone -> (item moved into the zone, zone it is moved from)
+        parents = dict.fromkeys(zones)
+        queue = deque(zones)
+        while queue:
+            zone = queue.popleft()
+            for item_id in list(members.get(zone, ())):
+                for other_zone in item_zones[item_id]:
+                    if other_zone in parents:
+                        continue
+                    parents[other_zone] = (item_id, zone)
+                    if not has_room(other_zone):
+                        queue.append(other_zone)
+                        continue
+                    while parents[other_zone] is not None:
+                        moved_item_id, source = parents[other_zone]
+                        move(moved_item_id, source, other_zone)
+                        other_zone = source
+                    return other_zone
+        return None
+
+    for item_id, zones in item_zones.items():
+        if item_id in layout or not zones:
+            continue
+        free_zones = [zone for zone in zones if has_room(zone)]
+        if free_zones:
+            zone = min(free_zones, key=loads.__getitem__)
+        else:
+            zone = make_room(zones)
+            if zone is None:
+                # The limit cannot be honoured: fall back on the least filled zone
+                zone = min(zones, key=loads.__getitem__)
+        place(item_id, zone)
+
+    return layout
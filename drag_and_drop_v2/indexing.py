@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Drag and Drop v2 XBlock - Courseware search indexing
+
+Builds the search index documents of problems. The text of problem `data` is extracted in a single pass over its
+zones and items, with the tag-stripping fast path `html_to_text`, and memoized per content version. Documents of many
+problems (blocks, or raw `data` dicts) can be streamed with `index_documents`, e.g. when a whole course is reindexed:
+
+    for document in index_documents(course_blocks):
+        ...
+"""
+from __future__ import absolute_import
+
+from .cache import index_content_cache
+from .definition import content_fingerprint
+from .utils import html_to_text
+
+# `content_type` of the index documents of problems
+INDEX_CONTENT_TYPE = "Drag and Drop"
+
+
+def data_index_content(data, fingerprint=None):
+    """
+    Returns a dict of the plain text of problem `data` to index: titles and descriptions of zones, names and image
+    descriptions of items, and the description of the background image.
+
+    Memoized per content `fingerprint` of `data` (computed if not given); the returned dict must not be modified.
+    """
+    if fingerprint is None:
+        fingerprint = content_fingerprint(data)
+    return index_content_cache.get_or_set(fingerprint, lambda: _extract_data_index_content(data))
+
+
+def _extract_data_index_content(data):
+    """
+    Extracts the plain text of problem `data` to index.
+    """
+    content = {}
+    for index, zone in enumerate(data.get("zones", [])):
+        content[f"zone_{index}_display_name"] = html_to_text(zone.get("title", ""))
+        content[f"zone_{index}_description"] = html_to_text(zone.get("description", ""))
+    for index, item in enumerate(data.get("items", [])):
+        content[f"item_{index}_display_name"] = html_to_text(item.get("displayName", ""))
+        content[f"item_{index}_image_description"] = html_to_text(item.get("imageDescription", ""))
+    content["background_image_description"] = data.get("targetImgDescription", "")
+    return content
+
+
+def index_content(data, display_name="", question_text="", fingerprint=None):
+    """
+    Returns the `content` of the search index document of a problem.
+    """
+    content = {
+        "display_name": display_name,
+        "question_text": html_to_text(question_text),
+    }
+    content.update(data_index_content(data, fingerprint))
+    return content
+
+
+def index_documents(sources):
+    """
+    Yields the search index document of each problem of `sources`, an iterable of blocks or of raw `data` dicts.
+
+    Sources are consumed lazily, one at a time, so that a whole course can be indexed without loading all of its
+    problems at once.
+    """
+    for source in sources:
+        if isinstance(source, dict):
+            yield {"content": index_content(source), "content_type": INDEX_CONTENT_TYPE}
+        else:
+            yield source.index_dictionary()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Drag and Drop v2 XBlock - Opt-in instrumentation
+
+Times handlers and their main phases, and counts cache hits and misses and sanitizer calls, while a reporter is
+active (see `reporting`). The block activates the reporter configured in the `instrumentation` entry of its
+XBLOCK_SETTINGS for each handler and view:
+
+    "drag-and-drop-v2": {
+        "instrumentation": {"reporter": "statsd", "host": "127.0.0.1", "port": 8125, "prefix": "dndv2"}
+    }
+
+`reporter` is one of `logging`, `statsd` or `memory`, or the dotted path of a reporter class, which is passed the
+other entries as keyword arguments. Without a reporter, spans and counters cost a context variable lookup.
+"""
+from __future__ import absolute_import
+
+import contextlib
+import contextvars
+import functools
+import importlib
+import json
+import logging
+import socket
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Key of the XBLOCK_SETTINGS entry holding the instrumentation configuration
+INSTRUMENTATION_SETTING = 'instrumentation'
+
+_current_reporter = contextvars.ContextVar('drag_and_drop_v2_reporter', default=None)
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class LoggingReporter:
+    """
+    Reports timings and counters as log messages.
+    """
+
+    def __init__(self, level=logging.INFO):
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def timing(self, name, seconds):
+        logger.log(self.level, '%s took %.3f ms', name, seconds * 1000)
+
+    def increment(self, name, value=1):
+        logger.log(self.level, '%s +%d', name, value)
+
+
+class StatsdReporter:
+    """
+    Reports timings and counters in the statsd format, over UDP, to a (local) collector.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='drag_and_drop_v2'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, metric):
+        try:
+            self._socket.sendto(f'{self.prefix}.{metric}'.encode('utf-8'), self.address)
+        except OSError:
+            pass  # Metrics are best effort: never fail a request because of them
+
+    def timing(self, name, seconds):
+        self._send(f'{name}:{seconds * 1000:.3f}|ms')
+
+    def increment(self, name, value=1):
+        self._send(f'{name}:{value}|c')
+
+
+class MemoryReporter:
+    """
+    Records timings and counters in memory, e.g. for tests.
+    """
+
+    def __init__(self):
+        self.timings = []
+        self.counters = Counter()
+
+    def timing(self, name, seconds):
+        self.timings.append((name, seconds))
+
+    def increment(self, name, value=1):
+        self.counters[name] += value
+
+    def clear(self):
+        self.timings = []
+        self.counters.clear()
+
+
+REPORTERS = {
+    'logging': LoggingReporter,
+    'statsd': StatsdReporter,
+    'memory': MemoryReporter,
+}
+
+
+def get_reporter(config):
+    """
+    Returns the reporter described by an instrumentation configuration dict, or None if it is empty.
+
+    Reporters are built once per configuration, and reused for all requests.
+    """
+    if not config:
+        return None
+    return _build_reporter(json.dumps(config, sort_keys=True))
+
+
+@functools.lru_cache(maxsize=None)
+def _build_reporter(serialized_config):
+    """
+    Builds the reporter of a JSON-serialized configuration.
+    """
+    options = json.loads(serialized_config)
+    name = options.pop('reporter', 'logging')
+    reporter_class = REPORTERS.get(name)
+    if reporter_class is None:
+        module_name, __, class_name = name.rpartition('.')
+        reporter_class = getattr(importlib.import_module(module_name), class_name)
+    return reporter_class(**options)
+
+
+@contextlib.contextmanager
+def reporting(reporter):
+    """
+    Makes `reporter` the active reporter while the context is active.
+    """
+    token = _current_reporter.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _current_reporter.reset(token)
+
+
+def span(name):
+    """
+    Returns a context manager timing its body as `name`, if a reporter is active.
+    """
+    reporter = _current_reporter.get()
+    if reporter is None:
+        return _NULL_SPAN
+    return _Span(reporter, name)
+
+
+def timed(name):
+    """
+    Decorator timing calls of the decorated function as `name`, if a reporter is active.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            reporter = _current_reporter.get()
+            if reporter is None:
+                return func(*args, **kwargs)
+            with _Span(reporter, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def increment(name, value=1):
+    """
+    Increments counter `name`, if a reporter is active.
+    """
+    reporter = _current_reporter.get()
+    if reporter is not None:
+        reporter.increment(name, value)
+
+
+class _Span:
+    """
+    Context manager reporting the time spent in its body.
+    """
+
+    __slots__ = ('reporter', 'name', 'start')
+
+    def __init__(self, reporter, name):
+        self.reporter = reporter
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.reporter.timing(self.name, time.perf_counter() - self.start)
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Drag and Drop v2 XBlock - Bulk migration of legacy content and learner state
+
+Applies the migrations that blocks otherwise apply lazily, on every read, ahead of time: problem `data` is
+normalized (see `definition.normalize_data`), and learner `item_state` is migrated to the current format (see
+`StateMigration`). Works on a dump of block records (JSON lines, optionally gzipped), writing the upgraded
+records to another file, or on an exported course (OLX), whose files are upgraded in place:
+
+    drag-and-drop-v2-migrate [--dry-run] [--processes N] records.jsonl.gz --output upgraded.jsonl
+    drag-and-drop-v2-migrate [--dry-run] [--processes N] course/
+
+Records of a dump are content records, `{"usage_id": ..., "data": {...}}`, and learner state records,
+`{"usage_id": ..., "user": ..., "state": {...}}`, where `state` holds the values of the block's user state
+fields as stored in the courseware student module table. The content record of a block must come before the
+learner state records of the block, with the content records of fewer than `MIGRATION_PROBLEM_CACHE_SIZE` other
+blocks in between (e.g. state records grouped by block, right after its content record).
+"""
+from __future__ import absolute_import
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+from xml.sax.saxutils import escape
+
+from .bulk import chunks, map_in_pool, open_text
+from .cache import LRUCache
+from .definition import ProblemDataError, ProblemDefinition, normalize_data
+from .grading import migrated_item_state
+from .utils import StateMigration
+
+# Number of records migrated by a worker, and written back, at a time.
+MIGRATION_CHUNK_SIZE = 1000
+# Tag of the OLX elements of the block
+OLX_TAG = 'drag-and-drop-v2'
+# Start tags of the OLX elements of the block, and their `data` attribute
+_OLX_START_TAG_RE = re.compile('<' + OLX_TAG + r'''(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*/?>''')
+_OLX_ATTRIBUTE_RE = re.compile(r'''\s+([^\s=/>]+)\s*=\s*("[^"]*"|'[^']*')''')
+# Number of records with errors listed in reports
+MAX_REPORTED_ERRORS = 100
+# Number of blocks whose problem `data`, and compiled definition, are kept while migrating a dump of records.
+# Learner state records of blocks whose content was read longer ago than that can't be migrated.
+MIGRATION_PROBLEM_CACHE_SIZE = 1024
+
+MigrationResult = namedtuple('MigrationResult', [
+    'record',  # Upgraded record, or the original record if it was not upgraded
+    'upgraded',  # Whether the record was upgraded, and needs to be written back
+    'errors',  # List of the problems that prevented upgrading the record
+])
+
+
+def migrate_content_record(record):
+    """
+    Returns the `MigrationResult` of a content record, whose `data` is normalized.
+    """
+    try:
+        data = normalize_data(record['data'])
+    except ProblemDataError as error:
+        return MigrationResult(record, False, error.messages)
+    if data == record['data']:
+        return MigrationResult(record, False, [])
+    return MigrationResult(dict(record, data=data), True, [])
+
+
+def migrate_state_record(record, definition):
+    """
+    Returns the `MigrationResult` of a learner state record of the problem `definition`, whose item state entries
+    are migrated to the current format, as the block does before writing item state.
+
+    Item state already in the current format, or in the compact format, is left as is.
+    """
+    state = record['state']
+    item_state_version = state.get('item_state_version', '')
+    if not state.get('item_state') or item_state_version in (
+            StateMigration.ITEM_STATE_VERSION, StateMigration.COMPACT_ITEM_STATE_VERSION):
+        return MigrationResult(record, False, [])
+    try:
+        item_state = migrated_item_state(definition, state['item_state'], item_state_version)
+    except (KeyError, TypeError, ValueError) as error:
+        return MigrationResult(record, False, [f"Item state cannot be migrated: {error!r}."])
+    state = dict(state, item_state=item_state, item_state_version=StateMigration.ITEM_STATE_VERSION)
+    return MigrationResult(dict(record, state=state), True, [])
+
+
+class Migrator:
+    """
+    Migrates chunks of records, compiling the problem definition of each block once while it is in use.
+    """
+
+    def __init__(self):
+        # Problem definitions of the most recently migrated blocks, keyed by usage ID
+        self._definitions = LRUCache(MIGRATION_PROBLEM_CACHE_SIZE)
+
+    def migrate(self, record, problems):
+        """
+        Returns the `MigrationResult` of a record; `problems` maps usage IDs to the `data` of their content record.
+        """
+        if 'data' in record:
+            return migrate_content_record(record)
+        if 'state' not in record:
+            return MigrationResult(record, False, ["Neither a content nor a learner state record."])
+        usage_id = record.get('usage_id')
+        definition = self._definitions.get(usage_id)
+        if definition is None:
+            if usage_id not in problems:
+                return MigrationResult(record, False, ["No content record for the block."])
+            try:
+                definition = ProblemDefinition(problems[usage_id])
+            except (AttributeError, KeyError, TypeError) as error:
+                return MigrationResult(record, False, [f"Problem data cannot be compiled: {error!r}."])
+            self._definitions.set(usage_id, definition)
+        return migrate_state_record(record, definition)
+
+    def migrate_chunk(self, records, problems):
+        """
+        Returns a list of the `MigrationResult` of each record.
+        """
+        return [self.migrate(record, problems) for record in records]
+
+
+# Migrator of the worker process, set up by `_init_worker`.
+_worker_migrator = None
+
+
+def _init_worker():
+    """
+    Sets up the migrator of the worker process.
+    """
+    global _worker_migrator  # pylint: disable=global-statement
+    _worker_migrator = Migrator()
+
+
+def _migrate_chunk_in_worker(records, problems):
+    """
+    Migrates a chunk of records with the migrator of the worker process.
+    """
+    return _worker_migrator.migrate_chunk(records, problems)
+
+
+def _chunks_with_problems(records, chunk_size):
+    """
+    Splits an iterable of records into chunks (see `bulk.chunks`), each with the `data` of the content records of the
+    blocks of its learner state records.
+
+    Only the content of the `MIGRATION_PROBLEM_CACHE_SIZE` most recently used blocks is kept between chunks.
+    """
+    problems = LRUCache(MIGRATION_PROBLEM_CACHE_SIZE)
+    for chunk in chunks(records, chunk_size):
+        chunk_problems = {}
+        for record in chunk:
+            usage_id = record.get('usage_id')
+            if 'data' in record:
+                problems.set(usage_id, record['data'])
+            elif 'state' in record and usage_id not in chunk_problems:
+                data = problems.get(usage_id)
+                if data is not None:
+                    chunk_problems[usage_id] = data
+        yield chunk, chunk_problems
+
+
+def migrate_records(records, *, chunk_size=MIGRATION_CHUNK_SIZE, processes=None):
+    """
+    Migrates an iterable of content and learner state records (dicts, see the module documentation).
+
+    Yields lists of `MigrationResult`s, one chunk of records at a time and in the order of `records`. Records are
+    read lazily (see `bulk.map_in_pool`). Chunks are migrated in a pool of `processes` worker processes
+    (defaulting to the number of CPUs), or in the calling process if `processes` is 1.
+    """
+    chunks_with_problems = _chunks_with_problems(records, chunk_size)
+
+    if processes == 1:
+        migrator = Migrator()
+        for chunk, problems in chunks_with_problems:
+            yield migrator.migrate_chunk(chunk, problems)
+        return
+
+    yield from map_in_pool(
+        _migrate_chunk_in_worker, chunks_with_problems, processes=processes, initializer=_init_worker
+    )
+
+
+def migrate_olx_file(path, dry_run=False):
+    """
+    Normalizes the problem `data` of the block elements of an OLX file, and rewrites the file if any was upgraded,
+    unless `dry_run` is set.
+
+    Only the `data` attributes of upgraded elements are rewritten: the rest of the file (XML declaration, comments,
+    formatting) is left as is, and the file is replaced at once, so it is never left half-written.
+
+    Returns a list of the `MigrationResult` of each block element, as content records.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as olx_file:
+        olx = olx_file.read()
+    # Most files of a course are other blocks: skip them before paying for XML parsing
+    if OLX_TAG not in olx:
+        return []
+
+    try:
+        root = ET.fromstring(olx)
+    except ET.ParseError as error:
+        return [MigrationResult({'usage_id': path}, False, [f"Invalid OLX: {error}."])]
+    elements = list(root.iter(OLX_TAG))
+    start_tags = list(_OLX_START_TAG_RE.finditer(olx))
+    if len(start_tags) != len(elements):
+        # Some start tags are not elements (e.g. they are in comments): they can't be told apart
+        start_tags = [None] * len(elements)
+
+    results = []
+    replacements = []
+    for element, start_tag in zip(elements, start_tags):
+        usage_id = element.get('url_name') or os.path.splitext(os.path.basename(path))[0]
+        if element.get('data') is None:
+            continue
+        try:
+            data = json.loads(element.get('data'))
+        except ValueError as error:
+            results.append(MigrationResult({'usage_id': usage_id}, False, [f"Invalid data: {error}."]))
+            continue
+        result = migrate_content_record({'usage_id': usage_id, 'data': data})
+        if result.upgraded:
+            if start_tag is None:
+                result = MigrationResult(result.record, False, ["The element cannot be located in the OLX file."])
+            else:
+                # Serialized as XBlock fields are exported
+                data = json.dumps(result.record['data'], indent=2, sort_keys=True, separators=(',', ': '))
+                replacements.append(_data_attribute_replacement(start_tag, data))
+        results.append(result)
+
+    if not dry_run and replacements:
+        _replace_file(path, _apply_replacements(olx, replacements))
+    return results
+
+
+def _data_attribute_replacement(start_tag, data):
+    """
+    Returns the span of the value of the `data` attribute of an OLX start tag match, and its new, quoted, `data`.
+    """
+    for attribute in _OLX_ATTRIBUTE_RE.finditer(start_tag.group()):
+        if attribute.group(1) == 'data':
+            quote = attribute.group(2)[0]
+            entities = {'\n': '&#10;', '\r': '&#13;', '\t': '&#9;', quote: '&quot;' if quote == '"' else '&apos;'}
+            start = start_tag.start() + attribute.start(2)
+            return start, start + len(attribute.group(2)), quote + escape(data, entities) + quote
+    raise ValueError("No data attribute in the start tag.")
+
+
+def _apply_replacements(text, replacements):
+    """
+    Returns `text` with the (start, end, replacement) `replacements` of non-overlapping spans applied.
+    """
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(replacements):
+        parts.append(text[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def _replace_file(path, text):
+    """
+    Replaces the content of the file `path` with `text`, keeping its permissions, through a temporary file.
+    """
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory or None)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as temp_file:
+            temp_file.write(text)
+        shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def migrate_olx(course_dir, *, dry_run=False, processes=1):
+    """
+    Migrates the OLX files of an exported course (see `migrate_olx_file`), up to `processes` files in parallel.
+
+    Yields the list of `MigrationResult`s of each file.
+    """
+    paths = (
+        os.path.join(directory, name)
+        for directory, __, names in os.walk(course_dir)
+        for name in sorted(names) if name.endswith('.xml')
+    )
+    if processes == 1:
+        for path in paths:
+            yield migrate_olx_file(path, dry_run)
+        return
+
+    yield from map_in_pool(migrate_olx_file, ((path, dry_run) for path in paths), processes=processes)
+
+
+class MigrationReport:
+    """
+    Counts of migrated records, by kind of record, with the first `max_errors` records that could not be upgraded.
+    """
+
+    def __init__(self, max_errors=MAX_REPORTED_ERRORS):
+        self.counts = Counter()
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add(self, results):
+        """
+        Adds a list of `MigrationResult`s.
+        """
+        for record, upgraded, errors in results:
+            kind = 'state' if 'state' in record else 'content'
+            self.counts[f'{kind}_records'] += 1
+            if upgraded:
+                self.counts[f'{kind}_upgraded'] += 1
+            if errors:
+                self.counts[f'{kind}_errors'] += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append({'usage_id': record.get('usage_id'), 'user': record.get('user'),
+                                        'errors': errors})
+        return self
+
+    def report(self):
+        """
+        Returns the report as a JSON-serializable dict.
+        """
+        return {'counts': dict(sorted(self.counts.items())), 'errors': self.errors}
+
+
+def main(argv=None):
+    """
+    Migrates the records dump or exported course given on the command line, and prints the report as JSON.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', maxsplit=1)[0].strip())
+    parser.add_argument('path', help="Dump of block records (JSON lines, optionally gzipped), or course OLX directory")
+    parser.add_argument('--output', help="File to write the upgraded records of a dump to")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would be upgraded")
+    parser.add_argument('--processes', type=int, default=1, help="Number of worker processes")
+    parser.add_argument('--batch-size', type=int, default=MIGRATION_CHUNK_SIZE,
+                        help="Number of records migrated and written at a time")
+    args = parser.parse_args(argv)
+
+    report = MigrationReport()
+    if os.path.isdir(args.path):
+        for results in migrate_olx(args.path, dry_run=args.dry_run, processes=args.processes):
+            report.add(results)
+    else:
+        if not args.dry_run and not args.output:
+            parser.error("--output is required to migrate a dump of records, unless --dry-run is set")
+        with contextlib.ExitStack() as files:
+            lines = files.enter_context(open_text(args.path))
+            output = None if args.dry_run else files.enter_context(open(args.output, 'w', encoding='utf-8'))
+            records = (json.loads(line) for line in lines if line.strip())
+            for results in migrate_records(records, chunk_size=args.batch_size, processes=args.processes):
+                report.add(results)
+                if output is not None:
+                    output.writelines(json.dumps(result.record) + '\n' for result in results if result.upgraded)
+                    output.flush()
+
+    json.dump(dict(report.report(), dry_run=args.dry_run), sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -809,6 +809,10 @@ function DragAndDropBlock(runtime, element, configuration) {
     // This allows user to scroll the container without accidentally dragging the items.
     var TOUCH_DRAG_DELAY = 250;
 
+    // Number of miliseconds to wait for further placements before submitting them to the server
+    // in a single request (assessment mode only).
+    var DROP_BATCH_DELAY = 300;
+
     // Keyboard accessibility
     var ESC = 27;
     var RET = 13;
@@ -818,6 +822,12 @@ function DragAndDropBlock(runtime, element, configuration) {
 
     var $selectedItem;
 
+    // Placements not yet sent to the server (assessment mode only), in the order they were made.
+    var pendingDrops = [];
+    var pendingDropsTimer = null;
+    // The drop_items request in flight, if any: later requests changing the learner's state wait for it.
+    var dropsRequest = null;
+
     var init = function() {
         // Load the current user state, and load the image, then render the block.
         // We load the user state via AJAX rather than passing it in statically (like we do with
@@ -882,6 +892,9 @@ function DragAndDropBlock(runtime, element, configuration) {
             // Re-render when window size changes.
             $(window).on('resize', measureWidthAndRender);
 
+            // Send placements waiting to be batched before the learner leaves the page.
+            window.addEventListener('pagehide', flushDropsOnExit);
+
             // Remove the spinner and create a blank slate for virtualDom to take over.
             $root.empty();
 
@@ -1355,11 +1368,10 @@ function DragAndDropBlock(runtime, element, configuration) {
             // Nothing to do here, item is already in the bank.
             return;
         }
+        var previous = state.items[item_id];
         delete state.items[item_id];
         applyState();
-        var url = runtime.handlerUrl(element, 'drop_item');
-        var data = {val: item_id, zone: null};
-        $.post(url, JSON.stringify(data), 'json');
+        queueDrop(item_id, null, previous);
     };
 
     var placeGrabbedItem = function($zone) {
@@ -1391,6 +1403,7 @@ function DragAndDropBlock(runtime, element, configuration) {
             return;
         }
 
+        var previous = state.items[item_id];
         state.items[item_id] = {
             zone: zone,
             zone_align: zone_align,
@@ -1398,7 +1411,7 @@ function DragAndDropBlock(runtime, element, configuration) {
         };
 
         applyState();
-        submitLocation(item_id, zone);
+        submitLocation(item_id, zone, previous);
     };
 
     var countItemsInZone = function(zone, exclude_ids) {
@@ -1788,10 +1801,19 @@ function DragAndDropBlock(runtime, element, configuration) {
         applyState();
     };
 
-    var submitLocation = function(item_id, zone) {
+    var submitLocation = function(item_id, zone, previous) {
         if (!zone) {
             return;
         }
+        if (configuration.mode === DragAndDropBlock.ASSESSMENT_MODE) {
+            // Placements are not graded until the answer is submitted in assessment mode, so they are shown
+            // right away and sent to the server in batches.
+            state.items[item_id].submitting_location = false;
+            queueDrop(item_id, zone, previous);
+            applyState();
+            focusAfterDrop();
+            return;
+        }
         var url = runtime.handlerUrl(element, 'drop_item');
         var data = {
             val: item_id,
@@ -1801,31 +1823,24 @@ function DragAndDropBlock(runtime, element, configuration) {
         $.post(url, JSON.stringify(data), 'json')
             .done(function(data){
                 state.items[item_id].submitting_location = false;
-                // In standard mode we immediately return item to the bank if dropped on wrong zone.
-                // In assessment mode we leave it in the chosen zone until explicit answer submission.
-                if (configuration.mode === DragAndDropBlock.STANDARD_MODE) {
-                    state.last_action_correct = data.correct;
-                    state.feedback = data.feedback;
-                    state.grade = data.grade;
-                    if (!data.correct) {
-                        delete state.items[item_id];
-                    }
-                    if (data.finished) {
-                        state.finished = true;
-                        state.overall_feedback = data.overall_feedback;
-                    }
-                    setScreenReaderMessages();
+                // We immediately return item to the bank if dropped on wrong zone.
+                state.last_action_correct = data.correct;
+                state.feedback = data.feedback;
+                state.grade = data.grade;
+                if (!data.correct) {
+                    delete state.items[item_id];
+                }
+                if (data.finished) {
+                    state.finished = true;
+                    state.overall_feedback = data.overall_feedback;
                 }
+                setScreenReaderMessages();
                 applyState();
                 if (state.feedback && state.feedback.length > 0) {
                     // Move focus the the close button of the feedback popup.
                     focusItemFeedbackPopup();
                 } else {
-                    if ($root.find('.item-bank .option[draggable=true]').length) {
-                        focusFirstDraggable();
-                    } else {
-                        focusSubmitButton();
-                    };
+                    focusAfterDrop();
                 }
             })
             .fail(function (data) {
@@ -1834,6 +1849,139 @@ function DragAndDropBlock(runtime, element, configuration) {
             });
     };
 
+    var focusAfterDrop = function() {
+        if ($root.find('.item-bank .option[draggable=true]').length) {
+            focusFirstDraggable();
+        } else {
+            focusSubmitButton();
+        }
+    };
+
+    var queueDrop = function(item_id, zone, previous) {
+        // Only the last placement of an item matters, but the placement the server knows of is kept,
+        // to restore the item if the request fails.
+        var pending = pendingDrops.filter(function(drop) { return drop.val === item_id; })[0];
+        if (pending) {
+            previous = pending.previous;
+        }
+        pendingDrops = pendingDrops.filter(function(drop) { return drop.val !== item_id; });
+        pendingDrops.push({val: item_id, zone: zone, previous: previous && {
+            zone: previous.zone,
+            zone_align: previous.zone_align
+        }});
+        clearTimeout(pendingDropsTimer);
+        pendingDropsTimer = setTimeout(flushDrops, DROP_BATCH_DELAY);
+    };
+
+    var dropsData = function(drops) {
+        return drops.map(function(drop) { return {val: drop.val, zone: drop.zone}; });
+    };
+
+    var takePendingDrops = function() {
+        var drops = pendingDrops;
+        pendingDrops = [];
+        clearTimeout(pendingDropsTimer);
+        pendingDropsTimer = null;
+        return drops;
+    };
+
+    var afterDrops = function(send) {
+        // Sends a request once the drop_items request in flight, if any, is done, so that the server
+        // handles the learner's changes in order.
+        return dropsRequest ? dropsRequest.then(send, send) : send();
+    };
+
+    var sendDrops = function(drops, submit, exiting) {
+        var data = {items: dropsData(drops)};
+        if (submit) {
+            data.submit = true;
+        }
+        var request = afterDrops(function() {
+            var url = runtime.handlerUrl(element, 'drop_items');
+            if (exiting) {
+                return postOnExit(url, JSON.stringify(data));
+            }
+            return $.ajax({
+                type: 'POST',
+                url: url,
+                data: JSON.stringify(data)
+            });
+        });
+        dropsRequest = request;
+        request.fail(function() {
+            // None of the placements were saved: put the items that were not moved since back
+            // where the server has them.
+            drops.forEach(function(drop) {
+                var item = state.items[drop.val];
+                var in_place = drop.zone === null ? !item : item && item.zone === drop.zone;
+                if (!in_place || isPendingDrop(drop.val)) {
+                    return;
+                }
+                if (drop.previous) {
+                    state.items[drop.val] = drop.previous;
+                } else {
+                    delete state.items[drop.val];
+                }
+            });
+            applyState();
+        }).always(function() {
+            if (dropsRequest === request) {
+                dropsRequest = null;
+            }
+        });
+        return request;
+    };
+
+    var flushDrops = function() {
+        var drops = takePendingDrops();
+        if (drops.length) {
+            sendDrops(drops, false);
+        }
+    };
+
+    var flushDropsOnExit = function() {
+        // The page may be gone before pending placements are flushed (e.g. when the learner moves on
+        // to the next unit): send them, after the batches already sent, with a request that outlives the page.
+        var drops = takePendingDrops();
+        if (drops.length) {
+            sendDrops(drops, false, true);
+        }
+    };
+
+    var postOnExit = function(url, body) {
+        // A keepalive fetch where supported, otherwise a synchronous request, so that the page is not
+        // unloaded before it is sent. Returns a jQuery promise, rejected if the request fails.
+        if (!window.fetch) {
+            return $.ajax({type: 'POST', url: url, data: body, async: false});
+        }
+        var deferred = $.Deferred();
+        window.fetch(url, {
+            method: 'POST',
+            body: body,
+            keepalive: true,
+            credentials: 'same-origin',
+            headers: {'Content-Type': 'application/json', 'X-CSRFToken': getCookie('csrftoken')}
+        }).then(function(response) {
+            if (response.ok) {
+                deferred.resolve();
+            } else {
+                deferred.reject();
+            }
+        }, function() {
+            deferred.reject();
+        });
+        return deferred.promise();
+    };
+
+    var getCookie = function(name) {
+        var match = document.cookie.match(new RegExp('(?:^|;\\s*)' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : '';
+    };
+
+    var isPendingDrop = function(item_id) {
+        return pendingDrops.some(function(drop) { return drop.val === item_id; });
+    };
+
     var closePopupEventHandler = function(evt) {
         if (!state.feedback) {
             return;
@@ -1868,10 +2016,13 @@ function DragAndDropBlock(runtime, element, configuration) {
 
     var resetProblem = function(evt) {
         evt.preventDefault();
-        $.ajax({
-            type: 'POST',
-            url: runtime.handlerUrl(element, 'reset'),
-            data: '{}',
+        takePendingDrops();
+        afterDrops(function() {
+            return $.ajax({
+                type: 'POST',
+                url: runtime.handlerUrl(element, 'reset'),
+                data: '{}',
+            });
         }).done(function(data) {
             state = data;
             applyState();
@@ -1905,11 +2056,24 @@ function DragAndDropBlock(runtime, element, configuration) {
         state.submit_spinner = true;
         applyState();
 
-        $.ajax({
-            type: 'POST',
-            url: runtime.handlerUrl(element, "do_attempt"),
-            data: '{}'
-        }).done(function(data){
+        // Placements still waiting to be sent are submitted together with the attempt, and the attempt
+        // waits for the placements already sent.
+        var drops = takePendingDrops();
+        var request;
+        if (drops.length) {
+            request = sendDrops(drops, true).then(function(data) {
+                return data.attempt;
+            });
+        } else {
+            request = afterDrops(function() {
+                return $.ajax({
+                    type: 'POST',
+                    url: runtime.handlerUrl(element, "do_attempt"),
+                    data: '{}'
+                });
+            });
+        }
+        request.done(function(data){
             state.attempts = data.attempts;
             state.grade = data.grade;
             state.feedback = data.feedback;
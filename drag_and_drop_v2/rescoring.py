@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+""" Drag and Drop v2 XBlock - Offline rescoring of learner states """
+from __future__ import absolute_import
+
+from collections import namedtuple
+
+from .bulk import chunks, map_in_pool
+from .definition import ProblemDefinition, is_compact_item_state
+from .grading import LearnerItemStats
+from .utils import StateMigration
+
+# Number of learner records rescored by a worker at a time.
+RESCORE_CHUNK_SIZE = 1000
+
+RescoreRecord = namedtuple('RescoreRecord', [
+    'user',  # Anything identifying the learner, passed through to the result; must be picklable
+    'item_state',  # Value of the learner's `item_state` field
+    'attempts',  # Value of the learner's `attempts` field
+    'raw_earned',  # Value of the learner's `raw_earned` field, or None if it was never set
+])
+
+RescoreResult = namedtuple('RescoreResult', [
+    'user',
+    'attempts',
+    'raw_earned',  # Score before rescoring
+    'new_raw_earned',  # Score after rescoring; None if the learner was never graded
+    'changed',  # Whether the score needs to be saved (and published)
+])
+
+
+class Rescorer:
+    """
+    Computes learners' scores for a problem definition from their stored state, without instantiating blocks.
+
+    Scores are computed as `DragAndDropBlock.calculate_score` does, except that the correctness of placed items
+    is evaluated against the definition, instead of being read from the learner state: it was stored when the item
+    was dropped, and is stale if the answer key changed since.
+
+    Item state stored in the compact format is decoded with the layouts of the problem's `item_state_layouts`.
+    """
+
+    def __init__(self, definition, ignore_decoys=False, only_if_higher=False, *, layouts=None):
+        self.definition = definition
+        self.ignore_decoys = ignore_decoys
+        self.only_if_higher = only_if_higher
+        self.layouts = layouts
+        self._migrator = StateMigration(definition)
+        self._item_zones = {str(item_id): zones for item_id, zones in definition.item_zones.items()}
+
+        __, total_count = LearnerItemStats(definition, {}).counts(ignore_decoys)
+        if not total_count:
+            raise ValueError("The problem has no items to grade.")
+
+    def raw_score(self, item_state):
+        """
+        Returns the raw score (in [0..1]) of a learner's `item_state`, or None if it is compact item state
+        indexed by an unknown layout.
+        """
+        if is_compact_item_state(item_state):
+            item_state = self.definition.decode_item_state(item_state, self.layouts)
+            if item_state is None:
+                return None
+        stats = LearnerItemStats(self.definition, {})
+        for item_id, entry in item_state.items():
+            zones = self._item_zones.get(item_id)
+            if zones is None:
+                continue
+            entry = self._migrator.apply_item_state_migrations(item_id, entry)
+            stats.update(item_id, {'zone': entry['zone'], 'correct': entry['zone'] in zones})
+        correct_count, total_count = stats.counts(self.ignore_decoys)
+        return correct_count / float(total_count)
+
+    def rescore(self, record):
+        """
+        Returns the `RescoreResult` of a `RescoreRecord`.
+
+        Learners who were never graded are not rescored, and learners whose item state cannot be decoded keep
+        their score. If `only_if_higher` is set, scores are never lowered.
+        """
+        user, item_state, attempts, raw_earned = record
+        if raw_earned is None:
+            return RescoreResult(user, attempts, raw_earned, None, False)
+
+        new_raw_earned = self.raw_score(item_state or {})
+        if new_raw_earned is None:
+            return RescoreResult(user, attempts, raw_earned, raw_earned, False)
+        if self.only_if_higher:
+            new_raw_earned = max(new_raw_earned, raw_earned)
+        return RescoreResult(user, attempts, raw_earned, new_raw_earned, new_raw_earned != raw_earned)
+
+    def rescore_chunk(self, records):
+        """
+        Returns a list of the `RescoreResult` of each record.
+        """
+        return [self.rescore(RescoreRecord(*record)) for record in records]
+
+
+# Rescorer of the worker process, set up once by `_init_worker`.
+_worker_rescorer = None
+
+
+def _init_worker(data, ignore_decoys, only_if_higher, layouts):
+    """
+    Compiles the problem definition once per worker process.
+    """
+    global _worker_rescorer  # pylint: disable=global-statement
+    _worker_rescorer = Rescorer(ProblemDefinition(data), ignore_decoys, only_if_higher, layouts=layouts)
+
+
+def _rescore_chunk_in_worker(records):
+    """
+    Rescores a chunk of records with the rescorer of the worker process.
+    """
+    return _worker_rescorer.rescore_chunk(records)
+
+
+def rescore_learners(data, records, *, ignore_decoys=False, only_if_higher=False, layouts=None,
+                     chunk_size=RESCORE_CHUNK_SIZE, processes=None):
+    """
+    Rescores the learner states of a problem against its (current) `data`.
+
+    `records` is an iterable of `RescoreRecord`s, or equivalent (user, item_state, attempts, raw_earned) tuples,
+    typically streamed from the courseware student module table. `ignore_decoys` should be set as the
+    `grading_ignore_decoys` waffle flag is for the course, and `layouts` to the problem's `item_state_layouts`.
+
+    Yields lists of `RescoreResult`s, one chunk of records at a time and in the order of `records`. Records are
+    read lazily (see `bulk.map_in_pool`). Chunks are rescored in a pool of `processes` worker processes
+    (defaulting to the number of CPUs), or in the calling process if `processes` is 1.
+    """
+    if processes == 1:
+        rescorer = Rescorer(ProblemDefinition(data), ignore_decoys, only_if_higher, layouts=layouts)
+        for chunk in chunks(records, chunk_size):
+            yield rescorer.rescore_chunk(chunk)
+        return
+
+    # Fail early, rather than in every worker, for problems that cannot be graded
+    Rescorer(ProblemDefinition(data), ignore_decoys, only_if_higher)
+
+    yield from map_in_pool(
+        _rescore_chunk_in_worker,
+        ((chunk,) for chunk in chunks(records, chunk_size)),
+        processes=processes,
+        initializer=_init_worker,
+        initargs=(data, ignore_decoys, only_if_higher, layouts),
+    )
@@ -3,13 +3,20 @@
 from __future__ import absolute_import
 
 import copy
+import functools
 import re
+import string
+import threading
 from collections import namedtuple
+from html.entities import html5
 
 import bleach
 
 from bleach.css_sanitizer import CSSSanitizer
 
+from .cache import sanitized_html_cache
+from .instrumentation import increment
+
 
 def _(text):
     """ Dummy `gettext` replacement to make string extraction tools scrape strings marked for translation """
@@ -24,13 +31,181 @@ def ngettext_fallback(text_singular, text_plural, number):
         return text_plural
 
 
+# `bleach.Cleaner` is not thread-safe, so each thread gets its own (reused) instances.
+_cleaners = threading.local()
+_WHITESPACE = re.compile(r"\s+", flags=re.UNICODE)
+
+
+def _thread_local_cleaner(key, **options):
+    """
+    Returns the `bleach.Cleaner` of the current thread stored under `key`, building it with `options` on first use.
+    """
+    cleaner = getattr(_cleaners, key, None)
+    if cleaner is None:
+        cleaner = bleach.Cleaner(**options)
+        setattr(_cleaners, key, cleaner)
+    return cleaner
+
+
 def _clean_data(data):
     """ Remove html tags and extra white spaces e.g newline, tabs etc from provided data """
-    cleaner = bleach.Cleaner(tags=[], strip=True)
-    cleaned_text = " ".join(re.split(r"\s+", cleaner.clean(data), flags=re.UNICODE)).strip()
+    cleaned_text = " ".join(_WHITESPACE.split(_thread_local_cleaner('text', tags=[], strip=True).clean(data))).strip()
     return cleaned_text
 
 
+# Start and end tags whose attribute names and values are well-formed. Possessive quantifiers keep the matching
+# linear on unterminated tags.
+_TAG = re.compile(r"""
+    </?+([a-zA-Z][^\t\n\f\r /><\x00]*+)
+    (?:
+        [\t\n\f\r /]++
+      | [^\t\n\f\r />"'<=\x00][^\t\n\f\r />"'<=\x00]*+
+        (?:[\t\n\f\r ]*+=[\t\n\f\r ]*+(?:"[^"]*+"|'[^']*+'|[^\t\n\f\r >"'][^\t\n\f\r >]*+)?+)?+
+    )*+
+    >
+""", flags=re.VERBOSE)
+_COMMENT = re.compile(r"<!--(?:-?>|.*?--!?>)", flags=re.DOTALL)
+_TAG_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+# Characters the HTML parser drops or rejects: texts with any of these are left to bleach.
+_UNSUPPORTED_CHARACTERS = re.compile(r'[\x00\ud800-\udfff]')
+_INVISIBLE_CHARACTERS = re.compile(r'[\x01-\x08\x0b\x0c\x0e-\x1f]')
+_HTML_WHITESPACE = "\t\n\f\r "
+_ENTITY_END_CHARACTERS = frozenset("<&=;" + string.whitespace)
+_ENTITY_NAME_PREFIXES = frozenset(name[:end] for name in html5 for end in range(1, len(name) + 1))
+_ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+# Stripped start tags of these elements are replaced with a line break when they follow another tag.
+_BLOCK_LEVEL_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'details', 'dialog', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hgroup', 'hr', 'li',
+    'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul',
+])
+
+
+def _match_entity(text):
+    """
+    Returns the name of the character reference at the start of `text` (following an `&`), or None.
+
+    Mirrors bleach, which keeps references that look valid (`&name;`, `&#digits;`, `&#xdigits;`) and escapes the
+    other ampersands.
+    """
+    if text[:1] == "#":
+        end = 1
+        allowed = string.digits
+        if text[1:2] in ("x", "X"):
+            end = 2
+            allowed = string.hexdigits
+        name_end = end
+        while end < len(text) and text[end] not in _ENTITY_END_CHARACTERS:
+            end += 1
+            if text[end - 1] not in allowed:
+                break
+            name_end = end
+        if text[end:end + 1] == ";":
+            return text[:name_end]
+        return None
+
+    end = 0
+    while end < len(text) and text[end] not in _ENTITY_END_CHARACTERS:
+        end += 1
+        if text[:end] not in _ENTITY_NAME_PREFIXES:
+            return None
+    if end and text[end:end + 1] == ";":
+        return text[:end]
+    return None
+
+
+def _escape_text(text):
+    """
+    Escapes the text `text` of an HTML fragment the way bleach serializes it.
+    """
+    # Leading and trailing whitespace is serialized as is
+    start = len(text) - len(text.lstrip(_HTML_WHITESPACE))
+    end = len(text.rstrip(_HTML_WHITESPACE))
+    if start >= end:
+        return text
+    leading, trailing = text[:start], text[end:]
+    text = _INVISIBLE_CHARACTERS.sub("?", text[start:end])
+    if "&" in text:
+        parts = text.split("&")
+        escaped = [parts[0]]
+        for part in parts[1:]:
+            entity = _match_entity(part)
+            if entity is None or entity == "amp":
+                escaped.append("&amp;")
+                if entity is not None:
+                    part = part[len(entity) + 1:]
+            else:
+                escaped.append(f"&{entity};")
+                part = part[len(entity) + 1:]
+            escaped.append(part)
+        text = "".join(escaped)
+    return leading + text.replace("<", "&lt;").replace(">", "&gt;") + trailing
+
+
+def html_to_text(data):
+    """
+    Returns the plain text of the HTML fragment `data`, with whitespace collapsed: the same as `_clean_data`, without
+    building a bleach document tree.
+
+    Tags and comments are skipped in a single scan of `data`. Malformed markup (e.g. unterminated tags or comments,
+    doctypes, processing instructions) is rare in problem texts, and is left to `_clean_data`.
+    """
+    if not _HTML_SPECIAL_CHARACTERS.search(data):
+        return " ".join(_WHITESPACE.split(data)).strip()
+    if _UNSUPPORTED_CHARACTERS.search(data):
+        increment('html_to_text.fallbacks')
+        return _clean_data(data)
+
+    # Text nodes of the document (split by comments), each a list of pieces of text between tags
+    nodes = [[]]
+    follows_tag = False
+    position = 0
+    while True:
+        tag_start = data.find("<", position)
+        if tag_start == -1:
+            nodes[-1].append(data[position:])
+            break
+        nodes[-1].append(data[position:tag_start])
+        next_character = data[tag_start + 1:tag_start + 2]
+        if next_character == "/":
+            next_character = data[tag_start + 2:tag_start + 3]
+            if next_character == ">":
+                position = tag_start + 3
+                continue
+            if next_character not in _TAG_START:
+                increment('html_to_text.fallbacks')
+                return _clean_data(data)
+        elif next_character == "!" and data.startswith("<!--", tag_start):
+            comment = _COMMENT.match(data, tag_start)
+            if comment is None:
+                increment('html_to_text.fallbacks')
+                return _clean_data(data)
+            nodes.append([])
+            position = comment.end()
+            continue
+        elif next_character in ("!", "?"):
+            increment('html_to_text.fallbacks')
+            return _clean_data(data)
+        elif next_character not in _TAG_START:
+            # Not markup: a literal `<`
+            nodes[-1].append("<")
+            position = tag_start + 1
+            continue
+
+        tag = _TAG.match(data, tag_start)
+        if tag is None:
+            increment('html_to_text.fallbacks')
+            return _clean_data(data)
+        is_start_tag = data[tag_start + 1] != "/"
+        if is_start_tag and follows_tag and tag.group(1).translate(_ASCII_LOWERCASE) in _BLOCK_LEVEL_TAGS:
+            nodes[-1].append("\n")
+        follows_tag = True
+        position = tag.end()
+
+    text = "".join(_escape_text("".join(node)) for node in nodes)
+    return " ".join(_WHITESPACE.split(text)).strip()
+
+
 # Convert `bleach.ALLOWED_TAGS` to a set because it is a list in `bleach<6.0.0`.
 ALLOWED_TAGS = set(bleach.ALLOWED_TAGS) | {
     'br',
@@ -76,27 +251,86 @@ ALLOWED_ATTRIBUTES = {
 }
 
 
+# Strings without any of these characters are returned unchanged by bleach: there is no markup or
+# character reference to parse, and no control characters for the HTML parser to drop or replace.
+_HTML_SPECIAL_CHARACTERS = re.compile(r'[<>&\x00-\x08\x0b-\x1f\ud800-\udfff]')
+
+_CSS_SANITIZER = CSSSanitizer()
+
+
+def _bleach_html(raw_body):
+    """
+    Sanitizes `raw_body` with the preconfigured `bleach.Cleaner` of the current thread.
+    """
+    increment('sanitize_html.bleach')
+    return _thread_local_cleaner(
+        'html',
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=bleach.ALLOWED_PROTOCOLS,
+        strip=True,
+        css_sanitizer=_CSS_SANITIZER,
+    ).clean(raw_body)
+
+
+def _clean_html(raw_body):
+    """
+    Memoized bleach sanitization of `raw_body`.
+    """
+    return sanitized_html_cache.get_or_set(raw_body, lambda: _bleach_html(raw_body))
+
+
 def sanitize_html(raw_body: str) -> str:
     """
     Remove not allowed HTML tags to mitigate XSS vulnerabilities.
     """
-    bleach_options = {
-        "tags": ALLOWED_TAGS,
-        "protocols": bleach.ALLOWED_PROTOCOLS,
-        "strip": True,
-        "attributes": ALLOWED_ATTRIBUTES,
-        "css_sanitizer": CSSSanitizer()
-    }
+    increment('sanitize_html.calls')
+    if not _HTML_SPECIAL_CHARACTERS.search(raw_body):
+        return raw_body
+    return _clean_html(raw_body)
+
+
+class request_cached_property(property):  # pylint: disable=invalid-name
+    """
+    Decorator turning a block method into a property whose value is memoized for the rest of the
+    current request scope, i.e. until the end of the handler or view, or until a field is written.
+
+    Values that only depend on some fields declare them (`@request_cached_property.depending_on('data')`),
+    and are only discarded when one of these fields is written.
+
+    Outside of a request scope, the value is computed on every access.
+    """
+
+    def __init__(self, func, fields=None):
+        name = func.__name__
+        # Names of the fields the value depends on, or None if it may depend on any field
+        self.fields = frozenset(fields) if fields is not None else None
 
-    return bleach.clean(raw_body, **bleach_options)
+        @functools.wraps(func)
+        def getter(block):
+            cache = block._request_cache  # pylint: disable=protected-access
+            if cache is None:
+                return func(block)
+            if name not in cache:
+                cache[name] = func(block)
+            return cache[name]
+
+        super().__init__(getter)
+
+    @classmethod
+    def depending_on(cls, *fields):
+        """
+        Returns a decorator memoizing a property that only depends on the given `fields`.
+        """
+        return lambda func: cls(func, fields)
 
 
 class DummyTranslationService:
     """
     Dummy drop-in replacement for i18n XBlock service
     """
-    gettext = _
-    ngettext = ngettext_fallback
+    gettext = staticmethod(_)
+    ngettext = staticmethod(ngettext_fallback)
 
 
 class FeedbackMessages:
@@ -166,7 +400,8 @@ class FeedbackMessages:
         ).format(missing_count=number)
 
 
-FeedbackMessage = namedtuple("FeedbackMessage", ["message", "message_class"])
+# `safe` messages were built from trusted templates, or already sanitized, and are presented as they are.
+FeedbackMessage = namedtuple("FeedbackMessage", ["message", "message_class", "safe"], defaults=(False,))
 ItemStats = namedtuple(
     'ItemStats',
     ["required", "placed", "correctly_placed", "decoy", "decoy_in_bank"]
@@ -207,6 +442,11 @@ class StateMigration:
     """
     Helper class to apply zone data and item state migrations
     """
+    # Format version of item_state entries produced by `apply_item_state_migrations`
+    ITEM_STATE_VERSION = "2.1"
+    # Format version of item_state stored in the compact format (see `ProblemDefinition.encode_item_state`)
+    COMPACT_ITEM_STATE_VERSION = "2.1-compact"
+
     def __init__(self, block):
         self._block = block
 
@@ -230,10 +470,27 @@ class StateMigration:
 
         return self._apply_migration(zone_id, zone, migrations)
 
+    @staticmethod
+    def is_current_item_state(item_state):
+        """
+        Checks in constant time whether an item_state entry is already in the current format,
+        i.e. a dict holding only "zone" and "correct" values.
+        """
+        return (
+            isinstance(item_state, dict) and len(item_state) == 2 and
+            item_state.get('zone') is not None and item_state.get('correct') is not None
+        )
+
     def apply_item_state_migrations(self, item_id, item_state):
         """
-        Applies item_state migrations
+        Applies item_state migrations.
+
+        Entries that are already in the current format are returned as is, without copying;
+        callers must not modify them.
         """
+        if self.is_current_item_state(item_state):
+            return item_state
+
         migrations = (self._item_state_v1_to_v1p5, self._item_state_v1p5_to_v2, self._item_state_v2_to_v2p1)
 
         return self._apply_migration(item_id, item_state, migrations)
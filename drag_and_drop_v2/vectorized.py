@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+""" Drag and Drop v2 XBlock - Vectorized grading of many learners' item states """
+from __future__ import absolute_import
+
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for bulk grading: `pip install xblock-drag-and-drop-v2[numpy]`
+    np = None
+
+from .definition import is_compact_item_state
+from .utils import StateMigration
+
+# Zone index of items left in the item bank
+BANK = -1
+# Zone index of items placed in a zone that is not (or no longer) part of the problem
+UNKNOWN_ZONE = -2
+
+EncodedItemStates = namedtuple('EncodedItemStates', [
+    'zones',  # learner × item matrix of zone indexes (or BANK/UNKNOWN_ZONE)
+    'correct',  # learner × item matrix of the correctness stored in the item state
+])
+
+GradingCounts = namedtuple('GradingCounts', [
+    'correctly_placed',  # Number of items placed correctly, per learner
+    'misplaced',  # Number of items placed incorrectly (decoys included), per learner
+    'missing',  # Number of required items left in the bank, per learner
+    'decoy_in_bank',  # Number of decoy items left in the bank, per learner
+    'correct',  # Numerator of the score (see `LearnerItemStats.counts`), per learner
+    'total',  # Denominator of the score, the same for all learners
+    'scores',  # Raw score, per learner
+])
+
+
+class GradingKernel:
+    """
+    Grades many learners' item states of a problem at once, with NumPy.
+
+    Items and zones of the problem definition are encoded as integer indexes, and item states as
+    learner × item matrices (see `encode`). `grade` then computes the same statistics as
+    `DragAndDropBlock._get_item_stats` for all learners in a few array operations.
+    """
+
+    def __init__(self, definition, layouts=None):
+        if np is None:
+            raise ImportError("numpy is required for vectorized grading.")
+
+        self.definition = definition
+        # Previous layouts of the problem (its `item_state_layouts`), to decode compact item state
+        self.layouts = layouts
+        self.item_ids = sorted(definition.all_item_ids)
+        self.item_index = {item_id: index for index, item_id in enumerate(self.item_ids)}
+        self.zone_uids = list(definition.zones_by_uid)
+        self.zone_index = {uid: index for index, uid in enumerate(self.zone_uids)}
+        self._migrator = StateMigration(definition)
+
+        item_zones = {str(item_id): zones for item_id, zones in definition.item_zones.items()}
+        # Correct zones of each item; the extra last column stands for UNKNOWN_ZONE, which is never correct
+        self.correct_zones = np.zeros((len(self.item_ids), len(self.zone_uids) + 1), dtype=bool)
+        for item_id, index in self.item_index.items():
+            for uid in item_zones[item_id]:
+                if uid in self.zone_index:
+                    self.correct_zones[index, self.zone_index[uid]] = True
+
+        self.required = np.array([item_id in definition.required_item_ids for item_id in self.item_ids], dtype=bool)
+        self.decoy = ~self.required
+
+    def encode(self, item_states):
+        """
+        Encodes a sequence of learners' `item_state` dicts as an `EncodedItemStates`.
+
+        Entries of items that are not part of the problem are ignored, as by `LearnerItemStats`. Compact item
+        states indexed by an unknown layout are encoded with all items in the bank.
+        """
+        shape = (len(item_states), len(self.item_ids))
+        zones = np.full(shape, BANK, dtype=np.int32)
+        correct = np.zeros(shape, dtype=bool)
+        for row, item_state in enumerate(item_states):
+            if is_compact_item_state(item_state):
+                item_state = self.definition.decode_item_state(item_state, self.layouts) or {}
+            for item_id, entry in item_state.items():
+                column = self.item_index.get(item_id)
+                if column is None:
+                    continue
+                entry = self._migrator.apply_item_state_migrations(item_id, entry)
+                zones[row, column] = self.zone_index.get(entry.get('zone'), UNKNOWN_ZONE)
+                correct[row, column] = entry['correct']
+        return EncodedItemStates(zones, correct)
+
+    def grade(self, encoded, ignore_decoys=False, reevaluate=False):
+        """
+        Returns the `GradingCounts` of encoded item states.
+
+        Correctness is read from the item states, like the block does. With `reevaluate`, it is evaluated
+        against the definition's correct zones instead, e.g. to regrade after the answer key changed.
+        """
+        placed = encoded.zones != BANK
+        if reevaluate:
+            zones = np.where(encoded.zones == UNKNOWN_ZONE, len(self.zone_uids), encoded.zones)
+            items = np.arange(len(self.item_ids))[np.newaxis, :]
+            correct = placed & self.correct_zones[items, np.where(placed, zones, 0)]
+        else:
+            correct = placed & encoded.correct
+
+        correctly_placed = correct.sum(axis=1)
+        misplaced = (placed & ~correct).sum(axis=1)
+        missing = (self.required & ~placed).sum(axis=1)
+        decoy_in_bank = (self.decoy & ~placed).sum(axis=1)
+
+        total = int(self.required.sum())
+        correct_count = correctly_placed
+        if not ignore_decoys:
+            total += int(self.decoy.sum())
+            correct_count = correctly_placed + decoy_in_bank
+
+        return GradingCounts(
+            correctly_placed, misplaced, missing, decoy_in_bank, correct_count, total,
+            correct_count / float(total) if total else np.full(len(correct_count), np.nan),
+        )
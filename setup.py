@@ -157,8 +157,12 @@ setup(
     ],
     url='https://github.com/openedx/xblock-drag-and-drop-v2',
     install_requires=load_requirements('requirements/base.in'),
+    extras_require={
+        'numpy': ['numpy'],
+    },
     entry_points={
         'xblock.v1': 'drag-and-drop-v2 = drag_and_drop_v2:DragAndDropBlock',
+        'console_scripts': ['drag-and-drop-v2-migrate = drag_and_drop_v2.migration:main'],
     },
     packages=['drag_and_drop_v2'],
     package_data=package_data("drag_and_drop_v2", ["static", "templates", "public", "translations"]),
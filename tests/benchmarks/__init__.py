@@ -0,0 +1,10 @@
+"""
+Benchmarks of the Drag and Drop v2 XBlock, run as scripts (`python -m tests.benchmarks.<name>`).
+"""
+import os
+
+import django
+
+# The block is run in the workbench runtime, as in the unit tests
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'workbench.settings')
+django.setup()
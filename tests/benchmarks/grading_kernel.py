@@ -0,0 +1,39 @@
+"""
+Compares the vectorized grading kernel with grading learners one block at a time.
+
+Run with `python -m tests.benchmarks.grading_kernel [learners]` (requires numpy).
+"""
+import sys
+import timeit
+
+from mock import patch
+
+from drag_and_drop_v2.default_data import DEFAULT_DATA
+from drag_and_drop_v2.definition import ProblemDefinition
+from drag_and_drop_v2.vectorized import GradingKernel
+
+from ..unit.test_vectorized import random_item_states
+from ..utils import make_block
+
+
+def main(learners=10000):
+    item_states = random_item_states(learners)
+    block = make_block()
+    kernel = GradingKernel(ProblemDefinition(DEFAULT_DATA))
+
+    def grade_blocks():
+        for item_state in item_states:
+            block.item_state = item_state
+            block.calculate_score()
+
+    def grade_kernel():
+        kernel.grade(kernel.encode(item_states))
+
+    for name, function in (('per-block', grade_blocks), ('kernel', grade_kernel)):
+        seconds = min(timeit.repeat(function, number=1, repeat=3))
+        print(f"{name:>10}: {seconds:.3f}s for {learners} learners ({learners / seconds:,.0f} learners/s)")
+
+
+if __name__ == '__main__':
+    with patch('drag_and_drop_v2.drag_and_drop_v2.grading_ignore_decoys_enabled', lambda _course_id: False):
+        main(*[int(arg) for arg in sys.argv[1:]])
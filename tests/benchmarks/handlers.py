@@ -0,0 +1,260 @@
+"""
+Benchmarks the handlers and views of the block on problems of realistic sizes.
+
+Each handler is run on the fixture problems of `tests/unit/data`, and on generated problems of 10 to 500 items
+and zones (with multi-zone items and decoys), in both standard and assessment mode. For each of them, the wall
+time per call, the peak memory allocated during a call and the memory it leaves allocated (as traced by
+`tracemalloc`) are recorded. Caches are warm: the numbers are those of the steady state of a long-running process.
+
+Results can be saved as a JSON baseline, and compared with a baseline of another revision:
+
+    python -m tests.benchmarks.handlers --output baseline.json
+    git checkout <other revision>
+    python -m tests.benchmarks.handlers --compare baseline.json
+
+The comparison exits with status 1 if any handler got slower than the baseline by more than `--threshold`.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from mock import patch
+
+from drag_and_drop_v2.utils import SHOWANSWER, Constants, StateMigration
+
+from ..unit.test_fixtures import loader
+from ..utils import make_block, make_request
+
+FIXTURES = ('plain', 'html', 'old', 'assessment')
+SIZES = (10, 50, 100, 500)
+QUICK_SIZES = (10, 100)
+MODES = (Constants.STANDARD_MODE, Constants.ASSESSMENT_MODE)
+REPEAT = 5
+
+
+def generate_data(size, seed=0):
+    """
+    Returns problem data with `size` items and zones: every fifth item can go to two zones,
+    and every seventh item is a decoy.
+    """
+    rng = random.Random(seed)
+    zones = [
+        {
+            'uid': f'zone-{index}',
+            'title': f'Zone <b>{index}</b>',
+            'description': f'Description of zone {index}',
+            'x': rng.randint(0, 500), 'y': rng.randint(0, 300), 'width': 100, 'height': 50,
+            'align': 'center',
+        }
+        for index in range(size)
+    ]
+    items = []
+    for index in range(size):
+        if index % 7 == 6:
+            item_zones = []
+        elif index % 5 == 4:
+            item_zones = [f'zone-{index}', f'zone-{(index + 1) % size}']
+        else:
+            item_zones = [f'zone-{index}']
+        items.append({
+            'id': index,
+            'displayName': f'Item <i>{index}</i>',
+            'imageURL': f'/static/item-{index}.png' if index % 3 == 0 else '',
+            'imageDescription': '',
+            'zones': item_zones,
+            'feedback': {'correct': f'Yes, <b>{index}</b>', 'incorrect': f'No, <b>{index}</b>'},
+        })
+    return {
+        'zones': zones,
+        'items': items,
+        'feedback': {'start': 'Intro <b>feedback</b>', 'finish': 'Final <b>feedback</b>'},
+        'targetImg': '/static/background.png',
+        'explanation': 'The <b>explanation</b>',
+    }
+
+
+def scenarios(sizes):
+    """
+    Yields (name, problem data) of the problems to benchmark.
+    """
+    for folder in FIXTURES:
+        yield f'fixture-{folder}', json.loads(loader.load_unicode(f'data/{folder}/data.json'))
+    for size in sizes:
+        yield f'generated-{size}', generate_data(size)
+
+
+def make_problem_block(data, mode):
+    """
+    Returns a block with the problem `data`, in `mode`, with half of its items placed correctly.
+    """
+    block = make_block()
+    block.data = data
+    block.mode = mode
+    block.max_attempts = 0
+    block.showanswer = SHOWANSWER.ALWAYS
+    placements = placeable_items(block)
+    block.item_state = {
+        str(item_id): {'zone': zone, 'correct': True} for item_id, zone in placements[:len(placements) // 2]
+    }
+    return block
+
+
+def placeable_items(block):
+    """
+    Returns (item_id, correct zone) of the items that have a correct zone.
+    """
+    return [
+        (item['id'], block.get_item_zones(item['id'])[0])
+        for item in block.data['items'] if block.get_item_zones(item['id'])
+    ]
+
+
+def call_handler(block, name, data):
+    """
+    Calls a JSON handler of `block`, failing if it does not succeed.
+    """
+    response = block.handle(name, make_request(data))
+    if response.status_code != 200:
+        raise AssertionError(f"{name} failed with {response.status_code}: {response.body}")
+    return response
+
+
+def handler_calls(block):
+    """
+    Returns a dict of benchmarked operation names to functions performing them once on `block`.
+    """
+    placements = placeable_items(block)
+    # Items that are not placed yet, dropped in turn on the initial item state, so that every call measures
+    # a drop on an unsolved problem rather than on one solved by the previous calls
+    unplaced = [(item_id, zone) for item_id, zone in placements if str(item_id) not in block.item_state]
+    initial_item_state = dict(block.item_state)
+    drops = iter(range(sys.maxsize))
+
+    def drop_item():
+        block.item_state = dict(initial_item_state)
+        block.item_state_version = StateMigration.ITEM_STATE_VERSION
+        del block.raw_earned
+        item_id, zone = unplaced[next(drops) % len(unplaced)]
+        call_handler(block, 'drop_item', {'val': item_id, 'zone': zone})
+
+    calls = {
+        'drop_item': drop_item,
+        'student_view_user_state': lambda: call_handler(block, 'student_view_user_state', None),
+        'student_view_data': block.student_view_data,
+        'index_dictionary': block.index_dictionary,
+    }
+    if block.mode == Constants.ASSESSMENT_MODE:
+        calls['do_attempt'] = lambda: call_handler(block, 'do_attempt', {})
+        calls['show_answer'] = lambda: call_handler(block, 'show_answer', {})
+    return calls
+
+
+def measure(function):
+    """
+    Returns the time per call (best and median of a few runs) and memory usage of a call of `function`: the peak
+    memory allocated during the call, and the memory still allocated after it, in bytes.
+    """
+    function()  # Warm up caches
+    timer = timeit.Timer(function)
+    number, __ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat=REPEAT, number=number)]
+
+    tracemalloc.start()
+    try:
+        baseline_size, __ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        function()
+        retained_size, peak_size = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time': statistics.median(times),
+        'time_min': min(times),
+        'peak_memory': peak_size - baseline_size,
+        'retained_memory': retained_size - baseline_size,
+    }
+
+
+def run(sizes):
+    """
+    Runs the benchmarks, returning the results keyed by "<scenario>/<mode>/<handler>".
+    """
+    results = {}
+    for scenario, data in scenarios(sizes):
+        for mode in MODES:
+            for handler in handler_calls(make_problem_block(data, mode)):
+                # A fresh block for each handler, so that handlers do not affect each other's measures
+                function = handler_calls(make_problem_block(data, mode))[handler]
+                key = f'{scenario}/{mode}/{handler}'
+                results[key] = measure(function)
+                print(f"{key:<60} {results[key]['time'] * 1000:9.3f} ms "
+                      f"{results[key]['peak_memory'] / 1024:9.1f} KiB", file=sys.stderr)
+    return results
+
+
+def environment():
+    """
+    Returns a description of where the benchmarks ran.
+    """
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {'python': platform.python_version(), 'machine': platform.platform(), 'revision': revision}
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of time per call of each handler since `baseline`, returning the keys of regressions.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline['results']:
+            continue
+        ratio = result['time'] / baseline['results'][key]['time']
+        flag = ''
+        if ratio > threshold:
+            regressions.append(key)
+            flag = '  REGRESSION'
+        print(f"{key:<60} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', maxsplit=1)[0].strip())
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Sizes of generated problems")
+    parser.add_argument('--quick', action='store_true', help=f"Only generate problems of sizes {QUICK_SIZES}")
+    parser.add_argument('--output', help="Save the results as a JSON baseline to this file")
+    parser.add_argument('--compare', help="Compare the results with the JSON baseline in this file")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio above which a handler is reported as a regression")
+    args = parser.parse_args(argv)
+
+    with patch('drag_and_drop_v2.drag_and_drop_v2.grading_ignore_decoys_enabled', lambda _course_id: False), \
+            patch('workbench.runtime.WorkbenchRuntime.local_resource_url',
+                  lambda _, _block, path: '/expanded/url/to/drag_and_drop_v2/' + path):
+        results = run(QUICK_SIZES if args.quick else args.sizes)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump({'environment': environment(), 'results': results}, output, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
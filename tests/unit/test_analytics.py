@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from drag_and_drop_v2.analytics import DropAnalytics, aggregate_files
+
+PROBLEM = 'block-v1:edX+DemoX+Demo+type@drag-and-drop-v2+block@problem'
+
+
+def make_line(user, item_id, location_id, is_correct, time, *, event_type='edx.drag_and_drop_v2.item.dropped'):
+    return json.dumps({
+        'event_type': event_type,
+        'time': time,
+        'context': {'user_id': user, 'module': {'usage_key': PROBLEM}},
+        'event': {'item_id': item_id, 'location_id': location_id, 'is_correct': is_correct},
+    })
+
+
+LINES = [
+    make_line(1, 0, 'zone-2', False, '2024-01-01T10:00:00'),
+    make_line(1, 0, 'zone-1', True, '2024-01-01T10:00:05'),
+    make_line(2, 0, 'zone-1', True, '2024-01-01T10:01:00'),
+    make_line(2, 1, 'zone-1', False, '2024-01-01T10:01:05'),
+    make_line(2, 1, -1, True, '2024-01-01T10:01:10'),
+    make_line(3, 1, 'zone-1', False, '2024-01-01T10:02:00'),
+    make_line(3, 1, 'zone-1', False, '2024-01-01T10:02:00', event_type='problem_check'),
+    'not json edx.drag_and_drop_v2.item.dropped',
+]
+
+EXPECTED_REPORT = {
+    PROBLEM: {
+        'items': {
+            '0': {
+                'drops': {'zone-2': 1, 'zone-1': 2},
+                'first_try': {'learners': 2, 'correct': 1, 'rate': 0.5},
+            },
+            '1': {
+                'drops': {'zone-1': 2, '-1': 1},
+                'first_try': {'learners': 2, 'correct': 0, 'rate': 0.0},
+            },
+        },
+        'hot_spots': [
+            {'location_id': 'zone-1', 'incorrect_drops': 2, 'items': {'1': 2}},
+            {'location_id': 'zone-2', 'incorrect_drops': 1, 'items': {'0': 1}},
+        ],
+    },
+}
+
+
+class DropAnalyticsTest(unittest.TestCase):
+    """ Tests for the aggregation of item dropped events """
+
+    def test_report(self):
+        report = DropAnalytics().add_lines(LINES).report()
+        self.assertEqual(report, EXPECTED_REPORT)
+
+    def test_merge_keeps_earliest_first_drop(self):
+        # Shards are not ordered: the first drop of learner 1 is in the second one
+        analytics = DropAnalytics().add_lines(LINES[1:]).merge(DropAnalytics().add_lines(LINES[:1]))
+        self.assertEqual(analytics.report(), EXPECTED_REPORT)
+
+    def test_usage_keys_shared(self):
+        analytics = DropAnalytics().add_lines(LINES)
+        usage_keys = list(analytics.drops) + list(analytics.errors) + list(analytics.first_drops)
+        self.assertTrue(all(usage_key is usage_keys[0] for usage_key in usage_keys))
+        self.assertEqual(analytics.first_drops[PROBLEM][0], {
+            1: ('2024-01-01T10:00:00', False),
+            2: ('2024-01-01T10:01:00', True),
+        })
+
+    def test_string_event_data(self):
+        event = json.loads(LINES[0])
+        event['event'] = json.dumps(event['event'])
+        report = DropAnalytics().add_lines([json.dumps(event)]).report()
+        self.assertEqual(report[PROBLEM]['items']['0']['drops'], {'zone-2': 1})
+
+
+class AggregateFilesTest(unittest.TestCase):
+    """ Tests for the aggregation of (sharded, compressed) tracking log files """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.paths = [os.path.join(self.directory, 'tracking.log'), os.path.join(self.directory, 'tracking.log.gz')]
+        with open(self.paths[0], 'w', encoding='utf-8') as log:
+            log.write('\n'.join(LINES[:3]) + '\n')
+        with gzip.open(self.paths[1], 'wt', encoding='utf-8') as log:
+            log.write('\n'.join(LINES[3:]) + '\n')
+
+    def test_in_process(self):
+        self.assertEqual(aggregate_files(self.paths).report(), EXPECTED_REPORT)
+
+    def test_process_pool(self):
+        self.assertEqual(aggregate_files(self.paths, processes=2).report(), EXPECTED_REPORT)
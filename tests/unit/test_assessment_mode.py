@@ -69,6 +69,54 @@ class AssessmentModeFixture(BaseDragAndDropAjaxFixture):
         for item_id in item_zone_map:
             self.assertIn(str(item_id), self.block.item_state)
 
+    def test_drop_items(self):
+        data = {"items": [self._make_submission(0, self.ZONE_1), self._make_submission(1, self.ZONE_1)]}
+        res = self.call_handler(self.DROP_ITEMS_HANDLER, data)
+
+        self.assertEqual(res, {"items": [{"val": 0, "zone": self.ZONE_1}, {"val": 1, "zone": self.ZONE_1}]})
+        self.assertEqual(self.block.item_state, {
+            '0': {'zone': self.ZONE_1, 'correct': True},
+            '1': {'zone': self.ZONE_1, 'correct': False},
+        })
+
+        # Items can also be returned to the bank
+        self.call_handler(self.DROP_ITEMS_HANDLER, {"items": [self._make_submission(1, None)]})
+        self.assertEqual(list(self.block.item_state), ['0'])
+
+    def test_drop_items_submit(self):
+        data = {"items": [self._make_submission(0, self.ZONE_1)], "submit": True}
+        res = self.call_handler(self.DROP_ITEMS_HANDLER, data)
+
+        self.assertEqual(res["attempt"]["attempts"], 1)
+        self.assertEqual(self.block.attempts, 1)
+        self.assertIn('0', self.block.item_state)
+
+    @ddt.data(
+        {},
+        {"items": []},
+        {"items": {"val": 0, "zone": "zone-1"}},
+        {"items": [{"val": 0, "zone": "zone-1"}, {"val": 99, "zone": "zone-1"}]},
+        {"items": [{"val": 0, "zone": "zone-1"}, {"val": 1, "zone": "no such zone"}]},
+        {"items": [{"val": 0, "zone": "zone-1"}, {"val": 1}]},
+        {"items": [{"val": [0], "zone": "zone-1"}]},
+        {"items": [{"val": True, "zone": "zone-1"}]},
+    )
+    def test_drop_items_validation(self, data):
+        res = self.call_handler(self.DROP_ITEMS_HANDLER, data, expect_json=False)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.block.item_state, {})  # Nothing applied when any placement is invalid
+
+    def test_drop_items_no_attempts_left(self):
+        self.block.max_attempts = 1
+        self.block.attempts = 1
+        data = {"items": [self._make_submission(0, self.ZONE_1)]}
+
+        res = self.call_handler(self.DROP_ITEMS_HANDLER, data, expect_json=False)
+
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(self.block.item_state, {})
+
     def test_get_user_state_no_attempts(self):
         self.block.attempts = 0
 
@@ -11,9 +11,11 @@ from drag_and_drop_v2.default_data import (BOTTOM_ZONE_ID, DEFAULT_DATA,
                                            FINISH_FEEDBACK, MIDDLE_ZONE_ID,
                                            START_FEEDBACK,
                                            TARGET_IMG_DESCRIPTION, TOP_ZONE_ID)
-from drag_and_drop_v2.utils import Constants, FeedbackMessages
+from drag_and_drop_v2.definition import content_fingerprint
+from drag_and_drop_v2.cache import expanded_url_cache
+from drag_and_drop_v2.utils import Constants, FeedbackMessages, StateMigration
 from xblock.scorable import Score
-from ..utils import TestCaseMixin, make_block
+from ..utils import TestCaseMixin, make_block, make_request
 
 
 @ddt.ddt
@@ -308,6 +310,27 @@ class BasicTests(TestCaseMixin, unittest.TestCase):
             '4': {'correct': False, "zone": BOTTOM_ZONE_ID},
         })
 
+    def test_user_state_conditional_get(self):
+        response = self.call_handler('student_view_user_state', method='GET', expect_json=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.etag)
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+
+        request = make_request(None, method='GET')
+        request.if_none_match = response.etag
+        with mock.patch.object(self.block, '_get_user_state') as get_user_state:
+            not_modified = self.block.handle('student_view_user_state', request)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.etag, response.etag)
+        self.assertEqual(not_modified.body, b'')
+        get_user_state.assert_not_called()
+
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': TOP_ZONE_ID})
+        modified = self.block.handle('student_view_user_state', request)
+        self.assertEqual(modified.status_code, 200)
+        self.assertNotEqual(modified.etag, response.etag)
+        self.assertEqual(modified.json['items'], {'0': {'correct': True, 'zone': TOP_ZONE_ID}})
+
     def test_studio_submit(self):
 
         body = self._make_submission()
@@ -324,7 +347,7 @@ class BasicTests(TestCaseMixin, unittest.TestCase):
         self.assertEqual(self.block.item_text_color, "coral")
         self.assertEqual(self.block.weight, 5)
         self.assertEqual(self.block.max_items_per_zone, None)
-        self.assertEqual(self.block.data, {'foo': 1, 'items': []})
+        self.assertEqual(self.block.data, {'foo': 1, 'items': [], 'zones': [], 'format_version': '2.1'})
 
     def test_studio_submit_assessment(self):
         def modify_submission(submission):
@@ -335,7 +358,9 @@ class BasicTests(TestCaseMixin, unittest.TestCase):
                 'show_title': True,
                 'max_attempts': 12,
                 'item_text_color': 'red',
-                'data': {'foo': 2, 'items': [{'zone': '1', 'title': 'qwe'}]},
+                'data': {'foo': 2, 'zones': [{'uid': '1'}], 'items': [
+                    {'id': 0, 'zone': '1', 'title': 'qwe', 'feedback': {'correct': '', 'incorrect': ''}},
+                ]},
             })
 
         body = self._make_submission(modify_submission)
@@ -352,7 +377,40 @@ class BasicTests(TestCaseMixin, unittest.TestCase):
         self.assertEqual(self.block.item_text_color, "red")
         self.assertEqual(self.block.weight, 5)
         self.assertEqual(self.block.max_items_per_zone, 4)
-        self.assertEqual(self.block.data, {'foo': 2, 'items': [{'zone': '1', 'title': 'qwe'}]})
+        self.assertEqual(self.block.data, {
+            'foo': 2,
+            'zones': [{'uid': '1', 'align': 'center'}],
+            'items': [{'id': 0, 'zones': ['1'], 'title': 'qwe', 'feedback': {'correct': '', 'incorrect': ''}}],
+            'format_version': '2.1',
+        })
+
+    def test_studio_submit_invalid_data(self):
+        def modify_submission(submission):
+            submission['display_name'] = "Not saved"
+            feedback = {'correct': '', 'incorrect': ''}
+            submission['data'] = {'zones': [{'uid': '1'}], 'items': [
+                {'id': 0, 'zones': ['2'], 'feedback': feedback}, {'id': '0', 'feedback': feedback},
+            ]}
+
+        body = self._make_submission(modify_submission)
+        res = self.call_handler('studio_submit', body)
+
+        self.assertEqual(res, {'result': 'error', 'messages': [
+            "Item 0 refers to a zone that does not exist: 2.",
+            "Duplicate item ID: 0.",
+        ]})
+        self.assertNotEqual(self.block.display_name, "Not saved")
+        self.assertEqual(self.block.data, DEFAULT_DATA)
+
+    @ddt.data({'zones': 'x', 'items': []}, {'zones': [], 'items': ['x']}, {'zones': [], 'items': [{'id': 0}]})
+    def test_studio_submit_malformed_data(self, data):
+        def modify_submission(submission):
+            submission['data'] = data
+
+        res = self.call_handler('studio_submit', self._make_submission(modify_submission))
+
+        self.assertEqual(res['result'], 'error')
+        self.assertEqual(self.block.data, DEFAULT_DATA)
 
     def test_studio_submit_empty_max_items(self):
         def modify_submission(submission):
@@ -393,3 +451,142 @@ class BasicTests(TestCaseMixin, unittest.TestCase):
             self.block.student_view_data()["target_img_expanded_url"],
             '/course/test-course/assets/foo.png',
         )
+
+    def test_student_view_data_cached(self):
+        """ Content-only part of student_view_data is built once per content and settings version """
+        build_content_data = self.block._build_student_view_content_data  # pylint: disable=protected-access
+        with mock.patch.object(self.block, '_build_student_view_content_data', wraps=build_content_data) as build:
+            first = self.block.student_view_data()
+            second = self.block.student_view_data()
+            self.assertEqual(first, second)
+            self.assertEqual(build.call_count, 1)
+
+            # Returned data is a fresh copy, so callers can't corrupt the cache
+            first["items"].clear()
+            self.assertEqual(len(self.block.student_view_data()["items"]), 5)
+            self.assertEqual(build.call_count, 1)
+
+            self.block.display_name = "Updated"
+            self.assertEqual(self.block.student_view_data()["display_name"], "Updated")
+            self.block.data["items"][0]["displayName"] = "Updated item"
+            self.assertEqual(self.block.student_view_data()["items"][0]["displayName"], "Updated item")
+            self.assertEqual(build.call_count, 3)
+
+    @mock.patch('drag_and_drop_v2.DragAndDropBlock.has_submission_deadline_passed', new_callable=mock.PropertyMock)
+    def test_student_view_data_learner_flags_not_cached(self, mock_deadline_passed):
+        mock_deadline_passed.return_value = False
+        self.assertFalse(self.block.student_view_data()["has_deadline_passed"])
+        mock_deadline_passed.return_value = True
+        self.assertTrue(self.block.student_view_data()["has_deadline_passed"])
+
+    def test_image_urls_expanded_in_one_call(self):
+        """ All image URLs of student_view_data are expanded with a single runtime call, memoized per course """
+        expanded_url_cache.clear()
+        self.block.data["targetImg"] = "/static/target.png"
+        for item in self.block.data["items"]:
+            item["imageURL"] = f"/static/item-{item['id']}.png"
+        self.block.data["items"][1]["imageURL"] = "/static/item-0.png"
+
+        replace_urls_service = self.block.runtime.service(self.block, 'replace_urls')
+        with mock.patch.object(
+            replace_urls_service, 'replace_urls', wraps=replace_urls_service.replace_urls
+        ) as replace_urls:
+            config = self.block.student_view_data()
+            self.assertEqual(replace_urls.call_count, 1)
+            self.assertEqual(config["target_img_expanded_url"], '/course/test-course/assets/target.png')
+            self.assertEqual(
+                [item["expandedImageURL"] for item in config["items"]],
+                [f'/course/test-course/assets/item-{i}.png' for i in [0, 0, 2, 3, 4]]
+            )
+
+            self.assertEqual(self.block._expand_static_url("/static/item-3.png"),  # pylint: disable=protected-access
+                             '/course/test-course/assets/item-3.png')
+            self.assertEqual(replace_urls.call_count, 1)
+
+    def test_static_urls_memoized_per_course_only(self):
+        """ URLs are not memoized for blocks outside of a known course, nor for the expand_static_url handler """
+        expanded_url_cache.clear()
+        replace_urls_service = self.block.runtime.service(self.block, 'replace_urls')
+        with mock.patch.object(
+            replace_urls_service, 'replace_urls', wraps=replace_urls_service.replace_urls
+        ) as replace_urls:
+            for __ in range(2):
+                self.assertEqual(self.call_handler('expand_static_url', "/static/x.png"),
+                                 {'url': '/course/test-course/assets/x.png'})
+            self.assertEqual(replace_urls.call_count, 2)
+            self.assertEqual(len(expanded_url_cache), 0)
+
+            del self.block.runtime.course_id
+            self.block.data["targetImg"] = "/static/target.png"
+            for __ in range(2):
+                self.assertEqual(self.block.target_img_expanded_url, '/course/test-course/assets/target.png')
+            self.assertEqual(replace_urls.call_count, 4)
+            self.assertEqual(len(expanded_url_cache), 0)
+
+    def test_legacy_state_written_back(self):
+        """ Legacy item state is migrated and persisted on the first write, so later reads skip migrations """
+        self.block.item_state = {
+            '0': [60, 20],
+            '2': {'x_percent': '99%', 'y_percent': '95%', 'zone': BOTTOM_ZONE_ID},
+        }
+        self.assertEqual(self.block.item_state_version, "")
+
+        self.call_handler(self.DROP_ITEM_HANDLER, {"val": 1, "zone": MIDDLE_ZONE_ID})
+
+        self.assertEqual(self.block.item_state_version, StateMigration.ITEM_STATE_VERSION)
+        self.assertEqual(self.block.item_state, {
+            '0': {'correct': True, 'zone': TOP_ZONE_ID},
+            '1': {'correct': True, 'zone': MIDDLE_ZONE_ID},
+            '2': {'correct': True, 'zone': BOTTOM_ZONE_ID},
+        })
+        with mock.patch.object(StateMigration, 'apply_item_state_migrations') as apply_migrations:
+            self.assertEqual(len(self.call_handler('student_view_user_state')['items']), 3)
+            apply_migrations.assert_not_called()
+
+    def test_current_state_not_copied(self):
+        self.block.item_state = {'0': {'correct': True, 'zone': TOP_ZONE_ID}}
+        item_state = self.block._get_item_state()  # pylint: disable=protected-access
+        self.assertIs(item_state['0'], self.block.item_state['0'])
+
+    def test_derived_values_memoized_in_request(self):
+        """ Derived values are computed once per request, and recomputed after a field is written """
+        # pylint: disable=protected-access
+        self.block.mode = Constants.ASSESSMENT_MODE
+        answer_correctness = self.block._answer_correctness
+        with mock.patch.object(self.block, '_answer_correctness', wraps=answer_correctness) as correctness:
+            self.assertFalse(self.block.is_correct)
+            self.assertFalse(self.block.is_correct)
+            self.assertEqual(correctness.call_count, 2)  # Not memoized outside of a request scope
+
+            correctness.reset_mock()
+            with self.block._request_scope():
+                self.assertFalse(self.block.is_correct)
+                self.assertFalse(self.block.is_correct)
+                self.assertEqual(correctness.call_count, 1)
+
+                self.block.attempts = 1
+                self.assertFalse(self.block.is_correct)
+                self.assertEqual(correctness.call_count, 2)
+
+                for item_id, zone in enumerate([TOP_ZONE_ID, MIDDLE_ZONE_ID, BOTTOM_ZONE_ID, MIDDLE_ZONE_ID]):
+                    self.block._set_item_state_entry(str(item_id), {'zone': zone, 'correct': True})
+                self.assertTrue(self.block.is_correct)
+                self.assertEqual(correctness.call_count, 3)
+
+            self.assertIsNone(self.block._request_cache)
+
+    def test_problem_definition_kept_until_data_written(self):
+        """ Values that only depend on `data` are not discarded when other fields are written """
+        # pylint: disable=protected-access
+        with mock.patch('drag_and_drop_v2.drag_and_drop_v2.content_fingerprint', wraps=content_fingerprint) as hashed:
+            with self.block._request_scope():
+                definition = self.block.problem_definition
+                self.block.attempts = 1
+                for item_id, zone in enumerate([TOP_ZONE_ID, MIDDLE_ZONE_ID, BOTTOM_ZONE_ID]):
+                    self.block._set_item_state_entry(str(item_id), {'zone': zone, 'correct': True})
+                self.assertIs(self.block.problem_definition, definition)
+                self.assertEqual(hashed.call_count, 1)
+
+                self.block.data = dict(self.block.data, zones=self.block.data['zones'][:2])
+                self.assertEqual(len(self.block.problem_definition.zones), 2)
+                self.assertEqual(hashed.call_count, 2)
@@ -0,0 +1,22 @@
+import itertools
+import operator
+import unittest
+
+from drag_and_drop_v2.bulk import chunks, map_in_pool
+
+
+class BulkTest(unittest.TestCase):
+    """ Tests for the helpers shared by the bulk tools """
+
+    def test_chunks(self):
+        self.assertEqual(list(chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunks([], 2)), [])
+
+    def test_chunks_read_lazily(self):
+        records = itertools.count()
+        self.assertEqual(next(chunks(records, 3)), [0, 1, 2])
+        self.assertEqual(next(records), 3)
+
+    def test_map_in_pool(self):
+        args = ((number, number) for number in range(20))
+        self.assertEqual(list(map_in_pool(operator.mul, args, processes=2)), [number * number for number in range(20)])
@@ -0,0 +1,142 @@
+import unittest
+
+import mock
+
+from drag_and_drop_v2 import compat
+from drag_and_drop_v2.cache import LRUCache, definition_cache, invalidate_usage, waffle_flag_cache
+from drag_and_drop_v2.instrumentation import MemoryReporter, reporting
+
+from ..utils import TestCaseMixin, make_block
+
+
+class FakeTimer:
+    """ Manually advanced clock """
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTest(unittest.TestCase):
+    """ Tests for the process-wide LRU cache """
+
+    def test_eviction_order(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'a' becomes the most recently used entry
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = LRUCache(maxsize=10, ttl=5, timer=timer)
+        cache.set('a', 1)
+        timer.now = 4
+        self.assertEqual(cache.get('a'), 1)
+        timer.now = 5
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_get_or_set_counters(self):
+        cache = LRUCache(maxsize=10)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return 'value'
+
+        self.assertEqual(cache.get_or_set('a', factory), 'value')
+        self.assertEqual(cache.get_or_set('a', factory), 'value')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats(), {'size': 1, 'maxsize': 10, 'hits': 1, 'misses': 1})
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {'size': 0, 'maxsize': 10, 'hits': 0, 'misses': 0})
+
+    def test_invalidate_usage(self):
+        cache = LRUCache(maxsize=10)
+        cache.set(('block-1', 'fingerprint-1'), 1)
+        cache.set(('block-1', 'fingerprint-2'), 2)
+        cache.set(('block-2', 'fingerprint-1'), 3)
+
+        invalidate_usage(cache, 'block-1')
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(('block-2', 'fingerprint-1')), 3)
+
+
+class WaffleFlagCacheTest(unittest.TestCase):
+    """ Tests for the per-course cache of waffle flag values """
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        for patcher in (
+            mock.patch.object(waffle_flag_cache, '_timer', self.timer),
+            mock.patch('drag_and_drop_v2.compat.get_grading_ignore_decoys_waffle_flag'),
+        ):
+            self.addCleanup(patcher.stop)
+            patched = patcher.start()
+        self.get_flag = patched
+        waffle_flag_cache.clear()
+        self.addCleanup(waffle_flag_cache.clear)
+        self.get_flag.return_value.is_enabled.side_effect = lambda course_id: course_id == 'course-a'
+        compat._grading_ignore_decoys_waffle_flag.cache_clear()  # pylint: disable=protected-access
+        self.addCleanup(compat._grading_ignore_decoys_waffle_flag.cache_clear)  # pylint: disable=protected-access
+
+    def test_lookups_cached_per_course(self):
+        reporter = MemoryReporter()
+        with reporting(reporter):
+            for __ in range(3):
+                self.assertTrue(compat.grading_ignore_decoys_enabled('course-a'))
+                self.assertFalse(compat.grading_ignore_decoys_enabled('course-b'))
+
+        self.assertEqual(self.get_flag.call_count, 1)
+        self.assertEqual(self.get_flag.return_value.is_enabled.call_count, 2)
+        self.assertEqual(reporter.counters['waffle_flag.grading_ignore_decoys.lookups'], 2)
+        self.assertEqual(reporter.counters['cache.waffle_flag.hits'], 4)
+
+    def test_ttl(self):
+        compat.grading_ignore_decoys_enabled('course-a')
+        self.timer.now += waffle_flag_cache.ttl + 1
+        compat.grading_ignore_decoys_enabled('course-a')
+
+        self.assertEqual(self.get_flag.call_count, 1)
+        self.assertEqual(self.get_flag.return_value.is_enabled.call_count, 2)
+
+
+class BlockDefinitionCacheTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for sharing compiled definitions between block instances """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def _cache_key(self):
+        return (str(self.block.scope_ids.usage_id), self.block.problem_definition.fingerprint)
+
+    def test_definition_cached_per_usage(self):
+        definition = self.block.problem_definition
+        self.assertIs(definition_cache.get(self._cache_key()), definition)
+
+    def test_studio_submit_invalidates(self):
+        key = self._cache_key()
+        self.call_handler('studio_submit', {
+            'display_name': "Test Drag & Drop",
+            'mode': 'standard',
+            'max_attempts': 1,
+            'show_title': False,
+            'problem_text': "Problem Drag & Drop",
+            'show_problem_header': False,
+            'showanswer': "attempted",
+            'item_background_color': '',
+            'item_text_color': '',
+            'weight': '1',
+            'data': {'items': [], 'zones': []},
+        })
+        self.assertIsNone(definition_cache.get(key))
@@ -0,0 +1,285 @@
+import copy
+import unittest
+
+import mock
+
+from drag_and_drop_v2.default_data import (BOTTOM_ZONE_ID, DEFAULT_DATA,
+                                           MIDDLE_ZONE_ID, TOP_ZONE_ID)
+from drag_and_drop_v2.definition import ProblemDataError, ProblemDefinition, content_fingerprint, normalize_data
+from drag_and_drop_v2.grading import calculate_score
+from drag_and_drop_v2.utils import StateMigration
+
+from ..utils import TestCaseMixin, make_block
+
+ITEM_FEEDBACK = {'correct': 'Correct', 'incorrect': 'Incorrect'}
+
+
+class ProblemDefinitionTest(unittest.TestCase):
+    """ Tests for the compiled problem definition """
+
+    def test_indexes(self):
+        definition = ProblemDefinition(DEFAULT_DATA)
+
+        self.assertEqual(definition.get_item(1)['displayName'], "Goes to the middle")
+        self.assertEqual(definition.get_item_zones(0), (TOP_ZONE_ID,))
+        self.assertEqual(definition.get_item_zones(3), (TOP_ZONE_ID, BOTTOM_ZONE_ID, MIDDLE_ZONE_ID))
+        self.assertEqual(definition.get_item_zones(4), ())
+        self.assertEqual(definition.required_item_ids, {'0', '1', '2', '3'})
+        self.assertEqual(definition.decoy_item_ids, {'4'})
+        self.assertEqual(definition.get_zone(MIDDLE_ZONE_ID)['uid'], MIDDLE_ZONE_ID)
+        self.assertIsNone(definition.get_zone('no such zone'))
+
+    def test_legacy_data(self):
+        data = {
+            'zones': [{'id': 1, 'index': 2, 'title': '<b>Zone</b><script>x</script>', 'align': 'none'}],
+            'items': [
+                {'id': 0, 'zone': '<b>Zone</b><script>x</script>', 'displayName': '<i>A</i>'},
+                {'id': 1, 'zone': 'none'},
+            ],
+        }
+        definition = ProblemDefinition(data)
+
+        zone = definition.get_zone('<b>Zone</b><script>x</script>')
+        self.assertEqual(dict(zone), {
+            'uid': '<b>Zone</b><script>x</script>', 'title': '<b>Zone</b>x', 'align': 'center'
+        })
+        self.assertEqual(definition.get_item_zones(0), ('<b>Zone</b><script>x</script>',))
+        self.assertEqual(definition.decoy_item_ids, {'1'})
+        self.assertEqual(definition.sanitized_display_names[0], '<i>A</i>')
+        # Source data is not modified by migrations
+        self.assertIn('id', data['zones'][0])
+
+    def test_normalized_data(self):
+        data = {
+            'zones': [{'id': 1, 'index': 2, 'title': 'Zone', 'align': 'none'}],
+            'items': [
+                {'id': 0, 'zone': 'Zone', 'backgroundImage': '/static/a.png', 'feedback': ITEM_FEEDBACK},
+                {'id': 1, 'zone': 'none', 'feedback': ITEM_FEEDBACK},
+                {'id': 2, 'zones': ['Zone'], 'imageURL': '/static/b.png', 'feedback': ITEM_FEEDBACK},
+            ],
+            'feedback': {'start': 'Start'},
+        }
+
+        normalized_data = normalize_data(data)
+
+        self.assertEqual(normalized_data, {
+            'zones': [{'uid': 'Zone', 'title': 'Zone', 'align': 'center'}],
+            'items': [
+                {'id': 0, 'zones': ['Zone'], 'imageURL': '/static/a.png', 'feedback': ITEM_FEEDBACK},
+                {'id': 1, 'zones': [], 'feedback': ITEM_FEEDBACK},
+                {'id': 2, 'zones': ['Zone'], 'imageURL': '/static/b.png', 'feedback': ITEM_FEEDBACK},
+            ],
+            'feedback': {'start': 'Start'},
+            'format_version': '2.1',
+        })
+        self.assertEqual(normalize_data(normalized_data), normalized_data)
+        legacy_definition = ProblemDefinition(data)
+        with mock.patch.object(StateMigration, 'apply_zone_migrations') as apply_zone_migrations:
+            definition = ProblemDefinition(normalized_data)
+        apply_zone_migrations.assert_not_called()
+        self.assertEqual(definition.zones, legacy_definition.zones)
+        self.assertEqual(dict(definition.item_zones), dict(legacy_definition.item_zones))
+        self.assertEqual(dict(definition.item_image_urls), dict(legacy_definition.item_image_urls))
+
+    def test_invalid_data(self):
+        data = {
+            'zones': [{'uid': 'Zone'}, {'uid': 'Zone'}],
+            'items': [
+                {'id': 0, 'zones': ['Zone', 'Other zone'], 'feedback': ITEM_FEEDBACK},
+                {'id': 0, 'feedback': ITEM_FEEDBACK},
+                {'displayName': 'No ID'},
+                {'id': 1, 'zones': 'Zone'},
+            ],
+        }
+
+        with self.assertRaises(ProblemDataError) as raised:
+            normalize_data(data)
+
+        self.assertEqual(raised.exception.messages, [
+            "Duplicate zone UID: Zone.",
+            "Item 0 refers to a zone that does not exist: Other zone.",
+            "Duplicate item ID: 0.",
+            "Item without an ID.",
+            "Item 1 must have correct and incorrect feedback.",
+            "Zones of item 1 must be a list.",
+        ])
+        for invalid_data in (None, {'zones': 'Zone'}, {'items': {}}, {'zones': ['Zone']}, {'items': [0]}):
+            with self.assertRaises(ProblemDataError):
+                normalize_data(invalid_data)
+
+    def test_read_only(self):
+        definition = ProblemDefinition(DEFAULT_DATA)
+        with self.assertRaises(TypeError):
+            definition.get_item(0)['displayName'] = 'changed'  # pylint: disable=unsupported-assignment-operation
+        with self.assertRaises(AttributeError):
+            definition.extra = 1  # pylint: disable=assigning-non-slot
+
+    def test_fingerprint(self):
+        data = copy.deepcopy(DEFAULT_DATA)
+        fingerprint = content_fingerprint(data)
+        self.assertEqual(fingerprint, content_fingerprint(copy.deepcopy(DEFAULT_DATA)))
+        data['items'][0]['zones'] = [BOTTOM_ZONE_ID]
+        self.assertNotEqual(fingerprint, content_fingerprint(data))
+
+    def test_compact_item_state(self):
+        definition = ProblemDefinition(DEFAULT_DATA)
+        item_state = {
+            '1': {'zone': MIDDLE_ZONE_ID, 'correct': True},
+            '4': {'zone': TOP_ZONE_ID, 'correct': False},
+        }
+
+        compact_item_state = definition.encode_item_state(item_state)
+
+        self.assertEqual(compact_item_state, {'layout': definition.layout_fingerprint, 'items': [-1, 3, -1, -1, 0]})
+        self.assertEqual(definition.decode_item_state(compact_item_state), item_state)
+        self.assertEqual(definition.encode_item_state({}), {})
+        self.assertIsNone(definition.encode_item_state({'1': {'zone': 'removed zone', 'correct': False}}))
+        self.assertEqual(definition.encode_item_state_entry('1', {'zone': MIDDLE_ZONE_ID, 'correct': True}), (1, 3))
+        self.assertEqual(definition.encode_item_state_entry('1', None), (1, -1))
+        self.assertIsNone(definition.encode_item_state_entry('9', None))
+
+    def test_compact_item_state_previous_layout(self):
+        previous_definition = ProblemDefinition(DEFAULT_DATA)
+        compact_item_state = previous_definition.encode_item_state({'0': {'zone': TOP_ZONE_ID, 'correct': True}})
+        data = copy.deepcopy(DEFAULT_DATA)
+        data['zones'].reverse()
+        definition = ProblemDefinition(data)
+        self.assertNotEqual(definition.layout_fingerprint, previous_definition.layout_fingerprint)
+
+        self.assertIsNone(definition.decode_item_state(compact_item_state))
+        layouts = {previous_definition.layout_fingerprint: dict(previous_definition.layout)}
+        self.assertEqual(
+            definition.decode_item_state(compact_item_state, layouts), {'0': {'zone': TOP_ZONE_ID, 'correct': True}}
+        )
+
+
+class BlockProblemDefinitionTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for the way the block compiles its problem definition """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def test_definition_reused_until_data_changes(self):
+        definition = self.block.problem_definition
+        self.assertIs(self.block.problem_definition, definition)
+
+        self.block.data['items'][0]['zones'] = [BOTTOM_ZONE_ID]
+        updated_definition = self.block.problem_definition
+        self.assertIsNot(updated_definition, definition)
+        self.assertEqual(self.block.get_item_zones(0), [BOTTOM_ZONE_ID])
+
+
+class BlockCompactItemStateTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for learner item state stored in the compact format """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+        self.settings = {'compact_item_state': True}
+        patcher = mock.patch.object(self.block, 'get_xblock_settings', side_effect=lambda default: self.settings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_items(self):
+        return self.call_handler('student_view_user_state', method='GET')['items']
+
+    def test_written_and_read(self):
+        self.block.item_state = {'0': {'zone': TOP_ZONE_ID, 'correct': True}}  # Read in both formats
+
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 1, 'zone': MIDDLE_ZONE_ID})
+
+        self.assertEqual(self.block.item_state_version, StateMigration.COMPACT_ITEM_STATE_VERSION)
+        self.assertEqual(self.block.item_state['items'], [1, 3, -1, -1, -1])
+        self.assertEqual(self._get_items(), {
+            '0': {'zone': TOP_ZONE_ID, 'correct': True},
+            '1': {'zone': MIDDLE_ZONE_ID, 'correct': True},
+        })
+
+        self.settings = {}
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 2, 'zone': BOTTOM_ZONE_ID})
+        self.assertEqual(self.block.item_state_version, StateMigration.ITEM_STATE_VERSION)
+        self.assertEqual(self.block.item_state, {
+            '0': {'zone': TOP_ZONE_ID, 'correct': True},
+            '1': {'zone': MIDDLE_ZONE_ID, 'correct': True},
+            '2': {'zone': BOTTOM_ZONE_ID, 'correct': True},
+        })
+
+    def test_batch_written_in_place(self):
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': TOP_ZONE_ID})
+        items = [{'val': 1, 'zone': MIDDLE_ZONE_ID}, {'val': 2, 'zone': BOTTOM_ZONE_ID}]
+
+        decode = ProblemDefinition.decode_item_state
+        with mock.patch.object(ProblemDefinition, 'encode_item_state') as encode_item_state, \
+                mock.patch.object(ProblemDefinition, 'decode_item_state', autospec=True, side_effect=decode) as decode:
+            self.call_handler('drop_items', {'items': items})
+
+        encode_item_state.assert_not_called()
+        self.assertEqual(decode.call_count, 1)  # For the item statistics, which are then updated incrementally
+        self.assertEqual(self.block.item_state['items'], [1, 3, 5, -1, -1])
+
+    def _submit_data(self, data):
+        self.block.unmixed_class = mock.Mock()
+        self.block.unmixed_class.__name__ = 'dummy_block'
+        self.call_handler('studio_submit', {
+            'display_name': self.block.display_name, 'mode': self.block.mode, 'max_attempts': None,
+            'showanswer': self.block.showanswer, 'show_title': True, 'problem_text': '', 'show_problem_header': True,
+            'weight': 1, 'item_background_color': '', 'item_text_color': '', 'max_items_per_zone': None,
+            'data': data,
+        })
+
+    def test_remapped_when_zones_change(self):
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': TOP_ZONE_ID})
+        previous_item_state = self.block.item_state
+        data = copy.deepcopy(self.block.data)
+        data['zones'].reverse()
+
+        self._submit_data(data)
+
+        self.assertEqual(list(self.block.item_state_layouts), [previous_item_state['layout']])
+        self.assertEqual(self._get_items(), {'0': {'zone': TOP_ZONE_ID, 'correct': True}})
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 1, 'zone': MIDDLE_ZONE_ID})
+        self.assertEqual(self.block.item_state['layout'], self.block.problem_definition.layout_fingerprint)
+        self.assertEqual(self.block.item_state['items'], [5, 3, -1, -1, -1])
+
+    def test_layouts_recorded_when_layout_changes(self):
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': TOP_ZONE_ID})
+        first_layout = self.block.item_state['layout']
+        data = copy.deepcopy(self.block.data)
+        data['feedback']['start'] = 'Edited'
+        self._submit_data(data)
+        self.assertEqual(self.block.item_state_layouts, {})
+
+        layouts = [first_layout]
+        for _ in range(25):
+            data = copy.deepcopy(self.block.data)
+            data['zones'].append(dict(data['zones'][0], uid=f"zone-{len(data['zones'])}"))
+            self._submit_data(data)
+            layouts.append(self.block.problem_definition.layout_fingerprint)
+
+        self.assertEqual(list(self.block.item_state_layouts), layouts[:-1])
+        self.assertEqual(self._get_items(), {'0': {'zone': TOP_ZONE_ID, 'correct': True}})
+
+    def test_unknown_layout_not_overwritten(self):
+        for item_id, zone in ((0, TOP_ZONE_ID), (1, MIDDLE_ZONE_ID), (2, BOTTOM_ZONE_ID)):
+            self.call_handler(self.DROP_ITEM_HANDLER, {'val': item_id, 'zone': zone})
+        item_state = copy.deepcopy(self.block.item_state)
+        score = self.block.get_score()
+        # Content changed without going through studio_submit, e.g. by a course import
+        data = copy.deepcopy(self.block.data)
+        data['zones'].append(dict(data['zones'][0], uid='new zone', title='New zone'))
+        self.block.data = data
+
+        for handler, handler_data in (
+                (self.DROP_ITEM_HANDLER, {'val': 3, 'zone': TOP_ZONE_ID}),
+                (self.DROP_ITEMS_HANDLER, {'items': [{'val': 3, 'zone': TOP_ZONE_ID}]}),
+        ):
+            response = self.call_handler(handler, handler_data, expect_json=False)
+            self.assertEqual(response.status_code, 409)
+
+        self.assertEqual(self.block.item_state, item_state)
+        self.assertEqual(self.block.item_state_version, StateMigration.COMPACT_ITEM_STATE_VERSION)
+        self.assertEqual(self.block.get_score(), score)
+        self.assertIsNone(calculate_score(data, item_state, item_state_version=self.block.item_state_version))
+        with self.assertRaises(ValueError):
+            self.block.calculate_score()
@@ -0,0 +1,100 @@
+import unittest
+
+import mock
+
+from drag_and_drop_v2.events import EventBuffer
+
+from ..utils import TestCaseMixin, make_block
+
+SINK_EVENTS = []
+
+
+def record_event(block, event_type, data):  # pylint: disable=unused-argument
+    """ Event sink used by the tests below """
+    SINK_EVENTS.append((event_type, data))
+
+
+class EventBufferTest(unittest.TestCase):
+    """ Tests for the buffer of published events """
+
+    def test_flush_in_order(self):
+        event_buffer = EventBuffer()
+        event_buffer.add('first', {'a': 1})
+        event_buffer.add('second', {'b': 2})
+        published = []
+
+        event_buffer.flush(lambda event_type, data: published.append((event_type, data)))
+
+        self.assertEqual(published, [('first', {'a': 1}), ('second', {'b': 2})])
+        self.assertEqual(len(event_buffer), 0)
+
+    def test_dedupe(self):
+        event_buffer = EventBuffer()
+        event_buffer.add('grade', {'value': 1})
+        event_buffer.add('progress', {})
+        event_buffer.add('item.dropped', {'item_id': 0})
+        event_buffer.add('grade', {'value': 2})
+        event_buffer.add('progress', {})
+        event_buffer.add('item.dropped', {'item_id': 0})
+        published = []
+
+        event_buffer.flush(lambda event_type, data: published.append((event_type, data)))
+
+        self.assertEqual(published, [
+            ('grade', {'value': 2}),
+            ('progress', {}),
+            ('item.dropped', {'item_id': 0}),
+            ('item.dropped', {'item_id': 0}),
+        ])
+
+
+class BlockEventsTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for the way the block publishes events """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+        self.block.runtime.publish = mock.Mock()
+        del SINK_EVENTS[:]
+
+    def _published_events(self):
+        return [call_args[0][1] for call_args in self.block.runtime.publish.call_args_list]
+
+    def test_published_when_handler_ends(self):
+        buffered_events = self.block._buffered_events  # pylint: disable=protected-access
+        with buffered_events():
+            with buffered_events():
+                self.block.publish_grade()
+            self.block.runtime.publish.assert_not_called()
+
+        self.assertEqual(self._published_events(), ['grade'])
+
+    def test_published_immediately_outside_of_handler(self):
+        self.block.publish_grade()
+        self.assertEqual(self._published_events(), ['grade'])
+
+    def test_drop_items_publishes_once(self):
+        self.call_handler(self.DROP_ITEMS_HANDLER, {'items': [
+            {'val': 0, 'zone': self.block.zones[0]['uid']},
+            {'val': 1, 'zone': self.block.zones[0]['uid']},
+        ]})
+
+        self.assertEqual(self._published_events(), [
+            'grade', 'progress', 'edx.drag_and_drop_v2.item.dropped', 'edx.drag_and_drop_v2.item.dropped'
+        ])
+
+    def test_event_sink(self):
+        settings = {'event_sink': 'tests.unit.test_events.record_event'}
+        with mock.patch.object(self.block, 'get_xblock_settings', return_value=settings):
+            self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': self.block.zones[0]['uid']})
+
+        # Grading events always go through the runtime
+        self.assertEqual(self._published_events(), ['grade', 'progress'])
+        self.assertEqual([event_type for event_type, __ in SINK_EVENTS], ['edx.drag_and_drop_v2.item.dropped'])
+
+    def test_invalid_event_sink(self):
+        settings = {'event_sink': 'tests.unit.test_events.no_such_sink'}
+        with mock.patch.object(self.block, 'get_xblock_settings', return_value=settings):
+            self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': self.block.zones[0]['uid']})
+
+        self.assertEqual(self._published_events(), ['grade', 'progress', 'edx.drag_and_drop_v2.item.dropped'])
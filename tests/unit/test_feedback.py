@@ -0,0 +1,71 @@
+import unittest
+
+import mock
+
+from drag_and_drop_v2.definition import ProblemDefinition
+from drag_and_drop_v2.feedback import FeedbackRenderer, get_feedback_renderer
+from drag_and_drop_v2.utils import DummyTranslationService, FeedbackMessage, FeedbackMessages
+
+from ..utils import TestCaseMixin, make_block
+
+
+class FeedbackRendererTest(unittest.TestCase):
+    """ Tests for the rendering of overall feedback messages """
+
+    def test_messages(self):
+        renderer = FeedbackRenderer(DummyTranslationService())
+
+        self.assertEqual(
+            renderer.count_message(FeedbackMessages.correctly_placed, 2, 'correct'),
+            FeedbackMessage('Correctly placed 2 items', 'correct', True)
+        )
+        self.assertEqual(
+            renderer.grade_message(0.5, 'partial', final_attempt=True),
+            FeedbackMessage('Final attempt was used, highest score is 0.5', 'partial', True)
+        )
+
+    def test_plural_forms_translated_once(self):
+        i18n_service = mock.Mock(
+            gettext=lambda text: 'T: ' + text,
+            ngettext=mock.Mock(side_effect=lambda singular, plural, number: 'T: ' + plural),
+        )
+        renderer = FeedbackRenderer(i18n_service)
+
+        for __ in range(3):
+            message = renderer.count_message(FeedbackMessages.not_placed, 3, 'incorrect')
+
+        self.assertEqual(message.message, 'T: Did not place 3 required items')
+        self.assertEqual(i18n_service.ngettext.call_count, 1)
+        self.assertEqual(renderer.grade_message(1, None).message, 'T: Your highest score is 1')
+
+    def test_shared_per_locale(self):
+        self.assertIs(
+            get_feedback_renderer(DummyTranslationService()), get_feedback_renderer(DummyTranslationService())
+        )
+        with mock.patch('drag_and_drop_v2.feedback.get_language', return_value='xx-yy'):
+            other_locale_renderer = get_feedback_renderer(DummyTranslationService())
+        self.assertIsNot(get_feedback_renderer(DummyTranslationService()), other_locale_renderer)
+
+
+class FeedbackSanitizationTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for the sanitization of feedback messages presented by the block """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def test_problem_feedback_sanitized_once(self):
+        data = {'items': [], 'zones': [], 'feedback': {'start': 'Go <script>x</script>', 'finish': None}}
+
+        definition = ProblemDefinition(data)
+
+        self.assertEqual(dict(definition.sanitized_feedback), {'start': 'Go x', 'finish': ''})
+
+    def test_safe_messages_not_sanitized(self):
+        self.block.data = dict(self.block.data, feedback={'start': 'Go <script>x</script>', 'finish': ''})
+
+        with mock.patch('drag_and_drop_v2.drag_and_drop_v2.sanitize_html') as sanitize_html:
+            user_state = self.call_handler('student_view_user_state', method='GET')
+
+        self.assertEqual(user_state['overall_feedback'], [{'message': 'Go x', 'message_class': 'initial'}])
+        sanitize_html.assert_not_called()
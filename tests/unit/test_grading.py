@@ -0,0 +1,172 @@
+import unittest
+
+import mock
+
+from drag_and_drop_v2.cache import answer_layout_cache
+from drag_and_drop_v2.default_data import BOTTOM_ZONE_ID, DEFAULT_DATA, MIDDLE_ZONE_ID, TOP_ZONE_ID
+from drag_and_drop_v2.definition import ProblemDefinition
+from drag_and_drop_v2.grading import (
+    SOLUTION_CORRECT, SOLUTION_INCORRECT, SOLUTION_PARTIAL, LearnerItemStats, answer_correctness, answer_layout,
+    calculate_score, get_score
+)
+from drag_and_drop_v2.utils import StateMigration
+from xblock.scorable import Score
+
+from ..utils import TestCaseMixin, make_block
+
+
+class LearnerItemStatsTest(unittest.TestCase):
+    """ Tests for incrementally maintained learner item statistics """
+
+    def setUp(self):
+        self.definition = ProblemDefinition(DEFAULT_DATA)
+
+    def assertStatsEqual(self, stats, item_state):
+        """ Incrementally updated `stats` must match statistics computed from scratch for `item_state` """
+        expected = LearnerItemStats(self.definition, item_state)
+        self.assertEqual(stats.item_stats(), expected.item_stats())
+        self.assertEqual(stats.counts(), expected.counts())
+        self.assertEqual(stats.counts(ignore_decoys=True), expected.counts(ignore_decoys=True))
+
+    def test_initial_stats(self):
+        stats = LearnerItemStats(self.definition, {
+            '0': {'zone': TOP_ZONE_ID, 'correct': True},
+            '1': {'zone': TOP_ZONE_ID, 'correct': False},
+            '4': {'zone': TOP_ZONE_ID, 'correct': False},
+            '99': {'zone': TOP_ZONE_ID, 'correct': True},
+        })
+        item_stats = stats.item_stats()
+        self.assertEqual(item_stats.required, {'0', '1', '2', '3'})
+        self.assertEqual(item_stats.placed, {'0', '1', '4'})
+        self.assertEqual(item_stats.correctly_placed, {'0'})
+        self.assertEqual(item_stats.decoy, {'4'})
+        self.assertEqual(item_stats.decoy_in_bank, set())
+        self.assertEqual(stats.counts(), (1, 5))
+        self.assertEqual(stats.counts(ignore_decoys=True), (1, 4))
+
+    def test_incremental_updates(self):
+        item_state = {}
+        stats = LearnerItemStats(self.definition, item_state)
+        changes = [
+            ('0', {'zone': TOP_ZONE_ID, 'correct': True}),
+            ('4', {'zone': BOTTOM_ZONE_ID, 'correct': False}),
+            ('1', {'zone': TOP_ZONE_ID, 'correct': False}),
+            ('1', {'zone': MIDDLE_ZONE_ID, 'correct': True}),
+            ('4', None),
+            ('0', None),
+            ('3', {'zone': BOTTOM_ZONE_ID, 'correct': True}),
+        ]
+        for item_id, entry in changes:
+            if entry is None:
+                item_state.pop(item_id, None)
+                stats.remove(item_id)
+            else:
+                item_state[item_id] = entry
+                stats.update(item_id, entry)
+            self.assertStatsEqual(stats, item_state)
+
+
+class GradingFunctionsTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for grading learner state without a block """
+
+    ITEM_STATE = {
+        '0': {'zone': TOP_ZONE_ID, 'correct': True},
+        '1': {'zone': BOTTOM_ZONE_ID, 'correct': False},
+    }
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def test_matches_block(self):
+        self.block.item_state = self.ITEM_STATE
+
+        self.assertEqual(calculate_score(DEFAULT_DATA, self.ITEM_STATE), self.block.calculate_score())
+        self.assertEqual(calculate_score(DEFAULT_DATA, self.ITEM_STATE, ignore_decoys=True), Score(1 / 4.0, 1))
+
+    def test_item_state_formats(self):
+        definition = ProblemDefinition(DEFAULT_DATA)
+        legacy_item_state = {'0': [60, 20]}  # Legacy (top, left) representation, in the top zone
+
+        self.assertEqual(calculate_score(DEFAULT_DATA, legacy_item_state), Score(2 / 5.0, 1))
+        self.assertEqual(calculate_score(
+            DEFAULT_DATA,
+            definition.encode_item_state(self.ITEM_STATE),
+            item_state_version=StateMigration.COMPACT_ITEM_STATE_VERSION,
+            definition=definition,
+        ), calculate_score(DEFAULT_DATA, self.ITEM_STATE))
+
+    def test_get_score(self):
+        self.assertEqual(get_score(DEFAULT_DATA, self.ITEM_STATE, raw_earned=0.8), Score(0.8, 1))
+        self.assertEqual(get_score(DEFAULT_DATA, self.ITEM_STATE), Score(2 / 5.0, 1))
+
+    def test_answer_correctness(self):
+        definition = ProblemDefinition(DEFAULT_DATA)
+        correct_state = {
+            str(item_id): {'zone': zones[0], 'correct': True}
+            for item_id, zones in definition.item_zones.items() if zones
+        }
+
+        self.assertEqual(answer_correctness(LearnerItemStats(definition, {})), SOLUTION_PARTIAL)  # Decoy in bank
+        self.assertEqual(answer_correctness(LearnerItemStats(definition, {}), ignore_decoys=True), SOLUTION_INCORRECT)
+        self.assertEqual(answer_correctness(LearnerItemStats(definition, correct_state)), SOLUTION_CORRECT)
+
+
+class AnswerLayoutTest(unittest.TestCase):
+    """ Tests for the answer layouts shown to learners """
+
+    def setUp(self):
+        answer_layout_cache.clear()
+        self.addCleanup(answer_layout_cache.clear)
+
+    @staticmethod
+    def make_definition(*item_zones):
+        return ProblemDefinition({
+            'zones': [{'uid': 'A'}, {'uid': 'B'}],
+            'items': [{'id': item_id, 'zones': zones} for item_id, zones in enumerate(item_zones)] + [{'id': 9}],
+        })
+
+    def test_items_spread_over_zones(self):
+        definition = self.make_definition(['A', 'B'], ['A', 'B'], ['A', 'B'], ['B'])
+
+        self.assertEqual(answer_layout(definition, {}), {'0': 'A', '1': 'B', '2': 'A', '3': 'B'})
+        # Items placed by the learner count towards the zone fill
+        self.assertEqual(
+            answer_layout(definition, {'1': 'A', '9': 'B'}), {'1': 'A', '9': 'B', '0': 'A', '2': 'B', '3': 'B'}
+        )
+
+    def test_max_items_per_zone(self):
+        definition = self.make_definition(['A', 'B'], ['A'])
+
+        # Item 0 is moved to make room for item 1, which only fits in zone A
+        self.assertEqual(answer_layout(definition, {}, max_items_per_zone=1), {'0': 'B', '1': 'A'})
+        # Items placed by the learner are kept in place
+        self.assertEqual(answer_layout(definition, {'0': 'A'}, max_items_per_zone=1), {'0': 'A', '1': 'A'})
+        self.assertEqual(answer_layout(definition, {'1': 'A'}, max_items_per_zone=1), {'1': 'A', '0': 'B'})
+
+    def test_memoized(self):
+        definition = self.make_definition(['A', 'B'])
+
+        with mock.patch('drag_and_drop_v2.grading._solve_answer_layout', return_value={'0': 'A'}) as solve:
+            layout = answer_layout(definition, {}, 2)
+            self.assertIs(answer_layout(self.make_definition(['A', 'B']), {}, 2), layout)
+            answer_layout(definition, {'0': 'B'}, 2)
+            answer_layout(definition, {}, None)
+
+        self.assertEqual(solve.call_count, 3)
+
+
+class BlockLearnerItemStatsTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for the way the block shares learner item statistics within a handler """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def test_computed_once_per_handler(self):
+        with mock.patch('drag_and_drop_v2.drag_and_drop_v2.LearnerItemStats', wraps=LearnerItemStats) as stats_class:
+            for item_id, zone in enumerate([TOP_ZONE_ID, MIDDLE_ZONE_ID, BOTTOM_ZONE_ID, MIDDLE_ZONE_ID]):
+                res = self.call_handler(self.DROP_ITEM_HANDLER, {"val": item_id, "zone": zone})
+            self.assertEqual(stats_class.call_count, 4)
+        self.assertTrue(res['finished'])
+        self.assertEqual(res['grade'], 1)
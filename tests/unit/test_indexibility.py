@@ -1,5 +1,11 @@
+import copy
 import unittest
 
+import mock
+
+from drag_and_drop_v2.cache import index_content_cache
+from drag_and_drop_v2.indexing import INDEX_CONTENT_TYPE, index_documents
+
 from .test_fixtures import BaseDragAndDropAjaxFixture
 
 
@@ -111,3 +117,37 @@ class TestAssessmentDragAndDropIndexibility(BaseDragAndDropAjaxFixture, unittest
             }
         }
         self.assertEqual(self.block.index_dictionary(), expected_indexing_result)
+
+
+class TestIndexDocuments(BaseDragAndDropAjaxFixture, unittest.TestCase):
+    FOLDER = "html"
+
+    def test_blocks_and_data(self):
+        data = copy.deepcopy(self.block.data)
+        data['zones'][0]['title'] = '<p>First\n\t<b>zone</b></p>'
+
+        documents = list(index_documents(iter([self.block, data])))
+
+        self.assertEqual(documents[0], self.block.index_dictionary())
+        self.assertEqual(documents[1]['content_type'], INDEX_CONTENT_TYPE)
+        self.assertEqual(documents[1]['content']['zone_0_display_name'], 'First zone')
+        self.assertEqual(documents[1]['content']['question_text'], '')
+        self.assertEqual(
+            documents[1]['content'],
+            dict(documents[0]['content'], display_name='', question_text='', zone_0_display_name='First zone'),
+        )
+
+    def test_data_text_extracted_once(self):
+        index_content_cache.clear()
+        self.addCleanup(index_content_cache.clear)
+        self.block.index_dictionary()
+
+        with mock.patch('drag_and_drop_v2.indexing._extract_data_index_content') as extract, \
+                mock.patch('drag_and_drop_v2.indexing.content_fingerprint') as indexing_fingerprint:
+            self.block.display_name = 'Renamed'
+            content = self.block.index_dictionary()['content']
+
+        extract.assert_not_called()
+        indexing_fingerprint.assert_not_called()  # The fingerprint of the problem definition is reused
+        self.assertEqual(content['display_name'], 'Renamed')
+        self.assertEqual(content['zone_1_display_name'], 'Zone 2')
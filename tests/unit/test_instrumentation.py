@@ -0,0 +1,83 @@
+import socket
+import unittest
+
+import mock
+
+from drag_and_drop_v2 import instrumentation
+from drag_and_drop_v2.instrumentation import MemoryReporter, StatsdReporter, get_reporter, reporting
+
+from ..utils import TestCaseMixin, make_block
+
+
+class InstrumentationTest(unittest.TestCase):
+    """ Tests for spans, counters and reporters """
+
+    def test_disabled(self):
+        self.assertIs(instrumentation.span('name'), instrumentation.span('other name'))
+        instrumentation.increment('name')  # Nothing to report to
+
+    def test_spans_and_counters(self):
+        reporter = MemoryReporter()
+
+        @instrumentation.timed('decorated')
+        def decorated():
+            instrumentation.increment('calls')
+
+        with reporting(reporter):
+            with instrumentation.span('outer'):
+                decorated()
+                decorated()
+        decorated()  # Not reported, no reporter is active anymore
+
+        self.assertEqual([name for name, __ in reporter.timings], ['decorated', 'decorated', 'outer'])
+        self.assertEqual(reporter.counters, {'calls': 2})
+
+    def test_statsd(self):
+        collector = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(collector.close)
+        collector.bind(('127.0.0.1', 0))
+        collector.settimeout(5)
+        reporter = StatsdReporter(port=collector.getsockname()[1], prefix='dnd')
+
+        reporter.increment('calls', 2)
+        reporter.timing('handler', 0.5)
+
+        self.assertEqual(collector.recv(1024), b'dnd.calls:2|c')
+        self.assertEqual(collector.recv(1024), b'dnd.handler:500.000|ms')
+
+    def test_reporter_reused(self):
+        config = {'reporter': 'memory'}
+        self.assertIsInstance(get_reporter(config), MemoryReporter)
+        self.assertIs(get_reporter(config), get_reporter(dict(config)))
+        self.assertIsNone(get_reporter(None))
+
+
+class BlockInstrumentationTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for the instrumentation of the block """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def _configure(self, config):
+        patcher = mock.patch.object(self.block, 'get_xblock_settings', return_value={'instrumentation': config})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_handler(self):
+        self._configure({'reporter': 'memory'})
+        reporter = get_reporter({'reporter': 'memory'})
+        reporter.clear()
+
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': self.block.zones[0]['uid']})
+
+        span_names = [name for name, __ in reporter.timings]
+        self.assertEqual(span_names[-1], 'handler.drop_item')
+        self.assertIn('grade', span_names)
+        self.assertIn('publish', span_names)
+        self.assertGreater(reporter.counters['sanitize_html.calls'], 0)
+        self.assertTrue(any(name.startswith('cache.expanded_url.') for name in reporter.counters))
+
+    def test_invalid_reporter(self):
+        self._configure({'reporter': 'no_such_module.Reporter'})
+        self.call_handler(self.DROP_ITEM_HANDLER, {'val': 0, 'zone': self.block.zones[0]['uid']})
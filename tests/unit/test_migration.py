@@ -0,0 +1,150 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from drag_and_drop_v2.default_data import DEFAULT_DATA, MIDDLE_ZONE_ID, TOP_ZONE_ID
+from drag_and_drop_v2.definition import normalize_data
+from drag_and_drop_v2.migration import MigrationReport, main, migrate_olx, migrate_records
+
+LEGACY_DATA = {
+    'zones': [{'id': 1, 'index': 0, 'title': 'Zone', 'align': 'none'}],
+    'items': [
+        {'id': 0, 'zone': 'Zone', 'feedback': {'correct': '', 'incorrect': ''}},
+        {'id': 1, 'zone': 'none', 'feedback': {'correct': '', 'incorrect': ''}},
+    ],
+}
+
+RECORDS = [
+    {'usage_id': 'legacy', 'data': LEGACY_DATA},
+    {'usage_id': 'legacy', 'user': 1, 'state': {'item_state': {'0': {'top': '10px', 'left': '20px'}}, 'attempts': 1}},
+    {'usage_id': 'legacy', 'user': 2, 'state': {'item_state': {}}},
+    {'usage_id': 'current', 'data': normalize_data(DEFAULT_DATA)},
+    {'usage_id': 'current', 'user': 1, 'state': {
+        'item_state': {'1': {'zone': MIDDLE_ZONE_ID, 'correct': True}}, 'item_state_version': '2.1',
+    }},
+    {'usage_id': 'current', 'user': 2, 'state': {'item_state': {'1': {'zone': TOP_ZONE_ID}}}},
+    {'usage_id': 'invalid', 'data': {'zones': [], 'items': [
+        {'id': 0, 'zones': ['Zone'], 'feedback': {'correct': '', 'incorrect': ''}},
+    ]}},
+    {'usage_id': 'unknown', 'user': 1, 'state': {'item_state': {'0': {'zone': 'Zone'}}}},
+]
+
+
+class MigrateRecordsTest(unittest.TestCase):
+    """ Tests for the bulk migration of dumps of block records """
+
+    def assert_migrated(self, chunks):
+        results = [result for chunk in chunks for result in chunk]
+
+        self.assertEqual([result.upgraded for result in results], [True, True, False, False, False, True, False, False])
+        self.assertEqual(results[0].record['data'], normalize_data(LEGACY_DATA))
+        self.assertEqual(results[1].record['state'], {
+            'item_state': {'0': {'zone': 'Zone', 'correct': True}}, 'item_state_version': '2.1', 'attempts': 1,
+        })
+        self.assertEqual(results[5].record['state']['item_state'], {'1': {'zone': TOP_ZONE_ID, 'correct': True}})
+        self.assertEqual(results[6].errors, ["Item 0 refers to a zone that does not exist: Zone."])
+        self.assertEqual(results[7].errors, ["No content record for the block."])
+        # Records are not modified in place
+        self.assertNotIn('item_state_version', RECORDS[1]['state'])
+
+    def test_in_process(self):
+        self.assert_migrated(migrate_records(iter(RECORDS), chunk_size=3, processes=1))
+
+    def test_process_pool(self):
+        self.assert_migrated(migrate_records(iter(RECORDS), chunk_size=3, processes=2))
+
+    def test_problems_kept_for_recent_blocks(self):
+        records = [RECORDS[0], RECORDS[3], RECORDS[1], RECORDS[4]]
+        with mock.patch('drag_and_drop_v2.migration.MIGRATION_PROBLEM_CACHE_SIZE', 1):
+            results = [result for chunk in migrate_records(records, chunk_size=1, processes=1) for result in chunk]
+
+        self.assertEqual(results[2].errors, ["No content record for the block."])
+        self.assertEqual(results[3].errors, [])
+
+    def test_report(self):
+        report = MigrationReport(max_errors=1)
+        for results in migrate_records(RECORDS, processes=1):
+            report.add(results)
+
+        self.assertEqual(report.report(), {
+            'counts': {
+                'content_errors': 1, 'content_records': 3, 'content_upgraded': 1,
+                'state_errors': 1, 'state_records': 5, 'state_upgraded': 2,
+            },
+            'errors': [
+                {'usage_id': 'invalid', 'user': None, 'errors': ["Item 0 refers to a zone that does not exist: Zone."]},
+            ],
+        })
+
+
+class MigrationCommandTest(unittest.TestCase):
+    """ Tests for the migration command """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_command(self, *args):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            main(list(args))
+        return json.loads(stdout.getvalue())
+
+    def test_dump(self):
+        dump_path = os.path.join(self.directory, 'records.jsonl')
+        output_path = os.path.join(self.directory, 'upgraded.jsonl')
+        with open(dump_path, 'w', encoding='utf-8') as dump:
+            dump.write(''.join(json.dumps(record) + '\n' for record in RECORDS))
+
+        report = self.run_command(dump_path, '--dry-run')
+        self.assertTrue(report['dry_run'])
+        self.assertEqual(report['counts']['state_upgraded'], 2)
+        self.assertFalse(os.path.exists(output_path))
+
+        self.run_command(dump_path, '--output', output_path, '--batch-size', '2')
+        with open(output_path, encoding='utf-8') as output:
+            upgraded = [json.loads(line) for line in output]
+        self.assertEqual([(record['usage_id'], record.get('user')) for record in upgraded], [
+            ('legacy', None), ('legacy', 1), ('current', 2),
+        ])
+
+    def test_olx(self):
+        legacy_data = json.dumps(LEGACY_DATA).replace('"', '&quot;')
+        os.mkdir(os.path.join(self.directory, 'drag-and-drop-v2'))
+        block_path = os.path.join(self.directory, 'drag-and-drop-v2', 'problem.xml')
+        with open(block_path, 'w', encoding='utf-8') as olx:
+            olx.write(f'<drag-and-drop-v2 display_name="Problem" data="{legacy_data}"/>')
+        vertical_path = os.path.join(self.directory, 'vertical.xml')
+        with open(vertical_path, 'w', encoding='utf-8') as olx:
+            olx.write(
+                "<?xml version='1.0' encoding='UTF-8'?>\n<!-- Comment -->\n<vertical>\n"
+                f'  <drag-and-drop-v2 url_name="inline" display_name="a &gt; b" data="{legacy_data}"/>\n</vertical>\n'
+            )
+
+        report = self.run_command(self.directory, '--dry-run')
+        self.assertEqual(report['counts'], {'content_records': 2, 'content_upgraded': 2})
+        with open(block_path, encoding='utf-8') as olx:
+            self.assertIn(legacy_data, olx.read())
+
+        results = [result for file_results in migrate_olx(self.directory) for result in file_results]
+        self.assertEqual(sorted(result.record['usage_id'] for result in results), ['inline', 'problem'])
+        self.assertEqual([result.record['data'] for result in results], [normalize_data(LEGACY_DATA)] * 2)
+        with open(vertical_path, encoding='utf-8') as olx:
+            vertical_olx = olx.read()
+        self.assertTrue(vertical_olx.startswith(
+            "<?xml version='1.0' encoding='UTF-8'?>\n<!-- Comment -->\n<vertical>\n"
+            '  <drag-and-drop-v2 url_name="inline" display_name="a &gt; b" '
+            'data="{&#10;  &quot;format_version&quot;: &quot;2.1&quot;'
+        ))
+        self.assertTrue(vertical_olx.endswith('}"/>\n</vertical>\n'))
+        # Upgraded files are left as is, and not written again
+        modified = os.stat(vertical_path).st_mtime_ns
+        os.utime(vertical_path, ns=(modified - 10 ** 9, modified - 10 ** 9))
+        self.assertFalse(any(result.upgraded for results in migrate_olx(self.directory) for result in results))
+        self.assertEqual(os.stat(vertical_path).st_mtime_ns, modified - 10 ** 9)
@@ -0,0 +1,102 @@
+import copy
+import random
+import unittest
+
+from drag_and_drop_v2.default_data import BOTTOM_ZONE_ID, DEFAULT_DATA, MIDDLE_ZONE_ID, TOP_ZONE_ID
+from drag_and_drop_v2.definition import ProblemDefinition
+from drag_and_drop_v2.rescoring import Rescorer, RescoreRecord, RescoreResult, rescore_learners
+
+from ..utils import TestCaseMixin, make_block
+
+ZONES = [TOP_ZONE_ID, MIDDLE_ZONE_ID, BOTTOM_ZONE_ID, None]
+
+
+def random_item_state(rng):
+    item_state = {}
+    for item_id in range(5):
+        zone = rng.choice(ZONES)
+        if zone is not None:
+            item_state[str(item_id)] = {'zone': zone, 'correct': rng.choice([True, False])}
+    return item_state
+
+
+class RescorerTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for rescoring learner states without blocks """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+
+    def test_matches_block(self):
+        rng = random.Random(7)
+        rescorer = Rescorer(ProblemDefinition(DEFAULT_DATA))
+        for __ in range(200):
+            item_state = random_item_state(rng)
+            # Stored correctness is consistent with the definition unless the answer key changed
+            for item_id, entry in item_state.items():
+                entry['correct'] = entry['zone'] in self.block.get_item_zones(int(item_id))
+            self.block.item_state = item_state
+            self.assertEqual(rescorer.raw_score(item_state), self.block.calculate_score().raw_earned)
+
+    def test_answer_key_changed(self):
+        item_state = {'0': {'zone': TOP_ZONE_ID, 'correct': True}, '1': {'zone': MIDDLE_ZONE_ID, 'correct': True}}
+        data = copy.deepcopy(DEFAULT_DATA)
+        data['items'][0]['zones'] = [BOTTOM_ZONE_ID]
+        rescorer = Rescorer(ProblemDefinition(data))
+
+        result = rescorer.rescore(RescoreRecord('learner', item_state, 1, 0.6))
+
+        self.assertEqual(result, RescoreResult('learner', 1, 0.6, 0.4, True))
+        self.assertEqual(Rescorer(ProblemDefinition(data), only_if_higher=True).rescore(
+            RescoreRecord('learner', item_state, 1, 0.6)
+        ), RescoreResult('learner', 1, 0.6, 0.6, False))
+
+    def test_ignore_decoys(self):
+        item_state = {'0': {'zone': TOP_ZONE_ID, 'correct': True}}
+        definition = ProblemDefinition(DEFAULT_DATA)
+
+        self.assertEqual(Rescorer(definition).raw_score(item_state), 2 / 5.0)
+        self.assertEqual(Rescorer(definition, ignore_decoys=True).raw_score(item_state), 1 / 4.0)
+
+    def test_compact_item_state(self):
+        item_state = {'0': {'zone': TOP_ZONE_ID, 'correct': True}, '1': {'zone': MIDDLE_ZONE_ID, 'correct': True}}
+        previous_definition = ProblemDefinition(DEFAULT_DATA)
+        compact_item_state = previous_definition.encode_item_state(item_state)
+        data = copy.deepcopy(DEFAULT_DATA)
+        data['zones'].reverse()
+        layouts = {previous_definition.layout_fingerprint: dict(previous_definition.layout)}
+
+        rescorer = Rescorer(ProblemDefinition(data), layouts=layouts)
+        self.assertEqual(rescorer.raw_score(compact_item_state), rescorer.raw_score(item_state))
+        # Without the layout the state is indexed by, the score is left as it is
+        self.assertEqual(Rescorer(ProblemDefinition(data)).rescore(('learner', compact_item_state, 1, 0.6)),
+                         RescoreResult('learner', 1, 0.6, 0.6, False))
+
+    def test_never_graded(self):
+        result = Rescorer(ProblemDefinition(DEFAULT_DATA)).rescore(('learner', {}, 0, None))
+        self.assertEqual(result, RescoreResult('learner', 0, None, None, False))
+
+    def test_no_items(self):
+        with self.assertRaises(ValueError):
+            Rescorer(ProblemDefinition({'items': [], 'zones': []}))
+
+
+class RescoreLearnersTest(unittest.TestCase):
+    """ Tests for rescoring many learners in chunks """
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.records = [RescoreRecord(user, random_item_state(rng), 1, 0.5) for user in range(25)]
+        rescorer = Rescorer(ProblemDefinition(DEFAULT_DATA))
+        self.expected = [rescorer.rescore(record) for record in self.records]
+
+    def test_in_process(self):
+        chunks = list(rescore_learners(DEFAULT_DATA, iter(self.records), chunk_size=10, processes=1))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(sum(chunks, []), self.expected)
+
+    def test_process_pool(self):
+        chunks = list(rescore_learners(DEFAULT_DATA, iter(self.records), chunk_size=4, processes=2))
+
+        self.assertEqual(sum(chunks, []), self.expected)
@@ -6,7 +6,7 @@ import unittest
 import ddt
 
 from drag_and_drop_v2.utils import FeedbackMessages
-from mock import Mock, patch
+from mock import patch
 from tests.unit.test_fixtures import BaseDragAndDropAjaxFixture
 
 
@@ -21,6 +21,10 @@ class StandardModeFixture(BaseDragAndDropAjaxFixture):
         else:
             return None
 
+    def _make_item_feedback_list(self, item_id, key="incorrect"):
+        item_feedback_message = self._make_item_feedback_message(item_id, key)
+        return [item_feedback_message] if item_feedback_message else []
+
     def test_reset_no_item_feedback(self):
         data = {"val": 1, "zone": self.ZONE_1, "x_percent": "33%", "y_percent": "11%"}
         self.call_handler(self.DROP_ITEM_HANDLER, data)
@@ -102,6 +106,41 @@ class StandardModeFixture(BaseDragAndDropAjaxFixture):
             "feedback": expected_feedback
         })
 
+    def test_drop_items(self):
+        data = {"items": [{"val": 1, "zone": self.ZONE_2}, {"val": 0, "zone": self.ZONE_2}]}
+        with patch('workbench.runtime.WorkbenchRuntime.publish') as patched_publish:
+            res = self.call_handler(self.DROP_ITEMS_HANDLER, data)
+
+        self.assertEqual(res, {
+            "items": [
+                {"val": 1, "correct": True, "feedback": self._make_item_feedback_list(1, "correct")},
+                {"val": 0, "correct": False, "feedback": self._make_item_feedback_list(0, "incorrect")},
+            ],
+            "overall_feedback": [
+                self._make_feedback_message(self.INITIAL_FEEDBACK, FeedbackMessages.MessageClasses.INITIAL_FEEDBACK)
+            ],
+            "finished": False,
+            "grade": 3 / 4.0,
+        })
+        self.assertEqual(self.block.item_state, {'1': {'zone': self.ZONE_2, 'correct': True}})
+        # Graded once for the whole batch, then one event per placement
+        published_events = [call_args[0][1] for call_args in patched_publish.call_args_list]
+        self.assertEqual(published_events, ['grade', 'progress', 'edx.drag_and_drop_v2.item.dropped',
+                                            'edx.drag_and_drop_v2.item.dropped'])
+
+    def test_drop_items_validation(self):
+        data = {"items": [{"val": 0, "zone": self.ZONE_1}, {"val": 1, "zone": None}]}
+        res = self.call_handler(self.DROP_ITEMS_HANDLER, data, expect_json=False)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.block.item_state, {})
+
+    def test_drop_items_submit_not_available(self):
+        data = {"items": [{"val": 0, "zone": self.ZONE_1}], "submit": True}
+        res = self.call_handler(self.DROP_ITEMS_HANDLER, data, expect_json=False)
+
+        self.assertEqual(res.status_code, 400)
+
     @ddt.data(*[random.randint(1, 50) for _ in range(5)])  # pylint: disable=star-args
     def test_grading(self, weight):
         self.block.weight = weight
@@ -137,8 +176,8 @@ class StandardModeFixture(BaseDragAndDropAjaxFixture):
         self.assertEqual({'value': 1, 'max_value': 1, 'only_if_higher': None}, published_grades[-1])
 
     @patch(
-        'drag_and_drop_v2.drag_and_drop_v2.get_grading_ignore_decoys_waffle_flag',
-        lambda: Mock(is_enabled=lambda _: True),
+        'drag_and_drop_v2.drag_and_drop_v2.grading_ignore_decoys_enabled',
+        lambda _course_id: True,
     )
     @ddt.data(*[random.randint(1, 50) for _ in range(5)])  # pylint: disable=star-args
     def test_grading_ignore_decoy(self, weight):
@@ -0,0 +1,109 @@
+import random
+import unittest
+
+import bleach
+import ddt
+import mock
+from bleach.css_sanitizer import CSSSanitizer
+
+from drag_and_drop_v2 import utils
+from drag_and_drop_v2.cache import sanitized_html_cache
+from drag_and_drop_v2.utils import ALLOWED_ATTRIBUTES, ALLOWED_TAGS, html_to_text, sanitize_html
+
+
+def _bleach_sanitize(raw_body):
+    """ Reference implementation: a fresh bleach run on every call """
+    return bleach.clean(
+        raw_body,
+        tags=ALLOWED_TAGS,
+        protocols=bleach.ALLOWED_PROTOCOLS,
+        strip=True,
+        attributes=ALLOWED_ATTRIBUTES,
+        css_sanitizer=CSSSanitizer(),
+    )
+
+
+@ddt.ddt
+class SanitizeHtmlTest(unittest.TestCase):
+    """ Tests for the memoized `sanitize_html` """
+
+    @ddt.data(
+        "Plain text",
+        "Tabs\tand\nnewlines",
+        "Carriage\r\nreturn",
+        "Greater > than",
+        "Fish & chips",
+        "Control\x0bcharacter",
+        "Entity &amp; &lt;",
+        '<p style="color: red; position: fixed">Styled</p>',
+        '<img src="/static/img.png" onerror="alert(1)">',
+        "<script>alert('xss')</script>Text",
+        '<a href="javascript:alert(1)">Link</a>',
+        "",
+    )
+    def test_matches_bleach(self, raw_body):
+        self.assertEqual(sanitize_html(raw_body), _bleach_sanitize(raw_body))
+
+    def test_matches_bleach_fuzz(self):
+        rng = random.Random(42)
+        alphabet = ['a', 'b', ' ', '\t', '\n', '\r', '\x00', '\x1f', '\x7f', 'é', '<', '>', '&', '"', "'", '=', '/',
+                    'p', 'style', 'script', 'amp;', '#', ';', 'color:red']
+        for _ in range(500):
+            raw_body = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+            self.assertEqual(sanitize_html(raw_body), _bleach_sanitize(raw_body), repr(raw_body))
+
+    def test_plain_text_skips_bleach(self):
+        sanitized_html_cache.clear()
+        self.assertEqual(sanitize_html("No markup here"), "No markup here")
+        self.assertEqual(sanitized_html_cache.misses, 0)
+
+    def test_memoized(self):
+        sanitized_html_cache.clear()
+        with mock.patch('drag_and_drop_v2.utils.increment') as increment:
+            sanitize_html("<b>Bold</b>")
+            sanitize_html("<b>Bold</b>")
+        self.assertEqual((sanitized_html_cache.hits, sanitized_html_cache.misses), (1, 1))
+        self.assertEqual(
+            [call.args[0] for call in increment.call_args_list],
+            ['sanitize_html.calls', 'sanitize_html.bleach', 'sanitize_html.calls'],
+        )
+
+
+@ddt.ddt
+class HtmlToTextTest(unittest.TestCase):
+    """ Tests for `html_to_text`, the tag-stripping fast path of `_clean_data` """
+
+    @ddt.data(
+        "Zone 1",
+        "Solve this <strong>drag-and-drop</strong> problem.",
+        "<p>First\n\t<b>zone</b></p>",
+        "<p>One</p><p>Two</p><ul><li>Three</li><li>Four</li></ul>",
+        '<a href="/x?a=1&b=2" title=\'a > b\'>Link</a>',
+        "Fish & chips &amp; &nbsp;peas &copy &notin; &#65;&#x41; &#1a;",
+        "x < 3 > 2 <!-- comment --> <!-->done",
+        "Control\x0bcharacter\x0c",
+        "<script>alert('xss')</script>Text",
+        "",
+    )
+    def test_matches_bleach(self, data):
+        self.assertEqual(html_to_text(data), utils._clean_data(data))  # pylint: disable=protected-access
+
+    def test_matches_bleach_fuzz(self):
+        rng = random.Random(42)
+        pieces = ['a', 'Zone', ' ', '\n', '\t', '\r\n', '\xa0', 'é', '<', '>', '&', '"', "'", '=', ';', '#',
+                  '&amp;', '&amp', '&nbsp;', '&lt;', '&#65;', '&#x41;', '&#;', '&no;', '&notit;', '&copy',
+                  '<b>', '</b>', '<p>', '</P>', '<div class="x">', '<br/>', '<li>', '<h1 id=a>', '<img alt=\'a>b\'>',
+                  '<!-- c -->', '<!-->', '</>', '< b', '<script>', '\x01', '\x0c', '\x00', '<!', '<?x>', '</ b>',
+                  '<a b"c>', '<b c="', '<p']
+        clean_data = utils._clean_data  # pylint: disable=protected-access
+        for _ in range(1000):
+            data = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(html_to_text(data), clean_data(data), repr(data))
+
+    def test_well_formed_markup_skips_bleach(self):
+        with mock.patch('drag_and_drop_v2.utils._clean_data') as clean_data:
+            html_to_text("<p>Drag <b>items</b> &amp; <!-- x --> drop<br/> them</p>")
+            html_to_text("No markup here")
+            clean_data.assert_not_called()
+            html_to_text("Unterminated <b")
+            clean_data.assert_called_once_with("Unterminated <b")
@@ -0,0 +1,78 @@
+import copy
+import random
+import unittest
+
+import ddt
+import mock
+
+from drag_and_drop_v2.default_data import BOTTOM_ZONE_ID, DEFAULT_DATA, MIDDLE_ZONE_ID, TOP_ZONE_ID
+from drag_and_drop_v2.definition import ProblemDefinition
+from drag_and_drop_v2.rescoring import Rescorer
+from drag_and_drop_v2.vectorized import GradingKernel, np
+
+from ..utils import TestCaseMixin, make_block
+
+ZONES = [TOP_ZONE_ID, MIDDLE_ZONE_ID, BOTTOM_ZONE_ID, 'no such zone', None]
+
+
+def random_item_states(count, seed=3):
+    rng = random.Random(seed)
+    item_states = []
+    for __ in range(count):
+        item_state = {}
+        for item_id in range(6):  # Item 5 is not part of the problem
+            zone = rng.choice(ZONES)
+            if zone is not None:
+                item_state[str(item_id)] = {'zone': zone, 'correct': rng.choice([True, False])}
+        item_states.append(item_state)
+    return item_states
+
+
+@ddt.ddt
+@unittest.skipIf(np is None, "numpy is not installed")
+class GradingKernelTest(TestCaseMixin, unittest.TestCase):
+    """ Tests for the vectorized grading kernel """
+
+    def setUp(self):
+        self.block = make_block()
+        self.patch_workbench()
+        self.item_states = random_item_states(200)
+
+    @ddt.data(False, True)
+    def test_matches_block(self, ignore_decoys):
+        kernel = GradingKernel(ProblemDefinition(DEFAULT_DATA))
+        counts = kernel.grade(kernel.encode(self.item_states), ignore_decoys=ignore_decoys)
+
+        flag = 'drag_and_drop_v2.drag_and_drop_v2.grading_ignore_decoys_enabled'
+        with mock.patch(flag, return_value=ignore_decoys):
+            for row, item_state in enumerate(self.item_states):
+                self.block.item_state = item_state
+                correct_count, total_count = self.block._get_item_stats()  # pylint: disable=protected-access
+                self.assertEqual((counts.correct[row], counts.total), (correct_count, total_count))
+                self.assertEqual(counts.scores[row], self.block.calculate_score().raw_earned)
+
+    def test_counts(self):
+        kernel = GradingKernel(ProblemDefinition(DEFAULT_DATA))
+        item_state = {
+            '0': {'zone': TOP_ZONE_ID, 'correct': True},
+            '1': {'zone': TOP_ZONE_ID, 'correct': False},
+            '4': {'zone': BOTTOM_ZONE_ID, 'correct': False},
+        }
+        counts = kernel.grade(kernel.encode([item_state, {}]))
+
+        self.assertEqual(counts.correctly_placed.tolist(), [1, 0])
+        self.assertEqual(counts.misplaced.tolist(), [2, 0])
+        self.assertEqual(counts.missing.tolist(), [2, 4])
+        self.assertEqual(counts.decoy_in_bank.tolist(), [0, 1])
+        self.assertEqual(counts.scores.tolist(), [1 / 5.0, 1 / 5.0])
+
+    def test_reevaluate_matches_rescorer(self):
+        data = copy.deepcopy(DEFAULT_DATA)
+        data['items'][0]['zones'] = [BOTTOM_ZONE_ID]
+        definition = ProblemDefinition(data)
+        kernel = GradingKernel(definition)
+        rescorer = Rescorer(definition)
+
+        counts = kernel.grade(kernel.encode(self.item_states), reevaluate=True)
+
+        self.assertEqual(counts.scores.tolist(), [rescorer.raw_score(state) for state in self.item_states])
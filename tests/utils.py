@@ -40,7 +40,7 @@ def make_block():
     def_id = runtime.id_generator.create_definition(block_type)
     usage_id = runtime.id_generator.create_usage(def_id)
     scope_ids = ScopeIds('user', block_type, def_id, usage_id)
-    return drag_and_drop_v2.DragAndDropBlock(runtime, field_data, scope_ids=scope_ids)
+    return runtime.construct_xblock_from_class(drag_and_drop_v2.DragAndDropBlock, scope_ids, field_data)
 
 
 def generate_max_and_attempts(count=100):
@@ -56,6 +56,7 @@ class TestCaseMixin(object):
     maxDiff = None
 
     DROP_ITEM_HANDLER = 'drop_item'
+    DROP_ITEMS_HANDLER = 'drop_items'
     DO_ATTEMPT_HANDLER = 'do_attempt'
     RESET_HANDLER = 'reset'
     SHOW_ANSWER_HANDLER = 'show_answer'
@@ -67,8 +68,8 @@ class TestCaseMixin(object):
             lambda _, _block, path: '/expanded/url/to/drag_and_drop_v2/' + path
         )
         self.apply_patch(
-            'drag_and_drop_v2.drag_and_drop_v2.get_grading_ignore_decoys_waffle_flag',
-            lambda: Mock(is_enabled=lambda _: False),
+            'drag_and_drop_v2.drag_and_drop_v2.grading_ignore_decoys_enabled',
+            lambda _course_id: False,
         )
 
     def apply_patch(self, *args, **kwargs):